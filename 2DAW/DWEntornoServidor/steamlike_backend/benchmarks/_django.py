@@ -0,0 +1,39 @@
+"""
+Arranque de Django para los benchmarks.
+
+Por defecto se usa una base de datos SQLite en memoria (los benchmarks miden
+CPU y memoria del código Python, no del servidor); con --use-settings-db se
+usa la base de datos configurada en settings.py.
+"""
+import os
+import sys
+
+
+def setup(use_settings_db=False):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "steamlike_backend.settings")
+    from django.conf import settings
+
+    if not use_settings_db:
+        settings.DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+def add_db_argument(parser):
+    parser.add_argument(
+        "--use-settings-db",
+        action="store_true",
+        help="Usar la base de datos de settings.py en lugar de SQLite en memoria",
+    )
+
+
+def print_table(rows, columns):
+    widths = [max(len(str(c)), *(len(str(r[i])) for r in rows)) for i, c in enumerate(columns)]
+    line = "  ".join(str(c).ljust(w) for c, w in zip(columns, widths))
+    sys.stdout.write(line + "\n" + "-" * len(line) + "\n")
+    for r in rows:
+        sys.stdout.write("  ".join(str(v).ljust(w) for v, w in zip(r, widths)) + "\n")
@@ -0,0 +1,212 @@
+"""
+Utilidades para los benchmarks que atacan un servidor HTTP de verdad: arrancar
+el servidor en un subproceso, clientes con conexión persistente y sesión, y
+cálculo de percentiles.
+"""
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+from steamlike_backend import codec
+
+
+def free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """
+    Servidor (gunicorn, uvicorn...) lanzado en un subproceso. Se espera a que
+    /api/health/ responda antes de devolver el control.
+    """
+
+    def __init__(self, command, port, env=None, timeout=30):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        # El log del servidor (una línea por petición) va a un fichero: una tubería
+        # sin leer se llenaría y bloquearía al servidor
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            command,
+            env={**os.environ, **(env or {})},
+            stdout=subprocess.DEVNULL,
+            stderr=self.log,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                raise RuntimeError(f"El servidor ha terminado al arrancar: {self.log.read().decode(errors='replace')}")
+            try:
+                if Client(self.base_url).request("GET", "/api/health/")[0] == 200:
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"El servidor no responde en {self.base_url}")
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class Client:
+    """Cliente HTTP con conexión persistente y cookies de sesión (sessionid, csrftoken)."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        """Devuelve (status, cuerpo decodificado o None)."""
+        headers = {"Accept": "application/json"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if body is not None:
+            body = codec.dumps(body)
+            headers["Content-Type"] = "application/json"
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # El servidor cerró la conexión persistente: se reintenta una vez con otra
+                self.close()
+                if attempt == 2:
+                    raise
+        for header in response.headers.get_all("Set-Cookie") or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        data = codec.loads(content) if content and response.getheader("Content-Type", "").startswith("application/json") else None
+        return response.status, data
+
+    def login(self, username, password):
+        status, _ = self.request("POST", "/api/auth/login/", {"username": username, "password": password})
+        if status != 200:
+            raise RuntimeError(f"No se ha podido iniciar sesión como {username}: {status}")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def percentile(sorted_values, p):
+    """Percentil p (0-100) de una lista ya ordenada, por el método del rango más cercano."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def latency_summary(latencies, seconds, errors=0):
+    """Métricas de un grupo de peticiones: latencias en segundos -> dict en ms."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2) if ordered else None,
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2) if ordered else None,
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2) if ordered else None,
+    }
+
+
+def run_clients(concurrency, duration, make_client, step):
+    """
+    Lanza "concurrency" hilos durante "duration" segundos. Cada hilo crea su
+    cliente con make_client(i) y repite step(client, i) -> (endpoint, status).
+    Devuelve ({endpoint: [latencias]}, {endpoint: errores}, segundos reales).
+    """
+    latencies = {}
+    errors = {}
+    lock = threading.Lock()
+    clients = [make_client(i) for i in range(concurrency)]
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def worker(i):
+        local, local_errors = {}, {}
+        client = clients[i]
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            started = time.perf_counter()
+            try:
+                endpoint, status = step(client, i)
+                failed = status >= 500
+            except OSError:
+                endpoint, failed = "connection", True
+                client.close()
+            elapsed = time.perf_counter() - started
+            local.setdefault(endpoint, []).append(elapsed)
+            if failed:
+                local_errors[endpoint] = local_errors.get(endpoint, 0) + 1
+        client.close()
+        with lock:
+            for endpoint, values in local.items():
+                latencies.setdefault(endpoint, []).extend(values)
+            for endpoint, n in local_errors.items():
+                errors[endpoint] = errors.get(endpoint, 0) + n
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    deadline[0] = started + duration
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def python_command(*args):
+    """Comando para lanzar un módulo con el mismo intérprete que el benchmark."""
+    return [sys.executable, "-m", *args]
+
+
+def server_command(kind, workers=2, threads=8):
+    """
+    Comando y entorno para servir el proyecto: "wsgi" (gunicorn con hilos y
+    vistas síncronas) o "asgi" (uvicorn con API_ASYNC_VIEWS=1). El puerto se
+    rellena con .format(port=...).
+    """
+    if kind == "wsgi":
+        return python_command(
+            "gunicorn", "steamlike_backend.wsgi:application", "--bind", "127.0.0.1:{port}",
+            "--workers", str(workers), "--threads", str(threads),
+        ), {"API_ASYNC_VIEWS": "0"}
+    if kind == "asgi":
+        return python_command(
+            "uvicorn", "steamlike_backend.asgi:application", "--host", "127.0.0.1", "--port", "{port}",
+            "--workers", str(workers), "--no-access-log",
+        ), {"API_ASYNC_VIEWS": "1"}
+    raise ValueError(f"Servidor desconocido: {kind}")
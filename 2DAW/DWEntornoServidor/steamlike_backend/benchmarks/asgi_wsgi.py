@@ -0,0 +1,109 @@
+"""
+Benchmark WSGI frente a ASGI de la API.
+
+Arranca el proyecto dos veces sobre la misma base de datos: con gunicorn
+(WSGI, vistas síncronas, hilos) y con uvicorn (ASGI, API_ASYNC_VIEWS=1). Contra
+cada uno lanza "--concurrency" clientes con sesión iniciada que repiten
+/api/users/me/, una página del listado y un detalle durante "--duration"
+segundos, y mide peticiones por segundo y latencias p50/p99.
+
+Por defecto usa un fichero SQLite temporal como sustituto de PostgreSQL; con
+--use-settings-db usa la base de datos configurada en settings.py (los
+servidores heredan el entorno).
+
+    python -m benchmarks.asgi_wsgi [--concurrency 32] [--duration 10] [--entries 500]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks import _django, _http
+
+USERNAME = "bench_asgi"
+PASSWORD = "bench-password"
+
+
+def seed(entries):
+    from django.contrib.auth.models import User
+    from library.models import LibraryEntry
+
+    User.objects.filter(username=USERNAME).delete()
+    user = User.objects.create_user(username=USERNAME, password=PASSWORD)
+    LibraryEntry.objects.bulk_create(
+        (LibraryEntry(user=user, external_game_id=f"game-{i}", status="playing", hours_played=i % 500) for i in range(entries)),
+        batch_size=5000,
+    )
+    return list(LibraryEntry.objects.filter(user=user).values_list("id", flat=True)[:100])
+
+
+def make_step(entry_ids):
+    def step(client, i):
+        client.counter = getattr(client, "counter", i) + 1
+        kind = client.counter % 3
+        if kind == 0:
+            return "GET /api/users/me/", client.request("GET", "/api/users/me/")[0]
+        if kind == 1:
+            return "GET /api/library/entries/?limit=50", client.request("GET", "/api/library/entries/?limit=50")[0]
+        entry_id = entry_ids[client.counter % len(entry_ids)]
+        return "GET /api/library/entries/<id>/", client.request("GET", f"/api/library/entries/{entry_id}/")[0]
+    return step
+
+
+def run(name, command, env, args, entry_ids):
+    port = _http.free_port()
+    command = [part.format(port=port) for part in command]
+    with _http.Server(command, port, env=env) as server:
+        def make_client(i):
+            client = _http.Client(server.base_url)
+            client.login(USERNAME, PASSWORD)
+            return client
+
+        latencies, errors, seconds = _http.run_clients(args.concurrency, args.duration, make_client, make_step(entry_ids))
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        "server": name,
+        "total": _http.latency_summary(every, seconds, sum(errors.values())),
+        "endpoints": {
+            endpoint: _http.latency_summary(values, seconds, errors.get(endpoint, 0))
+            for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--entries", type=int, default=500, help="Entradas en la biblioteca del usuario de prueba")
+    parser.add_argument("--workers", type=int, default=2, help="Procesos de cada servidor")
+    parser.add_argument("--threads", type=int, default=8, help="Hilos por proceso de gunicorn (WSGI)")
+    parser.add_argument("--json", action="store_true", help="Resultado en JSON en lugar de tabla")
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+
+    env = {"DJANGO_SETTINGS_MODULE": "steamlike_backend.settings"}
+    if not args.use_settings_db:
+        env["DJANGO_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_asgi_"), "db.sqlite3")
+        os.environ["DJANGO_SQLITE_PATH"] = env["DJANGO_SQLITE_PATH"]
+    _django.setup(use_settings_db=True)
+    entry_ids = seed(args.entries)
+
+    results = []
+    for name in ("wsgi", "asgi"):
+        command, server_env = _http.server_command(name, args.workers, args.threads)
+        results.append(run(name, command, {**env, **server_env}, args, entry_ids))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    rows = []
+    for result in results:
+        for endpoint, stats in [("total", result["total"]), *result["endpoints"].items()]:
+            rows.append((result["server"], endpoint, stats["requests"], stats["errors"], stats["rps"], stats["p50_ms"], stats["p99_ms"]))
+    _django.print_table(rows, ("servidor", "endpoint", "peticiones", "errores", "pet/s", "p50 ms", "p99 ms"))
+
+
+if __name__ == "__main__":
+    main()
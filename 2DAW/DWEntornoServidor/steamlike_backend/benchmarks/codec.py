@@ -0,0 +1,67 @@
+"""
+Micro-benchmark del códec JSON de la API (steamlike_backend.codec).
+
+Compara el codificador de la biblioteca estándar (el que usaba
+django.http.JsonResponse) con el rápido (orjson, si está instalado) sobre el
+listado de una biblioteca grande: codificar la respuesta y decodificar un
+cuerpo de alta masiva de ese mismo tamaño.
+
+    python -m benchmarks.codec [--rows 10000 100000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+from benchmarks import _django
+
+
+def best_of(func, value, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def django_json_response_dumps(value):
+    # Lo que hacía JsonResponse: DjangoJSONEncoder con la configuración por defecto
+    from django.core.serializers.json import DjangoJSONEncoder
+    return json.dumps(value, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+
+    _django.setup(args.use_settings_db)
+    from steamlike_backend import codec
+
+    encoders = [("JsonResponse", django_json_response_dumps), ("json", codec.stdlib_dumps)]
+    decoders = [("json", codec.stdlib_loads)]
+    if codec.BACKEND != "json":
+        encoders.append((codec.BACKEND, codec.dumps))
+        decoders.append((codec.BACKEND, codec.loads))
+
+    results = []
+    for n in args.rows:
+        rows = [
+            {"id": i, "external_game_id": f"game-{i}", "status": "playing", "hours_played": i % 500}
+            for i in range(n)
+        ]
+        body = codec.dumps(rows)
+        for name, func in encoders:
+            seconds = best_of(func, rows, args.repeat)
+            results.append((n, "codificar", name, f"{seconds * 1000:.1f}", f"{seconds / n * 1e6:.2f}"))
+        for name, func in decoders:
+            seconds = best_of(func, body, args.repeat)
+            results.append((n, "decodificar", name, f"{seconds * 1000:.1f}", f"{seconds / n * 1e6:.2f}"))
+
+    _django.print_table(results, ("filas", "operación", "códec", "total ms", "µs/fila"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark de la exportación de la biblioteca (library.export).
+
+Para cada formato (CSV, NDJSON) con y sin gzip mide filas por segundo y el
+pico de memoria (tracemalloc) recorriendo toda la exportación sin guardarla.
+El pico debe ser el mismo con 100k que con 1M filas.
+
+    python -m benchmarks.export [--rows 100000 1000000] [--repeat 3]
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks import _django
+
+
+def drain(chunks):
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+
+    _django.setup(args.use_settings_db)
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from library import export
+    from library.models import LibraryEntry
+
+    results = []
+    for n in args.rows:
+        user, _ = User.objects.get_or_create(username=f"bench_export_{n}")
+        if LibraryEntry.objects.filter(user=user).count() != n:
+            LibraryEntry.objects.filter(user=user).delete()
+            LibraryEntry.objects.bulk_create(
+                (LibraryEntry(user=user, external_game_id=f"game-{i}", status="playing", hours_played=i % 500) for i in range(n)),
+                batch_size=5000,
+            )
+        queryset = export.export_queryset(user=user)
+
+        for fmt in export.FORMATS:
+            for gzip_level in (None, settings.LIBRARY_EXPORT_GZIP_LEVEL):
+                def run():
+                    return drain(export.export_stream(queryset, export.EXPORT_FIELDS, fmt, args.chunk_size, gzip_level))
+
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    size = run()
+                    best = min(best, time.perf_counter() - start)
+
+                tracemalloc.start()
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                results.append((
+                    n, fmt, f"gzip {gzip_level}" if gzip_level else "-", round(n / best),
+                    round(size / 1e6, 1), round(peak / 1024),
+                ))
+
+    _django.print_table(results, ("filas", "formato", "compresión", "filas/s", "MB", "pico KiB"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark de las estadísticas globales por juego (library.game_stats).
+
+Siembra una tabla LibraryEntry sintética (--rows entradas repartidas en
+--per-user entradas por usuario y --games juegos) generándola en SQL, y compara:
+
+- las consultas en vivo sobre LibraryEntry (clasificación por horas con
+  GROUP BY y estadísticas de un juego con sus percentiles),
+- la reconstrucción completa de GameStats/GameHours,
+- las mismas lecturas desde las tablas agregadas,
+- el coste de mantenerlas al aplicar un bloque de cambios.
+
+Con 50M filas no cabe en memoria: hay que usar un fichero SQLite o PostgreSQL.
+
+    DJANGO_SQLITE_PATH=/tmp/game_stats.sqlite3 python -m benchmarks.game_stats --use-settings-db --rows 50000000
+"""
+import argparse
+import random
+import time
+
+from benchmarks import _django
+
+def seed(connection, rows, per_user, games):
+    """
+    Usuarios y entradas generados en la base de datos (generate_series en
+    PostgreSQL, CTE recursiva en SQLite). Cada usuario tiene per_user juegos
+    distintos, uno por franja de games // per_user; las horas dependen de la
+    franja para que unos juegos acumulen más que otros.
+    """
+    users = rows // per_user
+    stride = games // per_user
+    if connection.vendor == "postgresql":
+        series = "SELECT generate_series(0, %s) AS i"
+        now = "now()"
+    else:
+        series = "WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < %s) SELECT i FROM seq"
+        now = "CURRENT_TIMESTAMP"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO auth_user (password, is_superuser, username, first_name, last_name, email, is_staff, is_active, date_joined) "
+            f"SELECT '!', false, 'bench_stats_' || i, '', '', '', false, true, {now} FROM ({series}) s",
+            [users - 1],
+        )
+        cursor.execute("SELECT MIN(id) FROM auth_user WHERE username LIKE 'bench_stats_%%'")
+        first_user = cursor.fetchone()[0]
+        # u = usuario, k = franja; estado según (u + k) % 10: 2 wishlist, 4 playing, 3 completed, 1 dropped
+        cursor.execute(
+            "INSERT INTO library_libraryentry (user_id, external_game_id, status, hours_played, updated_at) "
+            "SELECT %s + u, 'game-' || (k * %s + (u * 7919) %% %s), "
+            "  CASE WHEN (u + k) %% 10 < 2 THEN 'wishlist' WHEN (u + k) %% 10 < 6 THEN 'playing' "
+            "       WHEN (u + k) %% 10 < 9 THEN 'completed' ELSE 'dropped' END, "
+            "  CASE WHEN (u + k) %% 10 < 2 THEN 0 ELSE ((u * 31 + k * 17) %% (5 + k * 7)) END, "
+            f"  {now} "
+            f"FROM (SELECT i / %s AS u, i %% %s AS k FROM ({series}) s) g",
+            [first_user, stride, stride, per_user, per_user, users * per_user - 1],
+        )
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--per-user", type=int, default=100)
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--live-repeat", type=int, default=1, help="Repeticiones de las consultas en vivo (lentas)")
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+
+    _django.setup(args.use_settings_db)
+    from django.db import connection, transaction
+    from django.db.models import Count, Sum
+    from library import game_stats
+    from library.changes import EntryChange
+    from library.models import GameStats, LibraryEntry
+
+    results = []
+
+    def measure(name, seconds, note=""):
+        results.append((name, f"{seconds * 1000:.1f}", note))
+        print(f"{name}: {seconds * 1000:.1f} ms {note}", flush=True)
+
+    rows = LibraryEntry.objects.count()
+    if rows != args.rows:
+        start = time.perf_counter()
+        with transaction.atomic():
+            LibraryEntry.objects.all().delete()
+            seed(connection, args.rows, args.per_user, args.games)
+        rows = LibraryEntry.objects.count()
+        measure("siembra", time.perf_counter() - start, f"{rows} filas")
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE library_libraryentry")
+
+    seconds, _ = best_of(1, game_stats.rebuild_game_stats)
+    measure("reconstrucción completa", seconds, f"{GameStats.objects.count()} juegos")
+
+    top_game = game_stats.leaderboard("hours", 1)[0]["external_game_id"]
+
+    def live_leaderboard():
+        return list(
+            LibraryEntry.objects.filter(user__isnull=False).values("external_game_id")
+            .annotate(hours=Sum("hours_played"), players=Count("id")).order_by("-hours", "external_game_id")[:20]
+        )
+
+    def live_game_stats():
+        hours = sorted(
+            LibraryEntry.objects.filter(external_game_id=top_game, user__isnull=False)
+            .exclude(status="wishlist").values_list("hours_played", flat=True)
+        )
+        return hours[len(hours) // 2] if hours else None
+
+    seconds, live_top = best_of(args.live_repeat, live_leaderboard)
+    measure("clasificación en vivo (GROUP BY)", seconds)
+    seconds, _ = best_of(args.live_repeat, live_game_stats)
+    measure("estadísticas de un juego en vivo", seconds)
+
+    seconds, rollup_top = best_of(args.repeat * 10, lambda: game_stats.leaderboard("hours", 20))
+    measure("clasificación desde GameStats", seconds)
+    # Mismo resultado que la consulta en vivo
+    assert [(g["external_game_id"], g["total_hours"]) for g in rollup_top] == [(g["external_game_id"], g["hours"]) for g in live_top]
+    seconds, _ = best_of(args.repeat * 10, lambda: game_stats.game_stats(top_game))
+    measure("estadísticas de un juego desde GameStats", seconds)
+
+    # Mantenimiento incremental: bloques de 100 cambios de horas en juegos al azar
+    sample = list(LibraryEntry.objects.exclude(status="wishlist").values_list("id", "external_game_id", "status", "hours_played")[:10_000])
+    rng = random.Random(1)
+
+    def apply_block():
+        changes = [
+            EntryChange(entry_id, game, status, hours, status, hours + 1)
+            for entry_id, game, status, hours in rng.sample(sample, 100)
+        ]
+        with transaction.atomic():
+            game_stats.apply_game_stats_delta(*game_stats.game_stats_delta(changes))
+            transaction.set_rollback(True)
+
+    seconds, _ = best_of(args.repeat * 10, apply_block)
+    measure("incremental: bloque de 100 cambios", seconds)
+
+    _django.print_table(results, ("operación", "ms", ""))
+    print(f"{rows} filas, {args.games} juegos, {args.per_user} por usuario ({connection.vendor})")
+
+
+if __name__ == "__main__":
+    main()
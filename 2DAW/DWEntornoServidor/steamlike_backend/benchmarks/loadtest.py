@@ -0,0 +1,252 @@
+"""
+Prueba de carga reproducible de la API.
+
+1. Siembra --users usuarios con --entries entradas cada uno (directamente con
+   el ORM y bulk_create, sin pasar por la API).
+2. Arranca el proyecto en local (--server wsgi con gunicorn o asgi con
+   uvicorn) o usa uno ya arrancado con --base-url.
+3. Lanza --concurrency clientes durante --duration segundos. Cada uno inicia
+   sesión como uno de los usuarios sembrados y elige cada petición según la
+   mezcla --mix (registro, login, /api/users/me/, listado, detalle, alta y
+   PATCH), con un generador aleatorio con semilla fija (--seed).
+4. Escribe en JSON (stdout o --output) peticiones por segundo, errores y
+   latencias p50/p95/p99 por endpoint, junto con el commit y los parámetros.
+
+Con --baseline se compara con un resultado anterior y el proceso termina con
+código 1 si el p95 de algún endpoint empeora más de --max-regression por
+ciento, para usarlo antes de desplegar.
+
+Por defecto usa un fichero SQLite temporal; con --use-settings-db usa la base
+de datos de settings.py (y es obligatorio si se usa --base-url, para sembrar
+la misma base de datos que usa ese servidor).
+
+    python -m benchmarks.loadtest --users 50 --entries 200 --concurrency 32 --duration 30 --output carga.json
+    python -m benchmarks.loadtest --baseline carga.json --max-regression 20
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import _django, _http
+
+PASSWORD = "loadtest-password"
+DEFAULT_MIX = "me=15,list=30,detail=25,create=10,patch=15,login=3,register=2"
+ENDPOINTS = {
+    "register": "POST /api/register/",
+    "login": "POST /api/auth/login/",
+    "me": "GET /api/users/me/",
+    "list": "GET /api/library/entries/?limit=50",
+    "detail": "GET /api/library/entries/<id>/",
+    "create": "POST /api/library/entries/",
+    "patch": "PATCH /api/library/entries/<id>/",
+}
+STATUSES = ("wishlist", "playing", "completed", "dropped")
+# Ids de entradas por usuario que se guardan para los detalles y PATCH
+IDS_PER_USER = 200
+
+
+def parse_mix(raw):
+    weights = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Operación desconocida: {name}. Las permitidas son: {', '.join(ENDPOINTS)}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Peso inválido para {name}: {weight!r}")
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("La mezcla no tiene ninguna operación con peso")
+    return weights
+
+
+def seed(prefix, users, entries):
+    """
+    Crea los usuarios (todos con la misma contraseña, hasheada una sola vez) y
+    sus entradas. Devuelve [(username, [ids de entradas])].
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from library.models import LibraryEntry
+
+    User.objects.filter(username__startswith=prefix).delete()
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        [User(username=f"{prefix}{u}", password=password) for u in range(users)],
+        batch_size=1000,
+    )
+    user_ids = dict(User.objects.filter(username__startswith=prefix).values_list("username", "id"))
+    LibraryEntry.objects.bulk_create(
+        (
+            LibraryEntry(
+                user_id=user_ids[f"{prefix}{u}"],
+                external_game_id=f"game-{i}",
+                status=STATUSES[i % len(STATUSES)],
+                hours_played=(u * 7 + i) % 500,
+            )
+            for u in range(users) for i in range(entries)
+        ),
+        batch_size=5000,
+    )
+    result = []
+    for u in range(users):
+        ids = LibraryEntry.objects.filter(user_id=user_ids[f"{prefix}{u}"]).order_by("id").values_list("id", flat=True)
+        result.append((f"{prefix}{u}", list(ids[:IDS_PER_USER])))
+    return result
+
+
+def make_step(accounts, mix, seed_value, prefix):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    def step(client, i):
+        state = client.state
+        operation = state["random"].choices(names, weights)[0]
+        state["counter"] += 1
+        tag = f"{i}-{state['counter']}"
+        if operation == "register":
+            status, _ = client.request("POST", "/api/register/", {"username": f"{prefix}new-{tag}", "password": PASSWORD})
+        elif operation == "login":
+            status, _ = client.request("POST", "/api/auth/login/", {"username": state["username"], "password": PASSWORD})
+        elif operation == "me":
+            status, _ = client.request("GET", "/api/users/me/")
+        elif operation == "list":
+            status, _ = client.request("GET", "/api/library/entries/?limit=50")
+        elif operation == "create":
+            status, data = client.request("POST", "/api/library/entries/", {
+                "external_game_id": f"lt-{tag}",
+                "status": state["random"].choice(STATUSES),
+                "hours_played": state["random"].randrange(500),
+            })
+            if status == 201 and data:
+                state["ids"].append(data["id"])
+        elif not state["ids"]:
+            status, _ = client.request("GET", "/api/library/entries/?limit=50")
+            operation = "list"
+        elif operation == "detail":
+            status, _ = client.request("GET", f"/api/library/entries/{state['random'].choice(state['ids'])}/")
+        else:
+            status, _ = client.request("PATCH", f"/api/library/entries/{state['random'].choice(state['ids'])}/", {
+                "status": state["random"].choice(STATUSES),
+                "hours_played": state["random"].randrange(500),
+            })
+        return ENDPOINTS[operation], status
+
+    def make_client(base_url, i):
+        username, ids = accounts[i % len(accounts)]
+        client = _http.Client(base_url)
+        client.login(username, PASSWORD)
+        client.state = {"random": random.Random(seed_value * 100_003 + i), "counter": 0, "username": username, "ids": list(ids)}
+        return client
+
+    return step, make_client
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result, baseline, max_regression):
+    """Endpoints cuyo p95 ha empeorado más de max_regression % respecto a baseline."""
+    regressions = []
+    for endpoint, stats in result["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before or not before.get("p95_ms") or stats["p95_ms"] is None:
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        if change > max_regression:
+            regressions.append({"endpoint": endpoint, "p95_ms_before": before["p95_ms"], "p95_ms": stats["p95_ms"], "change_pct": round(change, 1)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=200, help="Entradas por usuario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Pesos de cada operación (por defecto {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--server", choices=("wsgi", "asgi"), default="wsgi")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="Hilos por proceso de gunicorn (WSGI)")
+    parser.add_argument("--base-url", help="Servidor ya arrancado (no se arranca ninguno)")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    parser.add_argument("--baseline", help="Resultado anterior con el que comparar")
+    parser.add_argument("--max-regression", type=float, default=20, help="Empeoramiento máximo del p95 en %% (con --baseline)")
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+    if args.base_url and not args.use_settings_db:
+        parser.error("--base-url necesita --use-settings-db para sembrar la base de datos de ese servidor")
+
+    env = {"DJANGO_SETTINGS_MODULE": "steamlike_backend.settings"}
+    if not args.use_settings_db:
+        env["DJANGO_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="loadtest_"), "db.sqlite3")
+        os.environ["DJANGO_SQLITE_PATH"] = env["DJANGO_SQLITE_PATH"]
+    _django.setup(use_settings_db=True)
+
+    prefix = f"lt{args.seed}_"
+    accounts = seed(prefix, args.users, args.entries)
+    step, make_client = make_step(accounts, args.mix, args.seed, prefix)
+
+    def run(base_url):
+        return _http.run_clients(args.concurrency, args.duration, lambda i: make_client(base_url, i), step)
+
+    if args.base_url:
+        latencies, errors, seconds = run(args.base_url)
+    else:
+        command, server_env = _http.server_command(args.server, args.workers, args.threads)
+        port = _http.free_port()
+        with _http.Server([part.format(port=port) for part in command], port, env={**env, **server_env}) as server:
+            latencies, errors, seconds = run(server.base_url)
+
+    every = [value for values in latencies.values() for value in values]
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "server": args.base_url or args.server,
+            "database": "settings" if args.use_settings_db else "sqlite",
+            "users": args.users,
+            "entries": args.entries,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "total": _http.latency_summary(every, seconds, sum(errors.values())),
+        "endpoints": {
+            endpoint: _http.latency_summary(values, seconds, errors.get(endpoint, 0))
+            for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["regressions"] = compare(result, json.load(f), args.max_regression)
+        exit_code = 1 if result["regressions"] else 0
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Latencia del resto de la API durante una avalancha de logins.
+
+Arranca el proyecto (gunicorn, vistas síncronas) dos veces sobre la misma base
+de datos: con el hash de contraseñas en línea (HASHING_POOL=0) y con el pool
+acotado de users.hashing (HASHING_POOL=1). En cada caso "--storm" clientes
+repiten POST /api/auth/login/ mientras "--probes" clientes con sesión iniciada
+piden /api/health/ y una página del listado. Se compara el p50/p99 de las
+sondas y cuántos logins acaban en 200, 429 o 503.
+
+Los límites por usuario/IP se desactivan para medir solo el pool (todos los
+clientes salen de 127.0.0.1); con --rate-limit se dejan los de settings.py.
+
+    python -m benchmarks.login_storm [--storm 32] [--probes 4] [--duration 10]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks import _django, _http
+
+USERNAME = "bench_storm"
+PASSWORD = "bench-password"
+STORM_USERS = 50
+
+
+def seed(entries):
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from library.models import LibraryEntry
+
+    User.objects.filter(username__startswith=USERNAME).delete()
+    user = User.objects.create_user(username=USERNAME, password=PASSWORD)
+    # Un único hash para todos: sembrar no es lo que se mide
+    encoded = make_password(PASSWORD)
+    User.objects.bulk_create(User(username=f"{USERNAME}_{i}", password=encoded) for i in range(STORM_USERS))
+    LibraryEntry.objects.bulk_create(
+        (LibraryEntry(user=user, external_game_id=f"game-{i}", status="playing", hours_played=i % 500) for i in range(entries)),
+        batch_size=5000,
+    )
+
+
+def make_step(storm):
+    def step(client, i):
+        client.counter = getattr(client, "counter", i) + 1
+        if i < storm:
+            # Mitad de contraseñas correctas y mitad incorrectas: cuesta lo mismo
+            password = PASSWORD if client.counter % 2 else "incorrecta"
+            status, _ = client.request("POST", "/api/auth/login/", {
+                "username": f"{USERNAME}_{client.counter % STORM_USERS}", "password": password,
+            })
+            client.statuses[status] = client.statuses.get(status, 0) + 1
+            # 429/503 son la respuesta esperada bajo presión, no errores del servidor
+            return "POST /api/auth/login/", 200 if status in (429, 503) else status
+        if client.counter % 2:
+            return "GET /api/health/", client.request("GET", "/api/health/")[0]
+        return "GET /api/library/entries/?limit=50", client.request("GET", "/api/library/entries/?limit=50")[0]
+    return step
+
+
+def run(name, env, args):
+    port = _http.free_port()
+    command, server_env = _http.server_command("wsgi", args.workers, args.threads)
+    command = [part.format(port=port) for part in command]
+    with _http.Server(command, port, env={**env, **server_env}) as server:
+        clients = []
+
+        def make_client(i):
+            client = _http.Client(server.base_url)
+            client.statuses = {}
+            if i >= args.storm:
+                client.login(USERNAME, PASSWORD)
+            clients.append(client)
+            return client
+
+        latencies, errors, seconds = _http.run_clients(args.storm + args.probes, args.duration, make_client, make_step(args.storm))
+
+    statuses = {}
+    for client in clients:
+        for status, n in client.statuses.items():
+            statuses[status] = statuses.get(status, 0) + n
+    return {
+        "mode": name,
+        "login_statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "endpoints": {
+            endpoint: _http.latency_summary(values, seconds, errors.get(endpoint, 0))
+            for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storm", type=int, default=32, help="Clientes que solo hacen login")
+    parser.add_argument("--probes", type=int, default=4, help="Clientes que piden health y listado")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2, help="Procesos de gunicorn")
+    parser.add_argument("--threads", type=int, default=16, help="Hilos por proceso de gunicorn")
+    parser.add_argument("--hashing-workers", default="", help="HASHING_WORKERS (por defecto, núcleos)")
+    parser.add_argument("--rate-limit", action="store_true", help="Mantener los límites de login de settings.py")
+    parser.add_argument("--json", action="store_true", help="Resultado en JSON en lugar de tabla")
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+
+    env = {"DJANGO_SETTINGS_MODULE": "steamlike_backend.settings", "REQUEST_TIMING": "0"}
+    if not args.rate_limit:
+        env.update({"LOGIN_RATE_LIMIT_PER_USERNAME": "", "LOGIN_RATE_LIMIT_PER_IP": ""})
+    if args.hashing_workers:
+        env["HASHING_WORKERS"] = args.hashing_workers
+    if not args.use_settings_db:
+        env["DJANGO_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_storm_"), "db.sqlite3")
+        os.environ["DJANGO_SQLITE_PATH"] = env["DJANGO_SQLITE_PATH"]
+    _django.setup(use_settings_db=True)
+    seed(args.entries)
+
+    results = [
+        run("en línea", {**env, "HASHING_POOL": "0"}, args),
+        run("pool", {**env, "HASHING_POOL": "1"}, args),
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    rows = []
+    for result in results:
+        for endpoint, stats in result["endpoints"].items():
+            rows.append((result["mode"], endpoint, stats["requests"], stats["errors"], stats["rps"], stats["p50_ms"], stats["p99_ms"]))
+    _django.print_table(rows, ("hash", "endpoint", "peticiones", "errores", "pet/s", "p50 ms", "p99 ms"))
+    for result in results:
+        print(f"{result['mode']}: login -> {result['login_statuses']}")
+
+
+if __name__ == "__main__":
+    main()
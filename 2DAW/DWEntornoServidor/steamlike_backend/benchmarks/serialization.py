@@ -0,0 +1,78 @@
+"""
+Micro-benchmark de la serialización de listados de la biblioteca.
+
+Compara el camino antiguo (instancias del modelo + dict literal por fila) con
+el actual (values_list + library.serializers) midiendo tiempo por fila y
+memoria asignada (pico de tracemalloc) para 10k y 100k filas.
+
+    python -m benchmarks.serialization [--rows 10000 100000] [--repeat 5]
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks import _django
+
+
+def legacy_rows(queryset):
+    return [
+        {
+            "id": e.id,
+            "external_game_id": e.external_game_id,
+            "status": e.status,
+            "hours_played": e.hours_played
+        } for e in queryset
+    ]
+
+
+def current_rows(queryset):
+    from library.serializers import entry_rows, rows_to_dicts
+    return rows_to_dicts(entry_rows(queryset))
+
+
+def measure(func, queryset, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(queryset.all())
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(queryset.all())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    _django.add_db_argument(parser)
+    args = parser.parse_args()
+
+    _django.setup(args.use_settings_db)
+    from django.contrib.auth.models import User
+    from library.models import LibraryEntry
+
+    results = []
+    for n in args.rows:
+        user, _ = User.objects.get_or_create(username=f"bench_serialization_{n}")
+        LibraryEntry.objects.filter(user=user).delete()
+        LibraryEntry.objects.bulk_create(
+            (LibraryEntry(user=user, external_game_id=f"game-{i}", status="playing", hours_played=i % 500) for i in range(n)),
+            batch_size=5000,
+        )
+        queryset = LibraryEntry.objects.filter(user=user)
+
+        for name, func in (("instancias", legacy_rows), ("values_list", current_rows)):
+            seconds, peak = measure(func, queryset, args.repeat)
+            results.append((n, name, f"{seconds * 1000:.1f}", f"{seconds / n * 1e6:.2f}", f"{peak / n:.0f}"))
+
+        LibraryEntry.objects.filter(user=user).delete()
+
+    _django.print_table(results, ("filas", "método", "total ms", "µs/fila", "bytes/fila (pico)"))
+
+
+if __name__ == "__main__":
+    main()
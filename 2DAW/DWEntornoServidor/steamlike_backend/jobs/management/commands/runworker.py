@@ -0,0 +1,42 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los trabajos en segundo plano de la cola (tabla Job). "
+        "Se pueden lanzar varios workers a la vez; SIGINT/SIGTERM terminan los trabajos en curso y salen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.JOBS_WORKER_CONCURRENCY,
+            help="Trabajos a la vez en este worker (un hilo cada uno)",
+        )
+        parser.add_argument("--queue", action="append", dest="queues", help="Solo estas colas (se puede repetir)")
+        parser.add_argument("--poll-interval", type=float, default=settings.JOBS_POLL_INTERVAL)
+        parser.add_argument("--burst", action="store_true", help="Salir cuando no queden trabajos listos")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency debe ser mayor que 0")
+        worker = Worker(options["concurrency"], options["queues"], options["poll_interval"])
+
+        def stop(signum, frame):
+            self.stderr.write("Parando: se terminan los trabajos en curso...")
+            worker.stop()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                signal.signal(signum, stop)
+            except ValueError:  # fuera del hilo principal (p. ej. call_command en un hilo)
+                pass
+
+        if options["verbosity"] >= 1:
+            self.stderr.write(f"Worker {worker.name}: concurrencia {worker.concurrency}, colas {worker.queues or 'todas'}")
+        processed = worker.run(burst=options["burst"])
+        if options["verbosity"] >= 1:
+            self.stdout.write(self.style.SUCCESS(f"Trabajos ejecutados: {processed}"))
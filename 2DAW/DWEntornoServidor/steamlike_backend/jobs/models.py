@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano (jobs.queue). Lo crea enqueue() y lo ejecuta el
+    primer worker (manage.py runworker) que lo reclama cuando llega su run_at.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    name = models.CharField(max_length=100)
+    queue = models.CharField(max_length=50, default="default")
+    payload = models.JSONField(default=dict, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        db_index=False,   # lo cubre el índice (user, id)
+    )
+    status = models.CharField(max_length=20, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Búsqueda de trabajos pendientes de los workers: solo los que esperan
+            models.Index(
+                fields=["queue", "run_at"], name="jobs_job_queued_idx",
+                condition=models.Q(status="queued"),
+            ),
+            # Trabajos en curso, para recuperar los de workers caídos
+            models.Index(
+                fields=["locked_at"], name="jobs_job_running_idx",
+                condition=models.Q(status="running"),
+            ),
+            # Listado de trabajos de cada usuario
+            models.Index(fields=["user", "id"], name="jobs_job_user_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
@@ -0,0 +1,157 @@
+"""
+Cola de trabajos en segundo plano sobre la propia base de datos, sin broker.
+
+Las tareas se registran con @task("nombre") (en el tasks.py de cada app) y se
+encolan con enqueue("nombre", payload): una fila Job. Los workers
+(manage.py runworker) las reclaman con claim() y las ejecutan con run_job():
+
+- En PostgreSQL el reclamo es un SELECT ... FOR UPDATE SKIP LOCKED: varios
+  workers no se bloquean entre sí ni se llevan el mismo trabajo.
+- Sin SKIP LOCKED (SQLite) cada candidato se reclama con un UPDATE condicionado
+  al estado que se leyó; si otro worker se adelantó no afecta a ninguna fila.
+
+Si una tarea falla y le quedan intentos vuelve a la cola con espera
+exponencial (con jitter). Un trabajo "running" cuyo worker deja de renovar
+locked_at durante JOBS_LOCK_TIMEOUT segundos se considera abandonado y se
+vuelve a reclamar.
+"""
+import logging
+import random
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from jobs.models import Job
+
+logger = logging.getLogger("steamlike.jobs")
+
+Task = namedtuple("Task", ["func", "queue", "max_attempts"])
+
+_tasks = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(name, queue="default", max_attempts=None):
+    """
+    Registra una función como tarea. Se llama con el payload como argumentos
+    con nombre y lo que devuelva (serializable a JSON) se guarda en Job.result.
+    """
+    def decorator(func):
+        _tasks[name] = Task(func, queue, max_attempts)
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise UnknownTask(f"Tarea desconocida: {name}") from None
+
+
+def enqueue(name, payload=None, user=None, run_at=None, queue=None, max_attempts=None):
+    """Crea el trabajo y lo devuelve. Un worker lo ejecutará a partir de run_at."""
+    registered = get_task(name)
+    return Job.objects.create(
+        name=name,
+        queue=queue or registered.queue,
+        payload=payload or {},
+        user=user,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or registered.max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """Segundos de espera antes del siguiente intento (exponencial, con jitter)."""
+    delay = min(settings.JOBS_RETRY_MAX_DELAY, settings.JOBS_RETRY_DELAY * 2 ** max(attempts - 1, 0))
+    # El jitter reparte en el tiempo los reintentos de muchos fallos a la vez
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim(worker, limit, queues=None):
+    """
+    Reclama hasta limit trabajos listos para ejecutarse (los más antiguos
+    primero) para el worker indicado y los devuelve.
+    """
+    if limit < 1:
+        return []
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    ready = Job.objects.filter(
+        Q(status=Job.STATUS_QUEUED, run_at__lte=now) | Q(status=Job.STATUS_RUNNING, locked_at__lt=stale)
+    ).order_by("run_at", "id")
+    if queues:
+        ready = ready.filter(queue__in=queues)
+    claimed = {"status": Job.STATUS_RUNNING, "locked_by": worker, "locked_at": now, "attempts": F("attempts") + 1}
+
+    connection = connections[Job.objects.db]
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(ready.select_for_update(skip_locked=True).values_list("id", flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claimed)
+    else:
+        ids = []
+        for candidate in ready.values("id", "status", "locked_at")[:limit]:
+            if Job.objects.filter(**candidate).update(**claimed):
+                ids.append(candidate["id"])
+    return list(Job.objects.filter(id__in=ids).order_by("run_at", "id"))
+
+
+def heartbeat(worker, job_ids):
+    """Renueva locked_at de los trabajos en curso del worker para que no se den por abandonados."""
+    if job_ids:
+        Job.objects.filter(id__in=job_ids, status=Job.STATUS_RUNNING, locked_by=worker).update(locked_at=timezone.now())
+
+
+def run_job(job):
+    """
+    Ejecuta un trabajo reclamado y guarda el resultado: terminado, fallido o de
+    vuelta en la cola si le quedan intentos. Devuelve el estado final.
+    """
+    retry = False
+    try:
+        if job.attempts > job.max_attempts:
+            # Reclamado otra vez tras caerse el worker en el último intento
+            raise RuntimeError("El worker se detuvo durante el último intento")
+        result = get_task(job.name).func(**job.payload)
+    except Exception as e:
+        retry = job.attempts < job.max_attempts and not isinstance(e, UnknownTask)
+        logger.warning("Trabajo %s #%s fallido (intento %s de %s)", job.name, job.id, job.attempts, job.max_attempts, exc_info=True)
+        update = {"error": traceback.format_exc()}
+        if retry:
+            update.update(
+                status=Job.STATUS_QUEUED, locked_by="", locked_at=None,
+                run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+            )
+        else:
+            update.update(status=Job.STATUS_FAILED, finished_at=timezone.now())
+    else:
+        update = {"status": Job.STATUS_SUCCEEDED, "result": result, "error": "", "finished_at": timezone.now()}
+
+    # Solo si el trabajo sigue siendo de este worker (no se ha dado por abandonado)
+    Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, locked_by=job.locked_by).update(**update)
+    return update["status"]
+
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "name": job.name,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": job.run_at,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "result": job.result,
+        # Del traceback solo la última línea (la excepción)
+        "error": job.error.strip().splitlines()[-1] if job.error else None,
+    }
@@ -0,0 +1,201 @@
+import io
+import json
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from jobs import queue
+from jobs.models import Job
+from library.models import LibraryEntry, LibraryImport, LibrarySummary
+
+CALLS = []
+
+
+@queue.task("tests.add")
+def add(a, b):
+    CALLS.append((a, b))
+    return {"sum": a + b}
+
+
+@queue.task("tests.flaky", max_attempts=2)
+def flaky(fail_times):
+    CALLS.append(fail_times)
+    if len(CALLS) <= fail_times:
+        raise ValueError("fallo temporal")
+    return "ok"
+
+
+def run_worker(**options):
+    call_command("runworker", burst=True, concurrency=1, stdout=io.StringIO(), stderr=io.StringIO(), **options)
+
+
+@override_settings(JOBS_RETRY_DELAY=10, JOBS_RETRY_MAX_DELAY=60, JOBS_LOCK_TIMEOUT=300)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        # Precondiciones
+        job = queue.enqueue("tests.add", {"a": 2, "b": 3})
+
+        # Llamada
+        run_worker()
+
+        # Comprobaciones
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), ("succeeded", 1, {"sum": 5}))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(CALLS, [(2, 3)])
+
+    def test_unknown_task_cannot_be_enqueued(self):
+        with self.assertRaises(queue.UnknownTask):
+            queue.enqueue("tests.no_existe")
+
+    def test_future_jobs_wait(self):
+        queue.enqueue("tests.add", {"a": 1, "b": 1}, run_at=timezone.now() + timedelta(minutes=5))
+        run_worker()
+        self.assertEqual(CALLS, [])
+
+    def test_retry_with_backoff_then_success(self):
+        job = queue.enqueue("tests.flaky", {"fail_times": 1})
+
+        with self.assertLogs("steamlike.jobs", "WARNING"):
+            run_worker()
+
+        # Primer intento fallido: vuelve a la cola más tarde (entre 5 y 10 s)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("queued", 1))
+        self.assertIn("fallo temporal", job.error)
+        delay = (job.run_at - timezone.now()).total_seconds()
+        self.assertTrue(3 < delay <= 10, delay)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result, job.error), ("succeeded", 2, "ok", ""))
+
+    def test_fails_when_attempts_run_out(self):
+        job = queue.enqueue("tests.flaky", {"fail_times": 5})
+
+        with self.assertLogs("steamlike.jobs", "WARNING") as logs:
+            run_worker()
+            Job.objects.filter(id=job.id).update(run_at=timezone.now())
+            run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertIn("intento 2 de 2", logs.output[-1])
+        self.assertEqual(queue.job_to_dict(job)["error"], "ValueError: fallo temporal")
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        first = queue.enqueue("tests.add", {"a": 1, "b": 2})
+        second = queue.enqueue("tests.add", {"a": 3, "b": 4})
+
+        claimed = queue.claim("worker-a", 1)
+        other = queue.claim("worker-b", 5)
+
+        self.assertEqual([job.id for job in claimed], [first.id])
+        self.assertEqual([job.id for job in other], [second.id])
+        self.assertEqual(claimed[0].locked_by, "worker-a")
+        self.assertEqual(queue.claim("worker-c", 5), [])
+
+    def test_abandoned_jobs_are_reclaimed(self):
+        job = queue.enqueue("tests.add", {"a": 1, "b": 2})
+        queue.claim("worker-caido", 1)
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(seconds=301))
+
+        run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("succeeded", 2))
+
+    def test_heartbeat_keeps_the_lock(self):
+        job = queue.enqueue("tests.add", {"a": 1, "b": 2})
+        queue.claim("worker-a", 1)
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(seconds=301))
+
+        queue.heartbeat("worker-a", [job.id])
+
+        self.assertEqual(queue.claim("worker-b", 1), [])
+
+    def test_late_result_of_a_reclaimed_job_is_ignored(self):
+        job = queue.enqueue("tests.add", {"a": 1, "b": 2})
+        [stale] = queue.claim("worker-a", 1)
+        Job.objects.filter(id=job.id).update(locked_by="worker-b")
+
+        queue.run_job(stale)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "running")
+
+    def test_queues(self):
+        job = queue.enqueue("tests.add", {"a": 1, "b": 2}, queue="lenta")
+        run_worker(queues=["rapida"])
+        self.assertEqual(Job.objects.get(id=job.id).status, "queued")
+        run_worker(queues=["lenta"])
+        self.assertEqual(Job.objects.get(id=job.id).status, "succeeded")
+
+
+class JobEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="trabajos", password="12345678")
+        self.other = User.objects.create_user(username="otro", password="12345678")
+        self.client.force_login(self.user)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/jobs/").status_code, 401)
+        self.assertEqual(self.client.get("/api/jobs/1/").status_code, 401)
+
+    def test_list_and_detail(self):
+        # Precondiciones
+        mine = queue.enqueue("tests.add", {"a": 1, "b": 2}, user=self.user)
+        other = queue.enqueue("tests.add", {"a": 1, "b": 2}, user=self.other)
+        run_worker()
+
+        # Llamada
+        listed = self.client.get("/api/jobs/?status=succeeded")
+        detail = self.client.get(f"/api/jobs/{mine.id}/")
+
+        # Comprobaciones
+        self.assertEqual([job["id"] for job in listed.json()], [mine.id])
+        self.assertEqual(detail.json()["result"], {"sum": 3})
+        self.assertEqual(self.client.get(f"/api/jobs/{other.id}/").status_code, 404)
+        self.assertEqual(self.client.get("/api/jobs/?status=raro").status_code, 400)
+
+    def test_background_import(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            body = "\n".join(json.dumps(r) for r in [
+                {"external_game_id": "g1", "status": "completed", "hours_played": 7},
+                {"external_game_id": "g2", "status": "nada"},
+            ])
+
+            response = self.client.post("/api/library/import/?background=1", data=body, content_type="application/x-ndjson")
+
+            self.assertEqual(response.status_code, 202)
+            job = response.json()["job"]
+            self.assertEqual((job["name"], job["status"]), ("library.import", "queued"))
+            self.assertEqual(response["Location"], f"/api/jobs/{job['id']}/")
+            self.assertFalse(LibraryEntry.objects.filter(user=self.user).exists())
+
+            run_worker()
+
+            result = self.client.get(f"/api/jobs/{job['id']}/").json()
+            self.assertEqual(result["status"], "succeeded")
+            self.assertEqual((result["result"]["created"], result["result"]["invalid"]), (1, 1))
+            self.assertTrue(LibraryImport.objects.filter(id=result["result"]["id"], user=self.user).exists())
+            self.assertEqual(LibrarySummary.objects.get(user=self.user).total_hours, 7)
+
+    def test_rebuild_summary_in_background(self):
+        LibraryEntry.objects.create(user=self.user, external_game_id="g1", status="playing", hours_played=4)
+        LibrarySummary.objects.filter(user=self.user).update(total_hours=0)
+
+        call_command("rebuild_library_summary", "trabajos", background=True, stdout=io.StringIO())
+        run_worker()
+
+        self.assertEqual(LibrarySummary.objects.get(user=self.user).total_hours, 4)
+        self.assertEqual(Job.objects.get(name="library.rebuild_summary").result, {"written": 1})
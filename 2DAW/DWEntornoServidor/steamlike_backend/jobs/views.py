@@ -0,0 +1,37 @@
+from django.views.decorators.http import require_GET
+from jobs.models import Job
+from jobs.queue import job_to_dict
+from steamlike_backend.codec import JsonResponse
+
+JOB_STATUSES = (Job.STATUS_QUEUED, Job.STATUS_RUNNING, Job.STATUS_SUCCEEDED, Job.STATUS_FAILED)
+JOB_LIST_LIMIT = 50
+
+@require_GET
+def job_list(request):
+    """Últimos trabajos del usuario (?status= para filtrar por estado)."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    jobs = Job.objects.filter(user=request.user)
+    status = request.GET.get("status")
+    if status is not None:
+        if status not in JOB_STATUSES:
+            return JsonResponse({
+                "error": "validation_error",
+                "message": "Parámetros de consulta inválidos",
+                "details": {"status": "Estado no permitido. Los valores permitidos son: " + ", ".join(JOB_STATUSES)}
+            }, status=400)
+        jobs = jobs.filter(status=status)
+    return JsonResponse([job_to_dict(job) for job in jobs.order_by("-id")[:JOB_LIST_LIMIT]], safe=False)
+
+@require_GET
+def job_detail(request, id):
+    """Estado de un trabajo del usuario (los administradores ven todos)."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    jobs = Job.objects.all() if request.user.is_staff else Job.objects.filter(user=request.user)
+    job = jobs.filter(id=id).first()
+    if job is None:
+        return JsonResponse({"error": "not_found", "message": "El trabajo no existe"}, status=404)
+    return JsonResponse(job_to_dict(job))
@@ -0,0 +1,112 @@
+"""
+Bucle del worker de manage.py runworker.
+
+Con concurrency 1 los trabajos se ejecutan en el propio hilo; con más, en un
+pool de ese número de hilos (cada uno con su conexión a la base de datos). El
+worker solo reclama tantos trabajos como hilos libres tiene, así que la
+concurrencia de cada worker es fija y el resto de trabajos espera en la cola
+para otro worker.
+
+Un hilo aparte renueva cada JOBS_LOCK_TIMEOUT / 3 segundos el locked_at de
+los trabajos en curso: así un trabajo largo no se da por abandonado, pero sí
+el de un worker que se ha caído.
+"""
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from jobs import queue
+
+
+def execute(job):
+    # Como en una petición: conexiones caducadas o rotas fuera antes y después
+    close_old_connections()
+    try:
+        return queue.run_job(job)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    def __init__(self, concurrency=1, queues=None, poll_interval=None, name=None):
+        self.concurrency = max(1, concurrency)
+        self.queues = queues or None
+        self.poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processed = 0
+        self._running = set()  # ids de los trabajos en curso
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._finished = threading.Event()
+
+    def stop(self):
+        """Deja de reclamar trabajos; los que están en curso terminan."""
+        self._stopping.set()
+
+    def run(self, burst=False):
+        """
+        Reclama y ejecuta trabajos hasta stop(). Con burst termina en cuanto no
+        queda ninguno listo. Devuelve cuántos ha ejecutado.
+        """
+        self._finished.clear()
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            if self.concurrency == 1:
+                self._run_inline(burst)
+            else:
+                self._run_pool(burst)
+        finally:
+            self._finished.set()
+            heartbeat.join()
+        return self.processed
+
+    def _execute(self, job):
+        with self._lock:
+            self._running.add(job.id)
+        try:
+            return execute(job)
+        finally:
+            with self._lock:
+                self._running.discard(job.id)
+                self.processed += 1
+
+    def _run_inline(self, burst):
+        while not self._stopping.is_set():
+            jobs = queue.claim(self.name, 1, self.queues)
+            if not jobs:
+                if burst:
+                    break
+                self._stopping.wait(self.poll_interval)
+                continue
+            self._execute(jobs[0])
+
+    def _run_pool(self, burst):
+        running = set()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="job") as executor:
+            while not self._stopping.is_set():
+                for job in queue.claim(self.name, self.concurrency - len(running), self.queues):
+                    running.add(executor.submit(self._execute, job))
+                if not running:
+                    if burst:
+                        break
+                    self._stopping.wait(self.poll_interval)
+                    continue
+                # Con todos los hilos ocupados se espera a que acabe alguno
+                timeout = None if len(running) == self.concurrency else self.poll_interval
+                done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            # Parada ordenada: al salir del with se esperan los trabajos en curso
+
+    def _heartbeat(self):
+        interval = settings.JOBS_LOCK_TIMEOUT / 3
+        try:
+            while not self._finished.wait(interval):
+                with self._lock:
+                    job_ids = list(self._running)
+                queue.heartbeat(self.name, job_ids)
+        finally:
+            connection.close()
@@ -0,0 +1,188 @@
+"""
+Registro de actividad de las bibliotecas (LibraryEvent): una fila por alta,
+cambio o borrado de una entrada, solo de inserción.
+
+Las filas se escriben desde record_entry_changes, en la misma transacción que
+el cambio y con un único INSERT (executemany) por llamada: una operación
+masiva o un bloque de importación son un solo viaje a la base de datos.
+
+Las lecturas son por keyset, sin OFFSET ni COUNT:
+- feed de un usuario: índice (user, created_at, id), de lo más reciente a lo
+  más antiguo, con rango de fechas opcional;
+- feed global: por id descendente (la clave primaria), con el rango de fechas
+  sobre created_at (índice BRIN en PostgreSQL: la tabla crece en orden de
+  fecha y el índice ocupa unos pocos KB por cada millón de filas).
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, F, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from library.models import LibraryEntry, LibraryEvent
+from library.pagination import CursorError, decode_cursor, encode_cursor
+
+STATUS_CODES = {status: code for code, status in enumerate(LibraryEntry.ALLOWED_STATUSES, start=1)}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+KIND_NAMES = {
+    LibraryEvent.KIND_CREATED: "created",
+    LibraryEvent.KIND_UPDATED: "updated",
+    LibraryEvent.KIND_DELETED: "deleted",
+}
+
+EVENT_FIELDS = (
+    "id", "user_id", "entry_id", "external_game_id", "kind",
+    "old_status", "new_status", "old_hours", "new_hours", "created_at",
+)
+
+USER_SORT = "-created_at"
+GLOBAL_SORT = "-id"
+
+
+def event_rows(user_id, changes, now):
+    """Cambios (library.changes.EntryChange) -> filas de LibraryEvent, sin los que no cambian nada."""
+    rows = []
+    for change in changes:
+        if change.old_status is None:
+            kind = LibraryEvent.KIND_CREATED
+        elif change.new_status is None:
+            kind = LibraryEvent.KIND_DELETED
+        elif (change.old_status, change.old_hours) == (change.new_status, change.new_hours):
+            continue
+        else:
+            kind = LibraryEvent.KIND_UPDATED
+        rows.append((
+            user_id, change.entry_id, str(change.external_game_id), kind,
+            STATUS_CODES.get(change.old_status), STATUS_CODES.get(change.new_status),
+            change.old_hours, change.new_hours, now,
+        ))
+    return rows
+
+
+def record_activity(user_id, changes):
+    """Añade los eventos de una lista de cambios. Debe ir en la transacción del cambio."""
+    if not settings.LIBRARY_ACTIVITY_LOG:
+        return
+    connection = connections[LibraryEvent.objects.db]
+    rows = event_rows(user_id, changes, timezone.now())
+    if not rows:
+        return
+    fields = EVENT_FIELDS[1:]
+    if connection.vendor not in ("postgresql", "sqlite"):
+        LibraryEvent.objects.bulk_create([LibraryEvent(**dict(zip(fields, row))) for row in rows])
+        return
+
+    meta = LibraryEvent._meta
+    qn = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        qn(meta.db_table), ", ".join(qn(meta.get_field(f).column) for f in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    created_at = meta.get_field("created_at")
+    rows = [row[:-1] + (created_at.get_db_prep_value(row[-1], connection),) for row in rows]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def prune_events(before, batch_size=10_000):
+    """
+    Borra los eventos anteriores a before por bloques de ids (cada bloque es
+    un DELETE por rango de la clave primaria). Devuelve cuántos ha borrado.
+    """
+    boundary = (
+        LibraryEvent.objects.filter(created_at__lt=before)
+        .order_by("-created_at", "-id").values_list("id", flat=True).first()
+    )
+    if boundary is None:
+        return 0
+    deleted = 0
+    start = LibraryEvent.objects.aggregate(first=Min("id"))["first"]
+    while start is not None and start <= boundary:
+        end = min(start + batch_size - 1, boundary)
+        deleted += LibraryEvent.objects.filter(id__gte=start, id__lte=end).delete()[0]
+        start = end + 1
+    return deleted
+
+
+def parse_time(raw, field, end=False):
+    """
+    Fecha (2026-01-31) o fecha y hora ISO 8601 de ?since= / ?until=. Una fecha
+    sola en until incluye el día entero. Sin zona horaria se toma UTC.
+    """
+    if raw in (None, ""):
+        return None
+    try:
+        day = parse_date(raw)
+        value = datetime.combine(day + timedelta(days=1) if end else day, time.min) if day else parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise CursorError("Debe ser una fecha o fecha y hora ISO 8601", field)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def time_range(queryset, params):
+    since = parse_time(params.get("since"), "since")
+    until = parse_time(params.get("until"), "until", end=True)
+    if since and until and since >= until:
+        raise CursorError("Debe ser anterior a until", "since")
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    if until:
+        queryset = queryset.filter(created_at__lt=until)
+    return queryset
+
+
+def feed_page(queryset, sort, limit, cursor):
+    """
+    Una página del feed (de lo más reciente a lo más antiguo) y el cursor de
+    la siguiente. sort es USER_SORT (created_at, id) o GLOBAL_SORT (id).
+    """
+    if cursor:
+        cursor_sort, value, last_id, _ = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise CursorError("Cursor inválido")
+        if sort == USER_SORT:
+            moment = parse_datetime(value) if isinstance(value, str) else None
+            if moment is None:
+                raise CursorError("Cursor inválido")
+            queryset = queryset.filter(Q(created_at__lt=moment) | Q(created_at=moment, id__lt=last_id))
+        else:
+            queryset = queryset.filter(id__lt=last_id)
+
+    ordering = ("-created_at", "-id") if sort == USER_SORT else ("-id",)
+    rows = list(queryset.order_by(*ordering).values_list(*EVENT_FIELDS)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip(EVENT_FIELDS, rows[-1]))
+        value = last["created_at"].isoformat() if sort == USER_SORT else None
+        next_cursor = encode_cursor(sort, value, last["id"], "n")
+    return [event_to_dict(row) for row in rows], next_cursor
+
+
+def event_to_dict(row):
+    event = dict(zip(EVENT_FIELDS, row))
+    event["kind"] = KIND_NAMES.get(event["kind"])
+    event["old_status"] = STATUS_NAMES.get(event["old_status"])
+    event["new_status"] = STATUS_NAMES.get(event["new_status"])
+    return event
+
+
+def hours_trend(queryset):
+    """
+    Horas jugadas añadidas por día: new_hours - old_hours de las altas y los
+    cambios (los borrados no restan). Agregado en la base de datos.
+    """
+    rows = (
+        queryset.exclude(kind=LibraryEvent.KIND_DELETED)
+        .annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(hours=Sum(F("new_hours") - Coalesce(F("old_hours"), Value(0))), events=Count("id"))
+        .order_by("day")
+    )
+    return [{"day": row["day"].isoformat(), "hours": row["hours"] or 0, "events": row["events"]} for row in rows]
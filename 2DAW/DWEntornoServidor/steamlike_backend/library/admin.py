@@ -1,8 +1,60 @@
 from django.contrib import admin
-from .models import LibraryEntry
+from django.db import transaction
+from .changes import EntryChange, deleted, record_entry_changes
+from .models import Game, LibraryEntry
 
 @admin.register(LibraryEntry)
 class LibraryEntryAdmin(admin.ModelAdmin):
     list_display = ("external_game_id", "status", "hours_played")
     search_fields = ("external_game_id",)
     list_filter = ("status",)
+
+    # Las ediciones desde el admin pasan por el mismo registro de cambios que la API
+    # (versión de la biblioteca y contadores)
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old = None
+            if change:
+                old = LibraryEntry.objects.select_for_update().only(
+                    "user_id", "external_game_id", "status", "hours_played"
+                ).get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+
+            if old is not None and old.user_id != obj.user_id:
+                # Cambio de dueño: sale de una biblioteca y entra en otra
+                record_entry_changes(old.user_id, [deleted(old)])
+                old = None
+            changes = []
+            if old is not None and old.external_game_id != obj.external_game_id:
+                # Cambio de juego: los contadores por juego restan del antiguo y suman al nuevo
+                changes.append(deleted(old))
+                old = None
+            changes.append(EntryChange(
+                obj.id, obj.external_game_id,
+                old.status if old else None, old.hours_played if old else None,
+                obj.status, obj.hours_played
+            ))
+            record_entry_changes(obj.user_id, changes)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            # El cambio se construye antes de borrar: después obj.id es None
+            change = deleted(obj)
+            super().delete_model(request, obj)
+            record_entry_changes(obj.user_id, [change])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            by_user = {}
+            for entry in queryset.only("id", "user_id", "external_game_id", "status", "hours_played"):
+                by_user.setdefault(entry.user_id, []).append(deleted(entry))
+            super().delete_queryset(request, queryset)
+            for user_id, changes in by_user.items():
+                record_entry_changes(user_id, changes)
+
+
+@admin.register(Game)
+class GameAdmin(admin.ModelAdmin):
+    list_display = ("external_id", "title", "fetched_at")
+    search_fields = ("external_id", "title")
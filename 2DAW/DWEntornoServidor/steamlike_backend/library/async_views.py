@@ -0,0 +1,131 @@
+"""
+Versiones asíncronas de las vistas de biblioteca, para servir la API con ASGI
+(ver API_ASYNC_VIEWS en settings.py). Responden exactamente igual que las de
+library.views.
+
+Las lecturas usan el ORM asíncrono (aget, afirst, async for). Las escrituras
+tienen que ir en la misma transacción que el registro de cambios, y Django no
+tiene transacciones asíncronas: se ejecutan enteras con sync_to_async, una
+sola vuelta al hilo del ORM por petición.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from library.cache import async_cached_library_response
+from library.filters import apply_list_filters, parse_expand
+from library.models import LibraryEntry
+from library.pagination import sort_ordering
+from library.serializers import ENTRY_FIELDS, entry_rows, entry_to_dict, rows_to_dicts
+from library.streaming import aiter_entry_rows, ajson_array_stream, andjson_stream
+from library.versioning import async_library_condition
+from library.views import (
+    create_entry, list_entries_page, list_results, patch_body_error, update_entry, validate_entry_data,
+)
+from steamlike_backend.aio import resolve_user
+from steamlike_backend.codec import JsonResponse, get_json_request
+
+ASYNC_STREAM_FORMATS = {
+    "ndjson": (andjson_stream, "application/x-ndjson"),
+    "json": (ajson_array_stream, "application/json"),
+}
+
+def stream_entries(request, entries):
+    mode = request.GET.get("stream")
+    if mode not in ASYNC_STREAM_FORMATS:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {"stream": "Formato no permitido. Los valores permitidos son: " + ", ".join(ASYNC_STREAM_FORMATS)}
+        }, status=400)
+
+    encoder, content_type = ASYNC_STREAM_FORMATS[mode]
+    if request.GET.get("sort"):
+        entries = entries.order_by(*sort_ordering(request.GET["sort"]))
+    rows = aiter_entry_rows(entries, settings.LIBRARY_STREAM_CHUNK_SIZE)
+    return StreamingHttpResponse(encoder(rows), content_type=content_type, status=200)
+
+@require_http_methods(["GET", "POST"])
+@csrf_exempt
+@resolve_user
+@async_library_condition
+@async_cached_library_response
+async def add_library_entry(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    if request.method == "POST":
+        data = get_json_request(request)
+        errores_dict = validate_entry_data(data)
+        if errores_dict:
+            return JsonResponse({
+                "error": "validation_error",
+                "message": "Datos de entrada inválidos",
+                "details": errores_dict
+            }, status=400)
+        try:
+            entry = await sync_to_async(create_entry)(
+                request.user, data.get("external_game_id"), data.get("status"), data.get("hours_played", 0)
+            )
+        except IntegrityError:
+            return JsonResponse({
+                "error": "duplicate_entry",
+                "message": "El juego ya existe en tu biblioteca",
+                "details": {"external_game_id": "duplicate"}
+            }, status=400)
+        return JsonResponse(entry_to_dict(entry), status=201)
+
+    entries = LibraryEntry.objects.filter(user=request.user)
+    entries, errores_dict = apply_list_filters(entries, request.GET)
+    if errores_dict:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": errores_dict
+        }, status=400)
+
+    if "stream" in request.GET:
+        return stream_entries(request, entries)
+
+    if "limit" in request.GET or "cursor" in request.GET or not settings.LIBRARY_LEGACY_LIST:
+        # Una página es una sola consulta: se reutiliza la vista síncrona tal cual
+        return await sync_to_async(list_entries_page)(request, entries)
+
+    if request.GET.get("sort"):
+        entries = entries.order_by(*sort_ordering(request.GET["sort"]))
+
+    rows = [row async for row in entry_rows(entries)]
+    if "game" in parse_expand(request.GET):
+        # El cliente del catálogo es síncrono (ORM y urllib)
+        return JsonResponse(await sync_to_async(list_results)(request, rows), status=200, safe=False)
+    return JsonResponse(rows_to_dicts(rows), status=200, safe=False)
+
+@require_http_methods(["GET", "PATCH"])
+@csrf_exempt
+@resolve_user
+@async_library_condition
+@async_cached_library_response
+async def library_entry_detail(request, id):
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    try:
+        entry = await LibraryEntry.objects.only(*ENTRY_FIELDS).aget(id=id, user=request.user)
+    except LibraryEntry.DoesNotExist:
+        return JsonResponse({
+            "error": "not_found",
+            "message": "La entrada solicitada no existe"
+        }, status=404)
+
+    if request.method == "GET":
+        return JsonResponse(entry_to_dict(entry), status=200)
+
+    data = get_json_request(request)
+    error_response = patch_body_error(data)
+    if error_response is not None:
+        return error_response
+
+    await sync_to_async(update_entry)(request.user, entry, data)
+    return JsonResponse(entry_to_dict(entry), status=200)
@@ -0,0 +1,146 @@
+"""
+Caché de las respuestas GET de la biblioteca (listados y detalle).
+
+La clave lleva el usuario y la versión de su biblioteca (LibraryVersion), que
+ya se lee para el ETag. Toda escritura pasa por record_entry_changes y sube
+la versión en la misma transacción, así que después de una escritura las
+claves antiguas dejan de usarse y nadie tiene que borrarlas: caducan solas.
+La versión se lee antes que las entradas, de modo que una respuesta nunca se
+guarda bajo una versión posterior a los datos que contiene. Las respuestas con
+?expand=game llevan también la generación del catálogo (library.catalog.latest_fetch).
+
+El backend es la caché "library" de CACHES (ver LIBRARY_CACHE en settings.py):
+memoria del proceso, ficheros o Redis.
+"""
+import hashlib
+import threading
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from library.versioning import aget_library_state, get_catalog_state, get_library_state
+
+CACHE_ALIAS = "library"
+HEADER = "X-Library-Cache"
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "too_large": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    """Contadores de este proceso (aciertos, fallos, respuestas guardadas y demasiado grandes)."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        "enabled": bool(settings.LIBRARY_CACHE),
+        "backend": settings.LIBRARY_CACHE or None,
+        **stats,
+        "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else None,
+    }
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def cache_key(request):
+    """
+    Clave de la respuesta, o None si no se puede cachear. Además de la versión
+    lleva su fecha: si la tabla de versiones se vacía o se restaura una copia
+    de la base de datos, la versión puede repetirse, la fecha no.
+    """
+    if (
+        not settings.LIBRARY_CACHE
+        or request.method != "GET"
+        or "stream" in request.GET
+        or not request.user.is_authenticated
+    ):
+        return None
+    state = getattr(request, "_library_state", None)
+    if not state or not state[0]:
+        # Versión 0: la biblioteca nunca ha pasado por record_entry_changes
+        return None
+    version, updated_at = state
+    catalog = get_catalog_state(request)
+    query = urlencode(sorted((k, sorted(v)) for k, v in request.GET.lists()), doseq=True)
+    digest = hashlib.sha1(f"{request.path}?{query}".encode()).hexdigest()
+    return f"{request.user.id}:{version}:{updated_at.timestamp()}:{catalog.timestamp() if catalog else 0}:{digest}"
+
+
+def _hit(entry):
+    content, content_type = entry
+    response = HttpResponse(content, content_type=content_type)
+    response[HEADER] = "hit"
+    return response
+
+
+def _storable(response):
+    if response.status_code != 200 or response.streaming:
+        return None
+    if len(response.content) > settings.LIBRARY_CACHE_MAX_BYTES:
+        _count("too_large")
+        return None
+    return response.content, response["Content-Type"]
+
+
+def cached_library_response(view):
+    """
+    Cachea las respuestas 200 de una vista GET de biblioteca. Va debajo de
+    @condition, que ya ha leído la versión (y responde 304 sin llegar aquí).
+    """
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if request.method == "GET":
+            get_library_state(request)
+        key = cache_key(request)
+        if key is None:
+            return view(request, *args, **kwargs)
+        cache = caches[CACHE_ALIAS]
+        entry = cache.get(key)
+        if entry is not None:
+            _count("hits")
+            return _hit(entry)
+        _count("misses")
+        response = view(request, *args, **kwargs)
+        stored = _storable(response)
+        if stored is not None:
+            cache.set(key, stored, settings.LIBRARY_CACHE_TTL)
+            _count("stores")
+        response[HEADER] = "miss"
+        return response
+    return inner
+
+
+def async_cached_library_response(view):
+    """cached_library_response para vistas asíncronas (debajo de async_library_condition)."""
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method == "GET":
+            await aget_library_state(request)
+        key = cache_key(request)
+        if key is None:
+            return await view(request, *args, **kwargs)
+        cache = caches[CACHE_ALIAS]
+        entry = await cache.aget(key)
+        if entry is not None:
+            _count("hits")
+            return _hit(entry)
+        _count("misses")
+        response = await view(request, *args, **kwargs)
+        stored = _storable(response)
+        if stored is not None:
+            await cache.aset(key, stored, settings.LIBRARY_CACHE_TTL)
+            _count("stores")
+        response[HEADER] = "miss"
+        return response
+    return inner
@@ -0,0 +1,277 @@
+"""
+Datos de los juegos (título, portada) a partir de external_game_id.
+
+Orden de búsqueda de cada id:
+1. Caché en memoria del proceso (LRU con caducidad CATALOG_CACHE_TTL).
+2. Tabla local Game, si la fila es más reciente que CATALOG_REFRESH_AFTER.
+3. Catálogo externo (CATALOG_URL), con una sola petición por cada
+   CATALOG_BATCH_SIZE ids. Lo recibido se guarda en Game y en la caché.
+
+Si varias peticiones piden a la vez un id que no está en caché, solo una lo
+busca y las demás esperan su resultado. Si el catálogo falla se usan las
+filas de Game aunque estén caducadas; los ids sin datos quedan a None.
+
+El fetched_at más reciente de Game (latest_fetch) es la generación del
+catálogo: cambia cada vez que cualquier proceso guarda un juego. Las
+respuestas de biblioteca con ?expand=game la llevan en su ETag y en su clave
+de caché, y al ver una generación nueva se vacía la caché del proceso para no
+servir bajo ella datos anteriores.
+
+El catálogo externo responde a GET <CATALOG_URL>/games?id=<id>&id=<id>... con
+{"games": [{"id": ..., "title": ..., "cover_url": ...}]}; los ids que no
+conoce simplemente no aparecen.
+"""
+import logging
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from library.models import Game
+from steamlike_backend import codec
+
+logger = logging.getLogger("steamlike.catalog")
+
+_MISSING = object()
+
+COVER_URL_MAX_LENGTH = Game._meta.get_field("cover_url").max_length
+
+
+class CatalogError(Exception):
+    pass
+
+
+class TTLCache:
+    """LRU acotado a max_size elementos, cada uno válido durante ttl segundos."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return _MISSING
+            expires, value = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return _MISSING
+            self.data.move_to_end(key)
+            return value
+
+    def set_many(self, values):
+        expires = time.monotonic() + self.ttl
+        with self.lock:
+            for key, value in values.items():
+                self.data[key] = (expires, value)
+                self.data.move_to_end(key)
+            while len(self.data) > self.max_size:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+def game_to_dict(game):
+    return {"id": game.external_id, "title": game.title, "cover_url": game.cover_url}
+
+
+class CatalogClient:
+    def __init__(self, base_url, timeout=2, ttl=300, max_size=10000, batch_size=100, refresh_after=86400):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.refresh_after = refresh_after
+        self.cache = TTLCache(max_size, ttl)
+        self.inflight = {}  # id -> Future de la búsqueda en curso
+        self.lock = threading.Lock()
+        self.generation = None  # última generación del catálogo vista (latest_fetch)
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "remote_calls": 0, "errors": 0}
+
+    def get_many(self, ids):
+        """{id: {"id", "title", "cover_url"} o None} para cada id pedido."""
+        result = {}
+        missing = []
+        for game_id in dict.fromkeys(ids):
+            value = self.cache.get(game_id)
+            if value is _MISSING:
+                missing.append(game_id)
+            else:
+                result[game_id] = value
+        self.stats["hits"] += len(result)
+        if missing:
+            self.stats["misses"] += len(missing)
+            result.update(self._load(missing))
+        return result
+
+    def observe_generation(self, generation):
+        """
+        Vacía la caché si la tabla Game tiene juegos guardados después de la
+        última generación vista (por este u otro proceso).
+        """
+        with self.lock:
+            if self.generation is not None and generation <= self.generation:
+                return
+            self.generation = generation
+        self.cache.clear()
+
+    def _load(self, ids):
+        own, waiting = {}, {}
+        with self.lock:
+            for game_id in ids:
+                future = self.inflight.get(game_id)
+                if future is None:
+                    own[game_id] = self.inflight[game_id] = Future()
+                else:
+                    waiting[game_id] = future
+        self.stats["coalesced"] += len(waiting)
+
+        result = {}
+        if own:
+            try:
+                result, cacheable = self._fetch(list(own))
+                self.cache.set_many(cacheable)
+            finally:
+                with self.lock:
+                    for game_id in own:
+                        self.inflight.pop(game_id, None)
+                for game_id, future in own.items():
+                    future.set_result(result.get(game_id))
+        for game_id, future in waiting.items():
+            result[game_id] = future.result()
+        return result
+
+    def _fetch(self, ids):
+        """
+        Busca en Game y, lo que falte o esté caducado, en el catálogo externo.
+        Devuelve (resultado, lo que se puede cachear).
+        """
+        rows = {game.external_id: game for game in Game.objects.filter(external_id__in=ids)}
+        if not self.base_url:
+            result = {game_id: game_to_dict(rows[game_id]) if game_id in rows else None for game_id in ids}
+            return result, result
+
+        fresh_since = timezone.now() - timedelta(seconds=self.refresh_after)
+        result = {game_id: game_to_dict(game) for game_id, game in rows.items() if game.fetched_at >= fresh_since}
+        pending = [game_id for game_id in ids if game_id not in result]
+        failed = []
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            try:
+                games = self._request(batch)
+            except CatalogError as e:
+                self.stats["errors"] += 1
+                logger.warning("Catálogo de juegos no disponible: %s", e)
+                failed.extend(batch)
+                continue
+            self._store(games)
+            result.update({game.external_id: game_to_dict(game) for game in games})
+            # Los que el catálogo no conoce también se cachean (a None)
+            result.update({game_id: None for game_id in batch if game_id not in result})
+
+        cacheable = dict(result)
+        for game_id in failed:
+            # Sin catálogo se sirve la copia local aunque esté caducada, pero no se cachea
+            result[game_id] = game_to_dict(rows[game_id]) if game_id in rows else None
+        return result, cacheable
+
+    def _request(self, ids):
+        url = f"{self.base_url}/games?{urlencode({'id': ids}, doseq=True)}"
+        self.stats["remote_calls"] += 1
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                data = codec.loads(response.read())
+        except (OSError, ValueError) as e:
+            raise CatalogError(str(e)) from e
+
+        now = timezone.now()
+        wanted = set(ids)
+        games = {}
+        for item in data.get("games", []) if isinstance(data, dict) else []:
+            if not isinstance(item, dict) or item.get("id") not in wanted or not isinstance(item.get("title"), str):
+                continue
+            # Una portada que no es una cadena o no cabe en la columna se descarta:
+            # una URL recortada (firmada, de CDN...) tampoco serviría
+            cover_url = item.get("cover_url")
+            if not isinstance(cover_url, str) or len(cover_url) > COVER_URL_MAX_LENGTH:
+                cover_url = ""
+            games[item["id"]] = Game(
+                external_id=item["id"],
+                title=item["title"][:255],
+                cover_url=cover_url,
+                fetched_at=now,
+            )
+        return list(games.values())
+
+    def _store(self, games):
+        if games:
+            Game.objects.bulk_create(
+                games,
+                update_conflicts=True,
+                unique_fields=["external_id"],
+                update_fields=["title", "cover_url", "fetched_at"],
+            )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Cliente del proceso, creado la primera vez con la configuración de settings."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = CatalogClient(
+                    settings.CATALOG_URL,
+                    timeout=settings.CATALOG_TIMEOUT,
+                    ttl=settings.CATALOG_CACHE_TTL,
+                    max_size=settings.CATALOG_CACHE_SIZE,
+                    batch_size=settings.CATALOG_BATCH_SIZE,
+                    refresh_after=settings.CATALOG_REFRESH_AFTER,
+                )
+    return _client
+
+
+def reset_client():
+    """Descarta el cliente actual y su caché (tests o cambio de configuración)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def latest_fetch():
+    """
+    Generación del catálogo: el fetched_at más reciente de Game (None si está
+    vacía). Es una búsqueda en el índice de fetched_at.
+    """
+    latest = Game.objects.aggregate(latest=Max("fetched_at"))["latest"]
+    if latest is not None:
+        get_client().observe_generation(latest)
+    return latest
+
+
+async def alatest_fetch():
+    latest = (await Game.objects.aaggregate(latest=Max("fetched_at")))["latest"]
+    if latest is not None:
+        get_client().observe_generation(latest)
+    return latest
+
+
+def expand_games(items):
+    """Añade "game" a cada dict de entrada con una sola búsqueda para toda la lista."""
+    games = get_client().get_many(str(item["external_game_id"]) for item in items)
+    for item in items:
+        item["game"] = games.get(str(item["external_game_id"]))
+    return items
@@ -0,0 +1,35 @@
+from collections import namedtuple
+from library.activity import record_activity
+from library.game_stats import record_game_stats
+from library.summary import apply_summary_delta, summary_delta
+from library.versioning import bump_library_version
+
+# Un cambio sobre una entrada. En un alta los campos "old_*" son None y en un
+# borrado lo son los "new_*".
+EntryChange = namedtuple(
+    "EntryChange",
+    ["entry_id", "external_game_id", "old_status", "old_hours", "new_status", "new_hours"],
+)
+
+
+def created(entry):
+    return EntryChange(entry.id, entry.external_game_id, None, None, entry.status, entry.hours_played)
+
+
+def deleted(entry):
+    return EntryChange(entry.id, entry.external_game_id, entry.status, entry.hours_played, None, None)
+
+
+def record_entry_changes(user_id, changes):
+    """
+    Punto único por el que pasan todas las escrituras sobre la biblioteca de un
+    usuario (API, operaciones masivas y admin). Debe llamarse dentro de la misma
+    transacción que la escritura: actualiza la versión, los contadores y las
+    estadísticas globales de los juegos, y añade los eventos de actividad.
+    """
+    if user_id is None or not changes:
+        return
+    bump_library_version(user_id)
+    apply_summary_delta(user_id, summary_delta(changes))
+    record_game_stats(changes)
+    record_activity(user_id, changes)
@@ -0,0 +1,134 @@
+"""
+Exportación de la biblioteca completa en CSV o NDJSON, opcionalmente en gzip.
+
+Las filas salen de un cursor del lado del servidor como tuplas, de
+chunk_size en chunk_size, y se escriben por trozos, así que la memoria no
+depende del tamaño de la exportación. Lo usan las vistas de exportación y el
+comando export_library.
+"""
+import csv
+import io
+import zlib
+from datetime import timezone as dt_timezone
+
+from django.db import connections
+from django.db.models import Max, Min
+from django.db.models.functions import Coalesce
+from library.models import LibraryEntry
+from library.streaming import BUFFER_SIZE
+from steamlike_backend.codec import dumps
+
+# Exportación de un usuario y exportación de todos (admin), en este orden de columnas
+EXPORT_FIELDS = ("id", "external_game_id", "status", "hours_played", "updated_at")
+ADMIN_EXPORT_FIELDS = ("user_id",) + EXPORT_FIELDS
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def export_queryset(user=None, user_min=None, user_max=None):
+    """
+    Entradas de un usuario, o de todos los usuarios con id entre user_min y
+    user_max (ambos incluidos). El orden (user, id) es el del índice compuesto.
+    """
+    entries = LibraryEntry.objects.all()
+    if user is not None:
+        return entries.filter(user=user).order_by("id")
+    entries = entries.filter(user__isnull=False)
+    if user_min is not None:
+        entries = entries.filter(user_id__gte=user_min)
+    if user_max is not None:
+        entries = entries.filter(user_id__lte=user_max)
+    return entries.order_by("user_id", "id")
+
+
+def export_chunks(queryset, fields, chunk_size):
+    """
+    Listas de hasta chunk_size tuplas con "fields", leídas con el cursor del
+    lado del servidor de Django (connection.chunked_cursor, el mismo que usa
+    QuerySet.iterator) pero sin sus conversores fila a fila: las fechas se
+    pasan aquí a texto ISO 8601 en UTC de una vez. Es el paso más caro de la
+    exportación si se deja a values_list().
+    """
+    sql, params = queryset.values_list(*fields).query.get_compiler(queryset.db).as_sql()
+    date_index = fields.index("updated_at") if "updated_at" in fields else None
+    with connections[queryset.db].chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            if date_index is not None:
+                rows = [(*row[:date_index], _isoformat(row[date_index]), *row[date_index + 1:]) for row in rows]
+            yield rows
+
+
+def _isoformat(value):
+    if value is None or isinstance(value, str):
+        return value
+    if value.tzinfo is None:
+        # SQLite guarda las fechas sin zona, en UTC (USE_TZ)
+        return value.isoformat() + "+00:00"
+    return value.astimezone(dt_timezone.utc).isoformat()
+
+
+def user_id_ranges(partitions, queryset=None):
+    """
+    Divide el rango de ids de usuario con entradas en "partitions" tramos
+    contiguos [(desde, hasta), ...] del mismo ancho.
+    """
+    queryset = queryset if queryset is not None else LibraryEntry.objects.filter(user__isnull=False)
+    bounds = queryset.aggregate(low=Coalesce(Min("user_id"), 0), high=Coalesce(Max("user_id"), 0))
+    low, high = bounds["low"], bounds["high"]
+    if not high:
+        return []
+    width = max(1, -(-(high - low + 1) // partitions))
+    return [(start, min(start + width - 1, high)) for start in range(low, high + 1, width)]
+
+
+def csv_stream(chunks, fields):
+    """Cabecera y una línea por fila."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(fields)
+    for rows in chunks:
+        writer.writerows(rows)
+        if buffer.tell() >= BUFFER_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_export_stream(chunks, fields):
+    """Un objeto JSON por línea, con las mismas claves que las columnas del CSV."""
+    for rows in chunks:
+        yield b"".join([dumps(dict(zip(fields, row))) + b"\n" for row in rows])
+
+
+ENCODERS = {
+    "csv": csv_stream,
+    "ndjson": ndjson_export_stream,
+}
+
+
+def gzip_stream(chunks, level=6):
+    """Comprime al vuelo: cada trozo sale en cuanto zlib tiene datos que soltar."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = cabecera gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(queryset, fields, fmt, chunk_size, gzip_level=None):
+    """Trozos de bytes de la exportación en "fmt"; con gzip_level, comprimidos."""
+    chunks = ENCODERS[fmt](export_chunks(queryset, fields, chunk_size), fields)
+    if gzip_level is not None:
+        chunks = gzip_stream(chunks, gzip_level)
+    return chunks
+
+
+def export_filename(name, fmt, gzip=False):
+    return f"{name}.{FORMATS[fmt][1]}" + (".gz" if gzip else "")
@@ -0,0 +1,63 @@
+from library.models import LibraryEntry
+from library.pagination import CursorError, parse_sort
+
+# Datos relacionados que se pueden añadir a cada entrada con ?expand=
+EXPAND_VALUES = ("game",)
+
+
+def parse_expand(params):
+    return {e.strip() for raw in params.getlist("expand") for e in raw.split(",") if e.strip()}
+
+
+def _parse_hours(raw):
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
+def apply_list_filters(queryset, params):
+    """
+    Traduce los parámetros de consulta del listado a filtros SQL:
+    - status: uno o varios (?status=playing&status=completed o ?status=playing,completed)
+    - min_hours / max_hours: rango de horas jugadas, ambos incluidos
+    - sort: solo se valida aquí; el orden lo aplica quien pinta la respuesta
+    - expand: igual, solo se valida (ver EXPAND_VALUES)
+
+    Devuelve (queryset, errores_dict) con el mismo formato de errores que el resto de la API.
+    """
+    errores_dict = {}
+
+    statuses = [s.strip() for raw in params.getlist("status") for s in raw.split(",") if s.strip()]
+    if statuses:
+        invalid = [s for s in statuses if s not in LibraryEntry.ALLOWED_STATUSES]
+        if invalid:
+            errores_dict.update({"status": "Estado no permitido. Los valores permitidos son: " + ", ".join(LibraryEntry.ALLOWED_STATUSES)})
+        elif len(set(statuses)) == 1:
+            queryset = queryset.filter(status=statuses[0])
+        else:
+            queryset = queryset.filter(status__in=sorted(set(statuses)))
+
+    bounds = {}
+    for name, lookup in (("min_hours", "hours_played__gte"), ("max_hours", "hours_played__lte")):
+        if name in params:
+            value = _parse_hours(params.get(name))
+            if value is None:
+                errores_dict.update({name: "Debe ser un entero positivo"})
+            else:
+                bounds[name] = value
+                queryset = queryset.filter(**{lookup: value})
+    if len(bounds) == 2 and bounds["min_hours"] > bounds["max_hours"]:
+        errores_dict.update({"min_hours": "No puede ser mayor que max_hours"})
+
+    if params.get("sort"):
+        try:
+            parse_sort(params.get("sort"))
+        except CursorError as e:
+            errores_dict.update({"sort": str(e)})
+
+    if parse_expand(params) - set(EXPAND_VALUES):
+        errores_dict.update({"expand": "Valor no permitido. Los valores permitidos son: " + ", ".join(EXPAND_VALUES)})
+
+    return queryset, errores_dict
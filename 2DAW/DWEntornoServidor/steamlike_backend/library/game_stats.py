@@ -0,0 +1,271 @@
+"""
+Estadísticas globales por juego (GameStats) e histograma de horas (GameHours).
+
+Igual que los resúmenes de cada usuario (library.summary), se mantienen de
+forma incremental desde record_entry_changes, en la misma transacción que la
+escritura: cada bloque de cambios se convierte en incrementos por juego y por
+(juego, horas) que se aplican con un INSERT ... ON CONFLICT DO UPDATE SET
+x = x + n, sin leer antes las filas. Leer una clasificación o las estadísticas
+de un juego no toca LibraryEntry.
+
+Lo que no pasa por record_entry_changes (borrados en cascada al eliminar un
+usuario, SQL a mano) solo se corrige con la reconstrucción completa
+(rebuild_game_stats), que se puede programar como trabajo periódico y no
+bloquea las escrituras mientras agrega.
+"""
+import math
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from library.models import GameHours, GameStats, LibraryEntry
+
+COUNTER_FIELDS = ("entries", "players", "total_hours") + LibraryEntry.ALLOWED_STATUSES
+
+# Clasificaciones disponibles: ?by= -> columna de GameStats (cada una con su índice)
+LEADERBOARDS = {
+    "hours": "total_hours",
+    "players": "players",
+    "completed": "completed",
+}
+
+
+def game_stats_delta(changes):
+    """
+    Efecto de una lista de cambios (library.changes.EntryChange) sobre las
+    estadísticas. Devuelve ({juego: {contador: n}}, {(juego, horas): n}) solo
+    con lo que cambia.
+    """
+    stats = {}
+    hours = {}
+    for change in changes:
+        game_id = str(change.external_game_id)
+        for status, hours_played, sign in (
+            (change.old_status, change.old_hours, -1),
+            (change.new_status, change.new_hours, 1),
+        ):
+            if status is None:
+                continue
+            counters = stats.setdefault(game_id, dict.fromkeys(COUNTER_FIELDS, 0))
+            counters["entries"] += sign
+            counters["total_hours"] += sign * (hours_played or 0)
+            if status in LibraryEntry.ALLOWED_STATUSES:
+                counters[status] += sign
+            if status != LibraryEntry.STATUS_WISHLIST:
+                counters["players"] += sign
+                key = (game_id, hours_played or 0)
+                hours[key] = hours.get(key, 0) + sign
+
+    stats = {game_id: counters for game_id, counters in stats.items() if any(counters.values())}
+    return stats, {key: n for key, n in hours.items() if n}
+
+
+def _add_counters(model, key_fields, rows, counter_fields):
+    """
+    Suma los contadores de cada fila (claves + incrementos) creando las que
+    falten. Las filas van ordenadas por clave: dos transacciones que tocan los
+    mismos juegos bloquean las filas en el mismo orden y no se interbloquean.
+    """
+    rows = sorted(rows)
+    connection = connections[model.objects.db]
+    if connection.vendor not in ("postgresql", "sqlite"):
+        for row in rows:
+            keys = dict(zip(key_fields, row))
+            increments = dict(zip(counter_fields, row[len(key_fields):]))
+            if not model.objects.filter(**keys).update(**{f: F(f) + n for f, n in increments.items()}):
+                model.objects.create(**keys, **increments)
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = [qn(model._meta.get_field(f).column) for f in key_fields + counter_fields]
+    counters = columns[len(key_fields):]
+    sql = "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {}".format(
+        table, ", ".join(columns), ", ".join(["%s"] * len(columns)),
+        ", ".join(columns[:len(key_fields)]),
+        ", ".join(f"{c} = {table}.{c} + EXCLUDED.{c}" for c in counters),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def apply_game_stats_delta(stats, hours):
+    """Aplica los incrementos de game_stats_delta(). Debe ir en la transacción del cambio."""
+    if stats:
+        _add_counters(
+            GameStats, ("external_game_id",),
+            [(game_id, *(counters[f] for f in COUNTER_FIELDS)) for game_id, counters in stats.items()],
+            COUNTER_FIELDS,
+        )
+        # Juegos que ya no están en ninguna biblioteca
+        shrunk = [game_id for game_id, counters in stats.items() if counters["entries"] < 0]
+        if shrunk:
+            GameStats.objects.filter(external_game_id__in=shrunk, entries__lte=0).delete()
+    if hours:
+        _add_counters(GameHours, ("external_game_id", "hours"), [(g, h, n) for (g, h), n in hours.items()], ("entries",))
+        shrunk = {g for (g, _), n in hours.items() if n < 0}
+        if shrunk:
+            GameHours.objects.filter(external_game_id__in=shrunk, entries__lte=0).delete()
+
+
+def record_game_stats(changes):
+    if settings.GAME_STATS_INCREMENTAL:
+        apply_game_stats_delta(*game_stats_delta(changes))
+
+
+def _game_ranges(cursor, table, game, batch_size):
+    """
+    Rangos (desde, hasta] de external_game_id con batch_size juegos de table
+    cada uno; None es sin límite. El último llega hasta el final, para que
+    también cubra los juegos que ya no tienen entradas.
+    """
+    low = None
+    while True:
+        where, params = (f"WHERE {game} > %s", [low]) if low is not None else ("", [])
+        cursor.execute(f"SELECT {game} FROM {table} {where} ORDER BY {game} LIMIT 1 OFFSET %s", params + [batch_size - 1])
+        row = cursor.fetchone()
+        high = row[0] if row else None
+        yield low, high
+        if high is None:
+            return
+        low = high
+
+
+def rebuild_game_stats(batch_size=None):
+    """
+    Recalcula todas las estadísticas desde LibraryEntry. Devuelve (juegos,
+    filas del histograma).
+
+    La agregación (dos SELECT ... GROUP BY, lo caro) se hace en tablas
+    temporales, sin tocar GameStats ni GameHours. Después se copian a las
+    tablas reales por rangos de batch_size juegos, cada uno en su propia
+    transacción corta: las escrituras de las bibliotecas solo esperan, como
+    mucho, a que termine el rango de sus juegos.
+
+    Los cambios que se confirmen mientras dura la reconstrucción pueden
+    quedar fuera; la siguiente reconstrucción los recoge.
+    """
+    batch_size = batch_size or settings.GAME_STATS_REBUILD_BATCH_SIZE
+    db = GameStats.objects.db
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    entry = LibraryEntry._meta
+    game, status, hours, user = (qn(entry.get_field(f).column) for f in ("external_game_id", "status", "hours_played", "user"))
+    stats_table, hours_table = qn(GameStats._meta.db_table), qn(GameHours._meta.db_table)
+    stats_stage, hours_stage = qn("game_stats_rebuild"), qn("game_hours_rebuild")
+
+    def count_if(condition):
+        return f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)"
+
+    stats_names = [qn(GameStats._meta.get_field(f).column) for f in ("external_game_id",) + COUNTER_FIELDS]
+    hours_names = [qn(GameHours._meta.get_field(f).column) for f in ("external_game_id", "hours", "entries")]
+    stats_columns, hours_columns = ", ".join(stats_names), ", ".join(hours_names)
+    stats_select = ", ".join(
+        f"{expression} AS {name}" for expression, name in zip(
+            [game, "COUNT(*)", count_if(f"{status} <> %s"), f"COALESCE(SUM({hours}), 0)"]
+            + [count_if(f"{status} = %s") for _ in LibraryEntry.ALLOWED_STATUSES],
+            stats_names,
+        )
+    )
+    stats_game, hours_game = stats_names[0], hours_names[0]
+
+    with connection.cursor() as cursor:
+        try:
+            for stage in (stats_stage, hours_stage):
+                cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {stats_stage} AS "
+                f"SELECT {stats_select} FROM {qn(entry.db_table)} WHERE {user} IS NOT NULL GROUP BY {game}",
+                [LibraryEntry.STATUS_WISHLIST, *LibraryEntry.ALLOWED_STATUSES],
+            )
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {hours_stage} AS "
+                f"SELECT {game} AS {hours_names[0]}, {hours} AS {hours_names[1]}, COUNT(*) AS {hours_names[2]} "
+                f"FROM {qn(entry.db_table)} WHERE {user} IS NOT NULL AND {status} <> %s GROUP BY {game}, {hours}",
+                [LibraryEntry.STATUS_WISHLIST],
+            )
+            cursor.execute(f"CREATE INDEX game_stats_rebuild_idx ON {stats_stage} ({stats_game})")
+            cursor.execute(f"CREATE INDEX game_hours_rebuild_idx ON {hours_stage} ({hours_game})")
+            cursor.execute(f"SELECT COUNT(*) FROM {stats_stage}")
+            games = cursor.fetchone()[0]
+            cursor.execute(f"SELECT COUNT(*) FROM {hours_stage}")
+            histogram = cursor.fetchone()[0]
+
+            for low, high in _game_ranges(cursor, stats_stage, stats_game, batch_size):
+                conditions, params = [], []
+                if low is not None:
+                    conditions.append("{game} > %s")
+                    params.append(low)
+                if high is not None:
+                    conditions.append("{game} <= %s")
+                    params.append(high)
+                where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+                # Cada rango se sustituye entero: las filas de juegos sin entradas desaparecen
+                with transaction.atomic(using=db):
+                    cursor.execute(f"DELETE FROM {stats_table} " + where.format(game=stats_game), params)
+                    cursor.execute(
+                        f"INSERT INTO {stats_table} ({stats_columns}) SELECT {stats_columns} FROM {stats_stage} "
+                        + where.format(game=stats_game) + f" ORDER BY {stats_game}", params,
+                    )
+                    cursor.execute(f"DELETE FROM {hours_table} " + where.format(game=hours_game), params)
+                    cursor.execute(
+                        f"INSERT INTO {hours_table} ({hours_columns}) SELECT {hours_columns} FROM {hours_stage} "
+                        + where.format(game=hours_game) + f" ORDER BY {hours_game}", params,
+                    )
+        finally:
+            for stage in (stats_stage, hours_stage):
+                cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+    return games, histogram
+
+
+def stats_to_dict(stats):
+    return {
+        "external_game_id": stats.external_game_id,
+        "entries": stats.entries,
+        "players": stats.players,
+        "total_hours": stats.total_hours,
+        "by_status": {status: getattr(stats, status) for status in LibraryEntry.ALLOWED_STATUSES},
+    }
+
+
+def leaderboard(by, limit):
+    """Los limit juegos con más by (ver LEADERBOARDS); un recorrido del índice."""
+    field = LEADERBOARDS[by]
+    rows = GameStats.objects.filter(**{f"{field}__gt": 0}).order_by(f"-{field}", "external_game_id")[:limit]
+    return [stats_to_dict(stats) for stats in rows]
+
+
+def hours_percentiles(external_game_id, percents=(50, 90)):
+    """
+    Percentiles de horas entre los jugadores del juego (método del rango más
+    cercano) a partir de su histograma. Devuelve {p: horas} o None sin jugadores.
+    """
+    histogram = list(
+        GameHours.objects.filter(external_game_id=external_game_id, entries__gt=0)
+        .order_by("hours").values_list("hours", "entries")
+    )
+    total = sum(n for _, n in histogram)
+    if not total:
+        return None
+    result = {}
+    ranks = sorted((max(1, math.ceil(p / 100 * total)), p) for p in percents)
+    seen = 0
+    position = 0
+    for hours, n in histogram:
+        seen += n
+        while position < len(ranks) and ranks[position][0] <= seen:
+            result[ranks[position][1]] = hours
+            position += 1
+    return result
+
+
+def game_stats(external_game_id):
+    """Estadísticas completas de un juego (con mediana y p90 de horas) o None."""
+    stats = GameStats.objects.filter(external_game_id=external_game_id).first()
+    if stats is None:
+        return None
+    data = stats_to_dict(stats)
+    percentiles = hours_percentiles(external_game_id) or {}
+    data["median_hours"] = percentiles.get(50)
+    data["p90_hours"] = percentiles.get(90)
+    return data
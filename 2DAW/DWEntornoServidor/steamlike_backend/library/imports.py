@@ -0,0 +1,230 @@
+"""
+Importación de una biblioteca desde un fichero NDJSON o CSV (el mismo formato
+que produce library.export, u otro con al menos external_game_id y status).
+
+El fichero se lee línea a línea y se procesa por bloques de chunk_size
+registros: validación con las mismas reglas que el alta individual, una
+consulta para descartar los juegos que ya están en la biblioteca, un INSERT
+masivo y el registro de cambios, todo en una transacción por bloque. En
+memoria solo hay un bloque cada vez. Las líneas rechazadas se escriben en un
+informe NDJSON ({"line", "reason", ...}).
+"""
+import csv
+import tempfile
+import uuid
+from collections import namedtuple
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from library.changes import EntryChange, record_entry_changes
+from library.models import LibraryEntry, LibraryImport
+from library.validation import validate_entry_data
+from steamlike_backend.codec import dumps, loads
+
+FORMATS = ("ndjson", "csv")
+
+ImportResult = namedtuple("ImportResult", ["lines", "created", "skipped", "invalid"])
+
+
+def detect_format(name="", content_type=""):
+    if name.lower().endswith(".csv") or content_type.startswith("text/csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _parse_hours(value):
+    # En CSV todo son cadenas: solo se convierte un entero no negativo, el
+    # resto se deja tal cual para que la validación lo rechace
+    if value is None or value == "":
+        return 0
+    # isdecimal y no isdigit: "²" es un dígito, pero int() no lo acepta
+    return int(value) if value.isdecimal() else value
+
+
+def read_records(lines, fmt):
+    """
+    Genera (número de línea, dict o None) a partir de líneas en bytes. None es
+    una línea que no se ha podido leer (JSON mal formado, no es un objeto...).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(line.decode("utf-8", errors="replace") for line in lines)
+        for row in reader:
+            record = {
+                "external_game_id": row.get("external_game_id") or None,
+                "status": row.get("status") or None,
+                "hours_played": _parse_hours(row.get("hours_played")),
+            }
+            yield reader.line_num, record
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def insert_entries(user, rows):
+    """
+    INSERT de (external_game_id, status, hours_played) ignorando los que ya
+    existan. Devuelve {external_game_id: id} solo de las filas que ha insertado
+    esta llamada: una que otra transacción del mismo usuario inserte a la vez
+    no cuenta como creada dos veces. En PostgreSQL y SQLite es un INSERT de
+    varias filas con ON CONFLICT DO NOTHING RETURNING: con bloques grandes,
+    construir instancias del modelo y compilar cada valor en bulk_create
+    cuesta bastante más que el propio INSERT.
+    """
+    if not rows:
+        return {}
+    connection = connections[LibraryEntry.objects.db]
+    if connection.vendor not in ("postgresql", "sqlite") or not connection.features.can_return_rows_from_bulk_insert:
+        LibraryEntry.objects.bulk_create([
+            LibraryEntry(user=user, external_game_id=game_id, status=status, hours_played=hours)
+            for game_id, status, hours in rows
+        ], ignore_conflicts=True)
+        # Sin RETURNING los ids se recuperan con una sola consulta (puede incluir
+        # una fila insertada a la vez por otra transacción)
+        return dict(
+            LibraryEntry.objects.filter(user=user, external_game_id__in=[row[0] for row in rows])
+            .values_list("external_game_id", "id")
+        )
+
+    meta = LibraryEntry._meta
+    columns = ("user_id", "external_game_id", "status", "hours_played", "updated_at")
+    qn = connection.ops.quote_name
+    insert = "INSERT INTO {} ({}) VALUES ".format(
+        qn(meta.db_table), ", ".join(qn(meta.get_field(c).column) for c in columns),
+    )
+    placeholder = "({})".format(", ".join(["%s"] * len(columns)))
+    returning = " ON CONFLICT DO NOTHING RETURNING {}, {}".format(
+        qn(meta.pk.column), qn(meta.get_field("external_game_id").column),
+    )
+    # auto_now no se aplica fuera del ORM: la misma fecha para todo el bloque
+    now = meta.get_field("updated_at").get_db_prep_value(timezone.now(), connection)
+    params = [(user.id, game_id, status, hours, now) for game_id, status, hours in rows]
+    # Como bulk_create: tantas filas por sentencia como admita el límite de parámetros
+    batch_size = connection.ops.bulk_batch_size([meta.get_field(c) for c in columns], params)
+    inserted = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(params), batch_size):
+            batch = params[start:start + batch_size]
+            cursor.execute(
+                insert + ", ".join([placeholder] * len(batch)) + returning,
+                [value for row in batch for value in row],
+            )
+            inserted.update((game_id, entry_id) for entry_id, game_id in cursor.fetchall())
+    return inserted
+
+
+def import_chunk(user, chunk):
+    """
+    Valida e inserta un bloque de (línea, registro). Debe ir en una transacción.
+    Devuelve (creadas, problemas).
+    """
+    problems = []
+    pending = {}  # external_game_id -> (línea, registro)
+    for line, record in chunk:
+        if record is None:
+            problems.append({"line": line, "reason": "invalid", "details": {"body": "Línea mal formada"}})
+            continue
+        errores_dict = validate_entry_data(record)
+        if errores_dict:
+            problems.append({"line": line, "reason": "invalid", "details": errores_dict})
+            continue
+        game_id = str(record["external_game_id"])
+        if game_id in pending:
+            problems.append({"line": line, "reason": "duplicate", "external_game_id": game_id})
+        else:
+            pending[game_id] = (line, record)
+
+    existing = set(
+        LibraryEntry.objects.filter(user=user, external_game_id__in=list(pending))
+        .values_list("external_game_id", flat=True)
+    )
+    new_rows = [
+        (game_id, record["status"], record.get("hours_played", 0))
+        for game_id, (_, record) in pending.items() if game_id not in existing
+    ]
+    created_ids = insert_entries(user, new_rows)
+
+    changes = []
+    for game_id, (line, record) in pending.items():
+        if game_id in existing or game_id not in created_ids:
+            problems.append({"line": line, "reason": "duplicate", "external_game_id": game_id})
+        else:
+            changes.append(EntryChange(
+                created_ids[game_id], game_id, None, None, record["status"], record.get("hours_played", 0)
+            ))
+    record_entry_changes(user.id, changes)
+    problems.sort(key=lambda p: p["line"])
+    return len(changes), problems
+
+
+def import_entries(user, records, chunk_size, report=None):
+    """
+    Importa todos los registros por bloques. Las líneas rechazadas se escriben
+    en "report" (fichero binario) si se pasa. Devuelve un ImportResult.
+    """
+    lines = created = skipped = invalid = 0
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        with transaction.atomic():
+            chunk_created, problems = import_chunk(user, chunk)
+        lines += len(chunk)
+        created += chunk_created
+        for problem in problems:
+            if problem["reason"] == "invalid":
+                invalid += 1
+            else:
+                skipped += 1
+        if report is not None and problems:
+            report.write(b"".join(dumps(p) + b"\n" for p in problems))
+    return ImportResult(lines, created, skipped, invalid)
+
+
+def save_upload(lines, fmt):
+    """
+    Copia el fichero (subido o el cuerpo de la petición, línea a línea) al
+    almacenamiento de ficheros para importarlo en segundo plano. Devuelve su nombre.
+    """
+    with tempfile.TemporaryFile() as upload:
+        for line in lines:
+            upload.write(line)
+        upload.seek(0)
+        return default_storage.save(f"library_imports/uploads/{uuid.uuid4().hex}.{fmt}", File(upload))
+
+
+def run_import(user, lines, fmt, chunk_size):
+    """
+    Importación completa con su LibraryImport: el informe de errores se va
+    escribiendo en un temporal y, si hay errores, se guarda en el almacenamiento
+    de ficheros (MEDIA_ROOT) al terminar.
+    """
+    library_import = LibraryImport.objects.create(user=user, format=fmt)
+    with tempfile.TemporaryFile() as report:
+        result = import_entries(user, read_records(lines, fmt), chunk_size, report)
+        library_import.lines, library_import.created, library_import.skipped, library_import.invalid = result
+        library_import.finished_at = timezone.now()
+        if report.tell():
+            report.seek(0)
+            library_import.error_report.save(f"import-{library_import.id}-errors.ndjson", File(report), save=False)
+        library_import.save()
+    return library_import
+
+
+def import_to_dict(library_import):
+    return {
+        "id": library_import.id,
+        "format": library_import.format,
+        "lines": library_import.lines,
+        "created": library_import.created,
+        "skipped": library_import.skipped,
+        "invalid": library_import.invalid,
+        "errors_url": f"/api/library/import/{library_import.id}/errors/" if library_import.error_report else None,
+    }
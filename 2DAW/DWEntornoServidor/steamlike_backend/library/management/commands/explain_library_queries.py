@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from library.models import LibraryEntry
+
+
+class Command(BaseCommand):
+    help = "Muestra el plan (EXPLAIN) de las consultas principales de la API de biblioteca."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Usuario con el que lanzar las consultas (por defecto, el primero)")
+        parser.add_argument("--analyze", action="store_true", help="Ejecuta las consultas (EXPLAIN ANALYZE, solo PostgreSQL)")
+
+    def handle(self, *args, **options):
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+        else:
+            user = User.objects.order_by("id").first()
+        if user is None:
+            raise CommandError("No hay ningún usuario con el que lanzar las consultas")
+
+        entry = LibraryEntry.objects.filter(user=user).order_by("id").first()
+        entry_id = entry.id if entry else 0
+        game_id = entry.external_game_id if entry else "game"
+
+        queries = {
+            "listado": LibraryEntry.objects.filter(user=user).order_by("id")[:50],
+            "listado por estado": LibraryEntry.objects.filter(user=user, status="playing").order_by("id")[:50],
+            "detalle": LibraryEntry.objects.filter(id=entry_id, user=user),
+            "comprobación de duplicado": LibraryEntry.objects.filter(user=user, external_game_id=game_id),
+        }
+
+        explain_options = {"analyze": True} if options["analyze"] else {}
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"-- {name}"))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from library import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta bibliotecas en CSV o NDJSON (opcionalmente en gzip): la de un usuario "
+        "o la de todos, entera, por tramo de ids de usuario o repartida en varios ficheros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=tuple(export.FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Comprimir la salida en gzip")
+        parser.add_argument("--output", default="-", help='Fichero de salida ("-" para la salida estándar)')
+        parser.add_argument("--user", help="Exportar solo la biblioteca de este usuario")
+        parser.add_argument("--user-min", type=int, help="Primer id de usuario (incluido)")
+        parser.add_argument("--user-max", type=int, help="Último id de usuario (incluido)")
+        parser.add_argument(
+            "--partitions", type=int,
+            help="Repartir la exportación en N ficheros por tramos de id de usuario (en --output-dir)",
+        )
+        parser.add_argument("--output-dir", default=".", help="Directorio de los ficheros de --partitions")
+        parser.add_argument("--chunk-size", type=int, default=settings.LIBRARY_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        fmt = options["format"]
+        gzip_level = settings.LIBRARY_EXPORT_GZIP_LEVEL if options["gzip"] else None
+
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No existe el usuario {options['user']}")
+            jobs = [(options["output"], export.export_queryset(user=user), export.EXPORT_FIELDS)]
+        elif options["partitions"]:
+            if options["partitions"] < 1:
+                raise CommandError("--partitions debe ser mayor que 0")
+            base = export.export_queryset(user_min=options["user_min"], user_max=options["user_max"])
+            os.makedirs(options["output_dir"], exist_ok=True)
+            jobs = [
+                (
+                    os.path.join(options["output_dir"], export.export_filename(f"library-{low}-{high}", fmt, options["gzip"])),
+                    export.export_queryset(user_min=low, user_max=high),
+                    export.ADMIN_EXPORT_FIELDS,
+                )
+                for low, high in export.user_id_ranges(options["partitions"], base)
+            ]
+        else:
+            queryset = export.export_queryset(user_min=options["user_min"], user_max=options["user_max"])
+            jobs = [(options["output"], queryset, export.ADMIN_EXPORT_FIELDS)]
+
+        for path, queryset, fields in jobs:
+            started = time.monotonic()
+            written = self.write(path, export.export_stream(queryset, fields, fmt, options["chunk_size"], gzip_level))
+            if options["verbosity"] >= 1:
+                elapsed = time.monotonic() - started
+                self.stderr.write(f"{path}: {written / 1e6:.1f} MB en {elapsed:.1f} s ({written / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+
+    def write(self, path, chunks):
+        written = 0
+        if path == "-":
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+            out.flush()
+            return written
+        # Se escribe en un temporal y se renombra: un fichero a medias nunca parece completo
+        tmp = f"{path}.part"
+        with open(tmp, "wb") as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        os.replace(tmp, path)
+        return written
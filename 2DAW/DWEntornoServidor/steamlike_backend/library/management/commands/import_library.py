@@ -0,0 +1,45 @@
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from library import imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un fichero NDJSON o CSV en la biblioteca de un usuario, por bloques. "
+        "Los juegos que ya tiene se saltan; las líneas rechazadas van a --report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path", help='Fichero de entrada ("-" para la entrada estándar)')
+        parser.add_argument("--format", choices=imports.FORMATS, help="Por defecto, según la extensión")
+        parser.add_argument("--chunk-size", type=int, default=settings.LIBRARY_IMPORT_CHUNK_SIZE)
+        parser.add_argument("--report", help="Fichero NDJSON con las líneas rechazadas")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No existe el usuario {options['username']}")
+        path = options["path"]
+        fmt = options["format"] or imports.detect_format(path)
+
+        started = time.monotonic()
+        source = sys.stdin.buffer if path == "-" else open(path, "rb")
+        report = open(options["report"], "wb") if options["report"] else None
+        try:
+            result = imports.import_entries(user, imports.read_records(source, fmt), options["chunk_size"], report)
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+            if report:
+                report.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Líneas: {result.lines}, creadas: {result.created}, saltadas: {result.skipped}, "
+            f"inválidas: {result.invalid} ({elapsed:.1f} s, {result.lines / max(elapsed, 1e-9):.0f} líneas/s)"
+        ))
@@ -0,0 +1,30 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from library.activity import prune_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los eventos del registro de actividad con más de --days días "
+        "(LIBRARY_ACTIVITY_RETENTION_DAYS). Los clientes con un cursor de cambios "
+        "anterior tendrán que sincronizar la biblioteca completa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.LIBRARY_ACTIVITY_RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        if options["days"] <= 0:
+            self.stdout.write("Retención desactivada: no se borra nada")
+            return
+
+        started = time.monotonic()
+        deleted = prune_events(timezone.now() - timedelta(days=options["days"]), options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Eventos borrados: {deleted} ({time.monotonic() - started:.1f} s)"
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from library.game_stats import rebuild_game_stats
+from library.tasks import schedule_game_stats_rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero las estadísticas globales por juego (GameStats y GameHours). "
+        "Con --background lo encola para runworker, que después lo repite cada GAME_STATS_REBUILD_INTERVAL segundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--background", action="store_true", help="Encolarlo para runworker en vez de hacerlo ahora")
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            job = schedule_game_stats_rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Encolado como trabajo {job.id}"))
+            return
+
+        started = time.monotonic()
+        games, histogram = rebuild_game_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Juegos: {games}, filas del histograma: {histogram} ({time.monotonic() - started:.1f} s)"
+        ))
@@ -0,0 +1,27 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from jobs.queue import enqueue
+from library.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los contadores de resumen de la biblioteca."
+
+    def add_arguments(self, parser):
+        parser.add_argument("usernames", nargs="*", help="Usuarios a reparar (por defecto, todos)")
+        parser.add_argument("--background", action="store_true", help="Encolarlo para runworker en vez de hacerlo ahora")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["usernames"]:
+            user_ids = list(User.objects.filter(username__in=options["usernames"]).values_list("id", flat=True))
+            if len(user_ids) != len(set(options["usernames"])):
+                raise CommandError("Alguno de los usuarios indicados no existe")
+
+        if options["background"]:
+            job = enqueue("library.rebuild_summary", {"user_ids": user_ids})
+            self.stdout.write(self.style.SUCCESS(f"Encolado como trabajo {job.id}"))
+            return
+
+        written = rebuild_summaries(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes recalculados: {written}"))
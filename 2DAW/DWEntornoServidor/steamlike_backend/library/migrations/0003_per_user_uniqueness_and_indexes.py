@@ -0,0 +1,201 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.migrations.operations.base import Operation
+import django.db.models.deletion
+
+# Migración pensada para ejecutarse con la tabla en uso.
+# - En PostgreSQL los cambios de los campos son solo de estado (SeparateDatabaseAndState):
+#   la base de datos se cambia con SQL escrito a mano y la FK de user no se toca nunca.
+# - Los índices nuevos se crean con CREATE INDEX CONCURRENTLY (sin bloquear escrituras) y la
+#   restricción única se añade sobre el índice ya construido (USING INDEX). Los índices viejos
+#   (el de user_id y el _like de external_game_id) se borran con DROP INDEX CONCURRENTLY.
+# - Añadir la restricción nueva y quitar el UNIQUE global solo cambia el catálogo, pero
+#   necesita un bloqueo exclusivo breve: con lock_timeout no se queda encolado bloqueando
+#   al resto de consultas.
+# - Cada paso comprueba si ya está hecho, así que si la migración falla a medias basta con
+#   relanzarla.
+# - En el resto de bases de datos se usa el schema editor normal.
+# Si un CREATE ... CONCURRENTLY se interrumpe, deja un índice INVALID que hay que borrar
+# (DROP INDEX CONCURRENTLY) antes de relanzar la migración.
+
+TABLE = "library_libraryentry"
+
+POSTGRES_CREATE = [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS library_entry_user_id_idx ON {TABLE} (user_id, id)",
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS library_entry_user_status_idx ON {TABLE} (user_id, status)",
+    f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS library_entry_user_game_uniq ON {TABLE} (user_id, external_game_id)",
+]
+
+# Con lock_timeout: solo tocan el catálogo
+POSTGRES_CONSTRAINTS = [
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = '{TABLE}'::regclass AND conname = 'library_entry_user_game_uniq'
+        ) THEN
+            ALTER TABLE {TABLE} ADD CONSTRAINT library_entry_user_game_uniq
+                UNIQUE USING INDEX library_entry_user_game_uniq;
+        END IF;
+    END $$
+    """,
+    # El UNIQUE global de external_game_id (el nombre lo pone PostgreSQL: se busca por columna)
+    f"""
+    DO $$
+    DECLARE
+        old_name text;
+    BEGIN
+        SELECT c.conname INTO old_name
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attname = 'external_game_id'
+        WHERE c.conrelid = '{TABLE}'::regclass AND c.contype = 'u' AND c.conkey = ARRAY[a.attnum];
+        IF old_name IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE {TABLE} DROP CONSTRAINT %I', old_name);
+        END IF;
+    END $$
+    """,
+]
+
+# Índices que creó Django en 0001 y 0002 (nombres deterministas del schema editor)
+POSTGRES_DROP = [
+    "DROP INDEX CONCURRENTLY IF EXISTS library_libraryentry_external_game_id_427f0efc_like",
+    "DROP INDEX CONCURRENTLY IF EXISTS library_libraryentry_user_id_9464aff1",
+]
+
+# Vuelta atrás: se recrean los índices viejos antes de quitar los nuevos
+POSTGRES_BACKWARDS_CREATE = [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS library_libraryentry_user_id_9464aff1 ON {TABLE} (user_id)",
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS library_libraryentry_external_game_id_427f0efc_like "
+    f"ON {TABLE} (external_game_id varchar_pattern_ops)",
+    f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS library_libraryentry_external_game_id_key ON {TABLE} (external_game_id)",
+]
+
+POSTGRES_BACKWARDS_CONSTRAINTS = [
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = '{TABLE}'::regclass AND conname = 'library_libraryentry_external_game_id_key'
+        ) THEN
+            ALTER TABLE {TABLE} ADD CONSTRAINT library_libraryentry_external_game_id_key
+                UNIQUE USING INDEX library_libraryentry_external_game_id_key;
+        END IF;
+    END $$
+    """,
+    f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS library_entry_user_game_uniq",
+]
+
+POSTGRES_BACKWARDS_DROP = [
+    "DROP INDEX CONCURRENTLY IF EXISTS library_entry_user_id_idx",
+    "DROP INDEX CONCURRENTLY IF EXISTS library_entry_user_status_idx",
+]
+
+STATE_OPERATIONS = [
+    migrations.AlterField(
+        model_name='libraryentry',
+        name='external_game_id',
+        field=models.CharField(max_length=100),
+    ),
+    migrations.AlterField(
+        model_name='libraryentry',
+        name='user',
+        field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='library_entries', to=settings.AUTH_USER_MODEL),
+    ),
+    migrations.AddIndex(
+        model_name='libraryentry',
+        index=models.Index(fields=['user', 'id'], name='library_entry_user_id_idx'),
+    ),
+    migrations.AddIndex(
+        model_name='libraryentry',
+        index=models.Index(fields=['user', 'status'], name='library_entry_user_status_idx'),
+    ),
+    migrations.AddConstraint(
+        model_name='libraryentry',
+        constraint=models.UniqueConstraint(fields=('user', 'external_game_id'), name='library_entry_user_game_uniq'),
+    ),
+]
+
+
+def _new_state(app_label, state):
+    new_state = state.clone()
+    for operation in STATE_OPERATIONS:
+        operation.state_forwards(app_label, new_state)
+    return new_state
+
+
+def _run_postgres(schema_editor, create, constraints, drop):
+    for sql in create:
+        schema_editor.execute(sql)
+    schema_editor.execute("SET lock_timeout = '5s'")
+    try:
+        for sql in constraints:
+            # Sin parámetros: los bloques DO llevan % propios
+            schema_editor.execute(sql, None)
+    finally:
+        schema_editor.execute("RESET lock_timeout")
+    for sql in drop:
+        schema_editor.execute(sql)
+
+
+class PerUserUniqueness(Operation):
+    """
+    Cambios en la base de datos de STATE_OPERATIONS (el estado lo cambia
+    SeparateDatabaseAndState). Crea primero los índices nuevos y después
+    retira el UNIQUE global y el índice de la FK, para que nunca falte un
+    índice que cubra la comprobación de duplicados.
+    """
+    reversible = True
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            _run_postgres(schema_editor, POSTGRES_CREATE, POSTGRES_CONSTRAINTS, POSTGRES_DROP)
+            return
+
+        old_model = from_state.apps.get_model(app_label, "libraryentry")
+        new_model = _new_state(app_label, from_state).apps.get_model(app_label, "libraryentry")
+        for index in new_model._meta.indexes:
+            schema_editor.add_index(new_model, index)
+        for constraint in new_model._meta.constraints:
+            schema_editor.add_constraint(new_model, constraint)
+        for name in ("external_game_id", "user"):
+            schema_editor.alter_field(new_model, old_model._meta.get_field(name), new_model._meta.get_field(name))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            _run_postgres(schema_editor, POSTGRES_BACKWARDS_CREATE, POSTGRES_BACKWARDS_CONSTRAINTS, POSTGRES_BACKWARDS_DROP)
+            return
+
+        old_model = to_state.apps.get_model(app_label, "libraryentry")
+        new_model = _new_state(app_label, to_state).apps.get_model(app_label, "libraryentry")
+        for name in ("external_game_id", "user"):
+            schema_editor.alter_field(old_model, new_model._meta.get_field(name), old_model._meta.get_field(name))
+        for constraint in new_model._meta.constraints:
+            schema_editor.remove_constraint(new_model, constraint)
+        for index in new_model._meta.indexes:
+            schema_editor.remove_index(new_model, index)
+
+    def describe(self):
+        return "Per-user uniqueness of external_game_id and composite indexes on LibraryEntry"
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('library', '0002_libraryentry_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=STATE_OPERATIONS,
+            database_operations=[PerUserUniqueness()],
+        ),
+    ]
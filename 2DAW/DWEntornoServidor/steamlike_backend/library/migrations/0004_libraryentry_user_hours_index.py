@@ -0,0 +1,19 @@
+from django.db import migrations, models
+from library.operations import PortableAddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('library', '0003_per_user_uniqueness_and_indexes'),
+    ]
+
+    operations = [
+        PortableAddIndexConcurrently(
+            model_name='libraryentry',
+            index=models.Index(fields=['user', 'hours_played', 'id'], name='library_entry_user_hours_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+STATUSES = ("wishlist", "playing", "completed", "dropped")
+
+
+def backfill_summaries(apps, schema_editor):
+    # Contadores iniciales con un único GROUP BY; después se mantienen de forma incremental
+    LibraryEntry = apps.get_model("library", "LibraryEntry")
+    LibrarySummary = apps.get_model("library", "LibrarySummary")
+
+    summaries = {}
+    rows = (
+        LibraryEntry.objects.filter(user__isnull=False)
+        .values("user_id", "status").annotate(n=Count("id"), hours=Sum("hours_played")).order_by()
+    )
+    for row in rows:
+        summary = summaries.setdefault(row["user_id"], LibrarySummary(user_id=row["user_id"]))
+        summary.total_entries += row["n"]
+        summary.total_hours += row["hours"] or 0
+        if row["status"] in STATUSES:
+            setattr(summary, row["status"], getattr(summary, row["status"]) + row["n"])
+    LibrarySummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_libraryentry_updated_at_libraryversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibrarySummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='library_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_entries', models.IntegerField(default=0)),
+                ('total_hours', models.BigIntegerField(default=0)),
+                ('wishlist', models.IntegerField(default=0)),
+                ('playing', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('dropped', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_librarysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Game',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.CharField(max_length=100, unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('cover_url', models.URLField(blank=True, max_length=500)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
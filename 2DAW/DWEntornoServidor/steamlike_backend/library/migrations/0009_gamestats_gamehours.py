@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+# Estado inicial de las estadísticas con dos INSERT ... SELECT ... GROUP BY
+# (como library.game_stats.rebuild_game_stats); después se mantienen de forma
+# incremental. En tablas muy grandes puede tardar: la misma agregación se
+# puede repetir en cualquier momento con manage.py rebuild_game_stats.
+BACKFILL_STATS = """
+INSERT INTO library_gamestats (external_game_id, entries, players, total_hours, wishlist, playing, completed, dropped)
+SELECT external_game_id, COUNT(*),
+       SUM(CASE WHEN status <> 'wishlist' THEN 1 ELSE 0 END),
+       COALESCE(SUM(hours_played), 0),
+       SUM(CASE WHEN status = 'wishlist' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN status = 'playing' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN status = 'dropped' THEN 1 ELSE 0 END)
+FROM library_libraryentry WHERE user_id IS NOT NULL GROUP BY external_game_id
+"""
+BACKFILL_HOURS = """
+INSERT INTO library_gamehours (external_game_id, hours, entries)
+SELECT external_game_id, hours_played, COUNT(*)
+FROM library_libraryentry WHERE user_id IS NOT NULL AND status <> 'wishlist'
+GROUP BY external_game_id, hours_played
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_libraryimport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_game_id', models.CharField(max_length=100)),
+                ('hours', models.IntegerField()),
+                ('entries', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('external_game_id', 'hours'), name='game_hours_game_hours_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GameStats',
+            fields=[
+                ('external_game_id', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('entries', models.IntegerField(default=0)),
+                ('players', models.IntegerField(default=0)),
+                ('total_hours', models.BigIntegerField(default=0)),
+                ('wishlist', models.IntegerField(default=0)),
+                ('playing', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('dropped', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total_hours', 'external_game_id'], name='game_stats_hours_idx'), models.Index(fields=['-players', 'external_game_id'], name='game_stats_players_idx'), models.Index(fields=['-completed', 'external_game_id'], name='game_stats_completed_idx')],
+            },
+        ),
+        migrations.RunSQL([BACKFILL_STATS, BACKFILL_HOURS], migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.migrations.operations.base import Operation
+
+# El índice por fecha de LibraryEvent sirve para rangos de fechas globales
+# sobre una tabla que solo crece, en orden de fecha. En PostgreSQL es un índice
+# BRIN (un resumen por bloque de páginas: pocos KB por cada millón de filas y
+# casi sin coste al insertar); en el resto, el B-tree normal del modelo.
+CREATED_INDEX = models.Index(fields=['created_at'], name='library_event_created_idx')
+
+
+class AddTimeRangeIndex(Operation):
+    reversible = True
+
+    def state_forwards(self, app_label, state):
+        state.add_index(app_label, "libraryevent", CREATED_INDEX)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, "libraryevent")
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE INDEX {CREATED_INDEX.name} ON {model._meta.db_table} USING brin (created_at)"
+            )
+        else:
+            schema_editor.add_index(model, CREATED_INDEX)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, "libraryevent")
+        schema_editor.remove_index(model, CREATED_INDEX)
+
+    def describe(self):
+        return "Time range index on LibraryEvent.created_at (BRIN on PostgreSQL)"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_gamestats_gamehours'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibraryEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_id', models.BigIntegerField()),
+                ('external_game_id', models.CharField(max_length=100)),
+                ('kind', models.PositiveSmallIntegerField()),
+                ('old_status', models.PositiveSmallIntegerField(null=True)),
+                ('new_status', models.PositiveSmallIntegerField(null=True)),
+                ('old_hours', models.IntegerField(null=True)),
+                ('new_hours', models.IntegerField(null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at', 'id'], name='library_event_user_time_idx')],
+            },
+        ),
+        AddTimeRangeIndex(),
+    ]
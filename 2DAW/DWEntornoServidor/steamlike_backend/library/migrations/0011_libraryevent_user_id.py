@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db import migrations, models
+from library.operations import PortableAddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('library', '0010_libraryevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        PortableAddIndexConcurrently(
+            model_name='libraryevent',
+            index=models.Index(fields=['user', 'id'], name='library_event_user_id_idx'),
+        ),
+    ]
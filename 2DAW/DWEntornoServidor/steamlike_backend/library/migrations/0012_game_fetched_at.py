@@ -0,0 +1,19 @@
+from django.db import migrations, models
+from library.operations import PortableAddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('library', '0011_libraryevent_user_id'),
+    ]
+
+    operations = [
+        PortableAddIndexConcurrently(
+            model_name='game',
+            index=models.Index(fields=['fetched_at'], name='library_game_fetched_idx'),
+        ),
+    ]
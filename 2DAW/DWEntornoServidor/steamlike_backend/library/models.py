@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class LibraryEntry(models.Model):
     STATUS_WISHLIST = "wishlist"
@@ -14,7 +15,7 @@ class LibraryEntry(models.Model):
         STATUS_DROPPED,
     )
 
-    external_game_id = models.CharField(max_length=100, unique=True)
+    external_game_id = models.CharField(max_length=100)
     status = models.CharField(max_length=20, default=STATUS_WISHLIST)
     hours_played = models.IntegerField(default=0)
     user = models.ForeignKey(
@@ -23,7 +24,22 @@ class LibraryEntry(models.Model):
         null=True,        # para no romper datos existentes
         blank=True,
         related_name="library_entries",
+        db_index=False,   # lo cubren los índices compuestos que empiezan por "user"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Cada usuario puede tener un juego una sola vez (dos usuarios sí pueden tener el mismo)
+            models.UniqueConstraint(fields=["user", "external_game_id"], name="library_entry_user_game_uniq"),
+        ]
+        indexes = [
+            # Listados paginados por id y filtrados por estado
+            models.Index(fields=["user", "id"], name="library_entry_user_id_idx"),
+            models.Index(fields=["user", "status"], name="library_entry_user_status_idx"),
+            # Orden por horas jugadas ("más jugados") con desempate por id
+            models.Index(fields=["user", "hours_played", "id"], name="library_entry_user_hours_idx"),
+        ]
 
     # --- Simple methods for easy unit tests (not used by the exercises) ---
 
@@ -53,4 +69,161 @@ class LibraryEntry(models.Model):
         else:
             return -1
 
-    
\ No newline at end of file
+
+class LibraryVersion(models.Model):
+    """
+    Versión de la biblioteca de cada usuario. Cualquier escritura sobre sus
+    entradas la incrementa (en la misma transacción), así que comparar versiones
+    basta para saber si algo ha cambiado sin leer las entradas.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="library_version",
+    )
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+
+class LibrarySummary(models.Model):
+    """
+    Contadores de la biblioteca de cada usuario (entradas por estado y horas
+    totales). Se actualizan en la misma transacción que cada alta, cambio o
+    borrado, así que leer el resumen es una búsqueda por clave primaria.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="library_summary",
+    )
+    total_entries = models.IntegerField(default=0)
+    total_hours = models.BigIntegerField(default=0)
+    wishlist = models.IntegerField(default=0)
+    playing = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    dropped = models.IntegerField(default=0)
+
+
+class LibraryEvent(models.Model):
+    """
+    Registro de actividad (library.activity): una fila por alta, cambio o
+    borrado de una entrada. Solo se insertan filas; nunca se modifican.
+
+    Filas compactas para una tabla que crece sin límite: tipo y estados como
+    enteros pequeños, sin claves foráneas (el historial sobrevive a la entrada
+    y no hay comprobación extra en cada INSERT).
+    """
+    KIND_CREATED = 1
+    KIND_UPDATED = 2
+    KIND_DELETED = 3
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        db_index=False,   # lo cubre el índice (user, created_at, id)
+    )
+    entry_id = models.BigIntegerField()
+    external_game_id = models.CharField(max_length=100)
+    kind = models.PositiveSmallIntegerField()
+    # Códigos de library.activity.STATUS_CODES; None en el lado que no existe
+    old_status = models.PositiveSmallIntegerField(null=True)
+    new_status = models.PositiveSmallIntegerField(null=True)
+    old_hours = models.IntegerField(null=True)
+    new_hours = models.IntegerField(null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Feed de cada usuario por fecha (y rangos de fechas por usuario)
+            models.Index(fields=["user", "created_at", "id"], name="library_event_user_time_idx"),
+            # Cambios de un usuario a partir de un cursor (library.sync)
+            models.Index(fields=["user", "id"], name="library_event_user_id_idx"),
+            # Rangos de fechas globales: BRIN en PostgreSQL (ver la migración 0010)
+            models.Index(fields=["created_at"], name="library_event_created_idx"),
+        ]
+
+
+class GameStats(models.Model):
+    """
+    Estadísticas globales de cada juego sobre todas las bibliotecas: en cuántas
+    está (entries), cuántos lo han jugado (players, las entradas que no son
+    wishlist), horas totales y entradas por estado. Se actualizan en la misma
+    transacción que cada cambio (library.game_stats) y se pueden reconstruir.
+    """
+    external_game_id = models.CharField(max_length=100, primary_key=True)
+    entries = models.IntegerField(default=0)
+    players = models.IntegerField(default=0)
+    total_hours = models.BigIntegerField(default=0)
+    wishlist = models.IntegerField(default=0)
+    playing = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    dropped = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Clasificaciones (library.game_stats.LEADERBOARDS): horas, jugadores y completados
+            models.Index(fields=["-total_hours", "external_game_id"], name="game_stats_hours_idx"),
+            models.Index(fields=["-players", "external_game_id"], name="game_stats_players_idx"),
+            models.Index(fields=["-completed", "external_game_id"], name="game_stats_completed_idx"),
+        ]
+
+
+class GameHours(models.Model):
+    """
+    Histograma exacto de horas jugadas por juego: cuántos jugadores (entradas
+    que no son wishlist) tienen cada valor de hours_played. De aquí salen la
+    mediana y el percentil 90 sin leer las entradas.
+    """
+    external_game_id = models.CharField(max_length=100)
+    hours = models.IntegerField()
+    entries = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["external_game_id", "hours"], name="game_hours_game_hours_uniq"),
+        ]
+
+
+class Game(models.Model):
+    """
+    Copia local de los datos del catálogo externo de juegos (título, portada)
+    por external_game_id. La rellena library.catalog según se necesita; una
+    fila anterior a CATALOG_REFRESH_AFTER se vuelve a pedir al catálogo.
+    """
+    external_id = models.CharField(max_length=100, unique=True)
+    title = models.CharField(max_length=255)
+    cover_url = models.URLField(max_length=500, blank=True)
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Último juego guardado: generación del catálogo (library.catalog.latest_fetch)
+            models.Index(fields=["fetched_at"], name="library_game_fetched_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class LibraryImport(models.Model):
+    """
+    Resultado de una importación de biblioteca (library.imports): contadores y,
+    si hubo líneas rechazadas, el informe de errores descargable (NDJSON).
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="library_imports",
+    )
+    format = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    lines = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    invalid = models.IntegerField(default=0)
+    error_report = models.FileField(upload_to="library_imports/", blank=True)
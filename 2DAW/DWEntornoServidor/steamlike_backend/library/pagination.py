@@ -0,0 +1,143 @@
+import base64
+import json
+from django.db.models import Q
+from library.serializers import ENTRY_FIELDS
+
+# Claves de ordenación permitidas (nombre público -> campo del modelo).
+# El desempate siempre se hace por "id", así el orden es total y estable.
+SORT_FIELDS = {
+    "id": "id",
+    "hours_played": "hours_played",
+    "external_game_id": "external_game_id",
+}
+
+# Tipo esperado del valor guardado en el cursor para cada campo.
+_FIELD_TYPES = {
+    "id": int,
+    "hours_played": int,
+    "external_game_id": str,
+}
+
+DEFAULT_SORT = "id"
+
+
+class CursorError(ValueError):
+    """Cursor o parámetros de paginación inválidos. "field" indica el parámetro culpable."""
+
+    def __init__(self, message, field="cursor"):
+        super().__init__(message)
+        self.field = field
+
+
+def parse_sort(sort):
+    """
+    Valida la clave de ordenación ("id", "-hours_played", ...).
+    Devuelve (campo, descendente).
+    """
+    if not sort:
+        sort = DEFAULT_SORT
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in SORT_FIELDS:
+        raise CursorError("Orden no permitido. Los valores permitidos son: " + ", ".join(SORT_FIELDS), "sort")
+    return SORT_FIELDS[name], descending
+
+
+def sort_ordering(sort, reverse=False):
+    """ORDER BY para una clave de ordenación, siempre con "id" como desempate."""
+    field, descending = parse_sort(sort)
+    prefix = "-" if descending != reverse else ""
+    if field == "id":
+        return [f"{prefix}id"]
+    return [f"{prefix}{field}", f"{prefix}id"]
+
+
+def parse_limit(raw, default, maximum):
+    if raw in (None, ""):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise CursorError(f"El límite debe ser un entero entre 1 y {maximum}", "limit")
+    if limit < 1 or limit > maximum:
+        raise CursorError(f"El límite debe ser un entero entre 1 y {maximum}", "limit")
+    return limit
+
+
+def encode_cursor(sort, value, last_id, direction):
+    """
+    Cursor opaco: JSON en base64 url-safe (sin relleno).
+    Guarda la clave de orden, el valor de la última fila vista, su id y el sentido.
+    """
+    raw = json.dumps({"s": sort, "v": value, "i": last_id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort, value, last_id, direction = data["s"], data["v"], data["i"], data["d"]
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise CursorError("Cursor inválido")
+    if not isinstance(last_id, int) or direction not in ("n", "p") or not isinstance(sort, str):
+        raise CursorError("Cursor inválido")
+    return sort, value, last_id, direction
+
+
+def _after(field, descending, value, last_id):
+    """Predicado keyset: filas estrictamente posteriores a (value, last_id) en el orden dado."""
+    op = "lt" if descending else "gt"
+    if field == "id":
+        return Q(**{f"id__{op}": last_id})
+    return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": last_id})
+
+
+def paginate(queryset, sort=None, limit=50, cursor=None, fields=ENTRY_FIELDS):
+    """
+    Paginación por keyset (sin OFFSET ni COUNT): cada página es un
+    "WHERE (clave, id) > (...) ORDER BY clave, id LIMIT n+1", así que su
+    coste no depende del tamaño de la biblioteca.
+
+    "queryset" devuelve tuplas (values_list) con los campos "fields", que deben
+    incluir "id" y el campo de orden. Devuelve (filas, cursor_siguiente, cursor_anterior).
+    """
+    if cursor:
+        cursor_sort, value, last_id, direction = decode_cursor(cursor)
+        if sort and sort != cursor_sort:
+            raise CursorError("El cursor no corresponde al orden solicitado", "sort")
+        sort = cursor_sort
+    else:
+        value, last_id, direction = None, None, "n"
+        sort = sort or DEFAULT_SORT
+
+    field, descending = parse_sort(sort)
+    if cursor and field != "id" and not isinstance(value, _FIELD_TYPES[field]):
+        raise CursorError("Cursor inválido")
+    backwards = direction == "p"
+    # Para ir hacia atrás se recorre el orden inverso y luego se da la vuelta.
+    scan_desc = descending != backwards
+
+    if cursor:
+        queryset = queryset.filter(_after(field, scan_desc, value, last_id))
+
+    rows = list(queryset.order_by(*sort_ordering(sort, reverse=backwards))[:limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    first, last = rows[0], rows[-1]
+    key, pk = fields.index(field), fields.index("id")
+    # Hacia delante: hay siguiente si sobró una fila; hay anterior si venimos de un cursor.
+    # Hacia atrás: al revés.
+    has_next = has_more if not backwards else True
+    has_prev = bool(cursor) if not backwards else has_more
+
+    next_cursor = encode_cursor(sort, last[key], last[pk], "n") if has_next else None
+    prev_cursor = encode_cursor(sort, first[key], first[pk], "p") if has_prev else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,25 @@
+# Única declaración de los campos que devuelve la API de biblioteca.
+# Listados, detalle, alta y PATCH usan todos estas funciones.
+ENTRY_FIELDS = ("id", "external_game_id", "status", "hours_played")
+
+
+def entry_rows(queryset):
+    """
+    Filas como tuplas (values_list), sin crear instancias del modelo:
+    es lo que usan los listados.
+    """
+    return queryset.values_list(*ENTRY_FIELDS)
+
+
+def row_to_dict(row):
+    """Tupla en el orden de ENTRY_FIELDS -> dict de la respuesta."""
+    return dict(zip(ENTRY_FIELDS, row))
+
+
+def rows_to_dicts(rows):
+    return [dict(zip(ENTRY_FIELDS, row)) for row in rows]
+
+
+def entry_to_dict(entry):
+    """Instancia del modelo -> dict de la respuesta (detalle, alta y PATCH)."""
+    return {field: getattr(entry, field) for field in ENTRY_FIELDS}
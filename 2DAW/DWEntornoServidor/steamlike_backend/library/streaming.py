@@ -0,0 +1,97 @@
+from library.serializers import ENTRY_FIELDS, entry_rows, row_to_dict
+from steamlike_backend.codec import dumps
+
+# Tamaño aproximado (en bytes) de cada trozo que se envía al cliente.
+# Agrupar filas evita un write() por fila sin acumular la respuesta entera.
+BUFFER_SIZE = 64 * 1024
+
+
+def iter_entry_rows(queryset, chunk_size):
+    """
+    Recorre las entradas como dicts usando un cursor del lado del servidor
+    (QuerySet.iterator), así que en memoria solo hay "chunk_size" filas a la vez.
+    """
+    if not queryset.ordered:
+        queryset = queryset.order_by("id")
+    for row in entry_rows(queryset).iterator(chunk_size=chunk_size):
+        yield row_to_dict(row)
+
+
+def _buffered(pieces):
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def ndjson_stream(rows):
+    """Un objeto JSON por línea."""
+    return _buffered(dumps(row) + b"\n" for row in rows)
+
+
+def json_array_stream(rows):
+    """Un array JSON normal, pero generado por trozos."""
+    def pieces():
+        yield b"["
+        first = True
+        for row in rows:
+            if first:
+                first = False
+                yield dumps(row)
+            else:
+                yield b"," + dumps(row)
+        yield b"]"
+    return _buffered(pieces())
+
+
+# --- Variantes asíncronas (vistas de library.async_views bajo ASGI) ---
+
+async def aiter_entry_rows(queryset, chunk_size):
+    """
+    Como iter_entry_rows, pero leyendo el cursor con QuerySet.aiterator.
+    Se usa values() y no values_list(): el iterable de values_list() lanza la
+    consulta al crearse, fuera del hilo del ORM, y aiterator() falla con él.
+    """
+    if not queryset.ordered:
+        queryset = queryset.order_by("id")
+    async for row in queryset.values(*ENTRY_FIELDS).aiterator(chunk_size=chunk_size):
+        yield row
+
+
+async def _abuffered(pieces):
+    buffer = []
+    size = 0
+    async for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def andjson_stream(rows):
+    return _abuffered(dumps(row) + b"\n" async for row in rows)
+
+
+def ajson_array_stream(rows):
+    async def pieces():
+        yield b"["
+        first = True
+        async for row in rows:
+            if first:
+                first = False
+                yield dumps(row)
+            else:
+                yield b"," + dumps(row)
+        yield b"]"
+    return _abuffered(pieces())
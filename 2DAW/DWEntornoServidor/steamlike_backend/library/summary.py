@@ -0,0 +1,95 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from library.models import LibraryEntry, LibrarySummary
+
+COUNTER_FIELDS = ("total_entries", "total_hours") + LibraryEntry.ALLOWED_STATUSES
+
+
+def summary_delta(changes):
+    """
+    Suma el efecto de una lista de cambios (ver library.changes.EntryChange)
+    sobre los contadores. Solo devuelve los contadores que cambian.
+    """
+    delta = {}
+
+    def add(field, value):
+        delta[field] = delta.get(field, 0) + value
+
+    for change in changes:
+        if change.old_status is not None:
+            add("total_entries", -1)
+            add("total_hours", -change.old_hours)
+            if change.old_status in LibraryEntry.ALLOWED_STATUSES:
+                add(change.old_status, -1)
+        if change.new_status is not None:
+            add("total_entries", 1)
+            add("total_hours", change.new_hours)
+            if change.new_status in LibraryEntry.ALLOWED_STATUSES:
+                add(change.new_status, 1)
+    return {field: value for field, value in delta.items() if value}
+
+
+def compute_summaries(user_ids=None):
+    """
+    Recalcula los contadores desde cero con un GROUP BY (user, status).
+    Devuelve {user_id: {contador: valor}}.
+    """
+    rows = LibraryEntry.objects.filter(user__isnull=False)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    rows = rows.values("user_id", "status").annotate(n=Count("id"), hours=Sum("hours_played")).order_by()
+
+    summaries = {}
+    for row in rows:
+        counters = summaries.setdefault(row["user_id"], dict.fromkeys(COUNTER_FIELDS, 0))
+        counters["total_entries"] += row["n"]
+        counters["total_hours"] += row["hours"] or 0
+        if row["status"] in LibraryEntry.ALLOWED_STATUSES:
+            counters[row["status"]] += row["n"]
+    return summaries
+
+
+def apply_summary_delta(user_id, delta):
+    """
+    Aplica los incrementos con un UPDATE ... SET x = x + n. Si el usuario aún no
+    tiene fila, se crea calculándola desde la tabla (que ya incluye los cambios
+    de la transacción en curso).
+    """
+    if user_id is None or not delta:
+        return
+    updated = LibrarySummary.objects.filter(user_id=user_id).update(
+        **{field: F(field) + value for field, value in delta.items()}
+    )
+    if updated:
+        return
+    counters = compute_summaries([user_id]).get(user_id, dict.fromkeys(COUNTER_FIELDS, 0))
+    try:
+        with transaction.atomic():
+            LibrarySummary.objects.create(user_id=user_id, **counters)
+    except IntegrityError:
+        # Otra transacción ha creado la fila a la vez: basta con sumar lo nuestro
+        LibrarySummary.objects.filter(user_id=user_id).update(
+            **{field: F(field) + value for field, value in delta.items()}
+        )
+
+
+def rebuild_summaries(user_ids=None):
+    """
+    Reconstruye los contadores (todos o los de los usuarios indicados).
+    Devuelve cuántas filas se han escrito.
+    """
+    with transaction.atomic():
+        summaries = compute_summaries(user_ids)
+        # Quien ya no tenga entradas se queda a cero
+        existing = LibrarySummary.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.update(**dict.fromkeys(COUNTER_FIELDS, 0))
+        LibrarySummary.objects.bulk_create(
+            [LibrarySummary(user_id=user_id, **counters) for user_id, counters in summaries.items()],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=list(COUNTER_FIELDS),
+            batch_size=1000,
+        )
+    return len(summaries)
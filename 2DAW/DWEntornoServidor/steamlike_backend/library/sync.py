@@ -0,0 +1,137 @@
+"""
+Sincronización incremental de la biblioteca para los clientes (delta sync).
+
+El cursor de cambios es el id del último evento del registro de actividad
+(LibraryEvent) que ha visto el cliente. Los ids de un mismo usuario crecen en
+el orden en que se confirman sus cambios: record_entry_changes actualiza antes
+la fila de LibraryVersion del usuario, que queda bloqueada hasta el final de
+la transacción, así que dos escrituras sobre la misma biblioteca no se cruzan.
+
+Una página de cambios es un recorrido del índice (user, id) a partir del
+cursor: su coste depende de los cambios, no del tamaño de la biblioteca. De
+cada entrada tocada se devuelve su estado actual (o una marca de borrado si ya
+no existe), así que aplicar dos veces la misma página no cambia nada.
+
+Hace falta una sincronización completa cuando el cursor es anterior a los
+eventos que se conservan (prune_library_activity borra los antiguos) o si el
+registro de actividad está desactivado. Las llamadas sin cambios adelantan el
+cursor hasta el último evento de la tabla, así que un usuario inactivo no
+cae en una sincronización completa cada vez que se borran eventos.
+"""
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from library.models import LibraryEntry, LibraryEvent, LibraryVersion
+from library.pagination import CursorError, decode_cursor, encode_cursor
+from library.serializers import ENTRY_FIELDS, rows_to_dicts
+
+CHANGES_SORT = "changes"
+
+
+def encode_changes_cursor(event_id):
+    return encode_cursor(CHANGES_SORT, None, event_id, "n")
+
+
+def decode_changes_cursor(cursor):
+    try:
+        sort, _, event_id, _ = decode_cursor(cursor)
+    except CursorError as e:
+        raise CursorError(str(e), "since")
+    if sort != CHANGES_SORT or event_id < 0:
+        raise CursorError("Cursor inválido", "since")
+    return event_id
+
+
+def latest_cursor(user_id, since=0):
+    """
+    Cursor más avanzado que se le puede dar al usuario sin que se le escape
+    ningún cambio: el último evento de toda la tabla, no solo los suyos (el
+    feed filtra por usuario). Así el cursor de un usuario sin eventos
+    recientes no se queda por detrás de los que borra prune_library_activity.
+
+    Se lee con la fila de LibraryVersion del usuario bloqueada: espera a que
+    termine una escritura suya en curso, y las siguientes tendrán ids mayores.
+    Si el usuario aún no tiene fila se crea (con versión 0) para poder
+    bloquearla: si no, su primera escritura podría estar en curso sin nada que
+    la espere. Si mientras tanto ha llegado algún cambio posterior a since, se
+    devuelve since para que salga en la siguiente llamada.
+    """
+    connection = connections[LibraryEvent.objects.db]
+    locking = connection.features.has_select_for_update
+    # En SQLite las escrituras ya van de una en una y sin FOR UPDATE no hace falta transacción
+    with transaction.atomic(using=connection.alias) if locking else nullcontext():
+        if locking:
+            LibraryVersion.objects.select_for_update().get_or_create(
+                user_id=user_id, defaults={"updated_at": timezone.now()}
+            )
+        if since and LibraryEvent.objects.filter(user_id=user_id, id__gt=since).exists():
+            return encode_changes_cursor(since)
+        last = LibraryEvent.objects.aggregate(last=Max("id"))["last"]
+    return encode_changes_cursor(max(since, last or 0))
+
+
+def cursor_expired(event_id):
+    """
+    True si pueden faltar eventos posteriores a event_id porque ya se han
+    borrado: los borrados van de los más antiguos a los más nuevos, así que
+    solo puede faltar alguno si hay un hueco entre el cursor y el primero que
+    queda. Es una consulta por la clave primaria.
+    """
+    first = LibraryEvent.objects.aggregate(first=Min("id"))["first"]
+    return first is not None and event_id < first - 1
+
+
+def full_resync(user_id):
+    """
+    Respuesta que pide al cliente descargar la biblioteca completa. El cursor
+    se toma antes de la descarga: lo que cambie mientras tanto volverá a
+    llegar en la siguiente llamada.
+    """
+    return {"full_resync": True, "results": [], "deleted": [], "cursor": latest_cursor(user_id), "has_more": False}
+
+
+def changes_since(user_id, cursor, limit):
+    """
+    Cambios de la biblioteca posteriores a cursor, como mucho limit eventos.
+    Devuelve {"full_resync", "results" (entradas con su estado actual),
+    "deleted" (marcas de borrado), "cursor", "has_more"}.
+    """
+    if not settings.LIBRARY_ACTIVITY_LOG or not cursor:
+        return full_resync(user_id)
+    since = decode_changes_cursor(cursor)
+    if cursor_expired(since):
+        return full_resync(user_id)
+
+    events = list(
+        LibraryEvent.objects.filter(user_id=user_id, id__gt=since)
+        .order_by("id").values_list("id", "entry_id", "external_game_id")[:limit + 1]
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+    if not events:
+        return {"full_resync": False, "results": [], "deleted": [], "cursor": latest_cursor(user_id, since), "has_more": False}
+
+    # Una entrada tocada varias veces sale una sola vez, con su estado actual
+    touched = {}
+    for _, entry_id, external_game_id in events:
+        touched[entry_id] = external_game_id
+    rows = list(
+        LibraryEntry.objects.filter(user_id=user_id, id__in=list(touched))
+        .order_by("id").values_list(*ENTRY_FIELDS)
+    )
+    alive = {row[0] for row in rows}
+    deleted = [
+        {"id": entry_id, "external_game_id": external_game_id}
+        for entry_id, external_game_id in sorted(touched.items()) if entry_id not in alive
+    ]
+    return {
+        "full_resync": False,
+        "results": rows_to_dicts(rows),
+        "deleted": deleted,
+        "cursor": encode_changes_cursor(events[-1][0]),
+        "has_more": has_more,
+    }
+
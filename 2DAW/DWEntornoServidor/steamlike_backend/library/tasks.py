@@ -0,0 +1,50 @@
+"""
+Tareas en segundo plano de la biblioteca (jobs.queue): las ejecuta
+manage.py runworker fuera de las peticiones.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import enqueue, task
+from library import game_stats, imports
+from library.summary import rebuild_summaries
+
+
+# Un solo intento: repetir una importación a medias marcaría como repetidas
+# las líneas de los bloques que ya se guardaron
+@task("library.import", max_attempts=1)
+def import_file(user_id, path, format):
+    """Importa un fichero subido (guardado en default_storage) y lo borra después."""
+    try:
+        user = User.objects.get(id=user_id)
+        with default_storage.open(path, "rb") as source:
+            library_import = imports.run_import(user, source, format, settings.LIBRARY_IMPORT_CHUNK_SIZE)
+        return imports.import_to_dict(library_import)
+    finally:
+        default_storage.delete(path)
+
+
+@task("library.rebuild_summary")
+def rebuild_summary(user_ids=None):
+    return {"written": rebuild_summaries(user_ids)}
+
+
+def schedule_game_stats_rebuild(run_at=None):
+    """Encola la reconstrucción de GameStats si no hay ya una pendiente."""
+    pending = Job.objects.filter(name="library.rebuild_game_stats", status=Job.STATUS_QUEUED).first()
+    return pending or enqueue("library.rebuild_game_stats", run_at=run_at)
+
+
+@task("library.rebuild_game_stats")
+def rebuild_game_stats():
+    try:
+        games, histogram = game_stats.rebuild_game_stats()
+    finally:
+        # Reconstrucción periódica: cada ejecución, aunque falle, deja programada la siguiente
+        if settings.GAME_STATS_REBUILD_INTERVAL > 0:
+            schedule_game_stats_rebuild(timezone.now() + timedelta(seconds=settings.GAME_STATS_REBUILD_INTERVAL))
+    return {"games": games, "histogram_rows": histogram}
@@ -0,0 +1,121 @@
+import json
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from library.changes import deleted, record_entry_changes
+from library.models import LibraryEntry, LibraryEvent
+
+class LibraryActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="activo", password="12345678")
+        self.client.force_login(self.user)
+
+    def _send(self, method, url, payload):
+        return getattr(self.client, method)(url, data=json.dumps(payload), content_type="application/json")
+
+    def test_every_write_path_is_logged(self):
+        # Precondiciones
+        entry_id = self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing", "hours_played": 2}).json()["id"]
+        self._send("post", "/api/library/entries/bulk/", [
+            {"external_game_id": "b", "status": "wishlist"},
+            {"external_game_id": "c", "status": "playing", "hours_played": 1},
+        ])
+        self._send("patch", f"/api/library/entries/{entry_id}/", {"status": "completed", "hours_played": 9})
+        # Un PATCH que no cambia nada no deja evento
+        self._send("patch", f"/api/library/entries/{entry_id}/", {"status": "completed"})
+        entry = LibraryEntry.objects.get(user=self.user, external_game_id="c")
+        with transaction.atomic():
+            change = deleted(entry)
+            entry.delete()
+            record_entry_changes(self.user.id, [change])
+
+        # Llamada
+        response = self.client.get("/api/library/activity/")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        events = response.json()["results"]
+        self.assertEqual(
+            [(e["kind"], e["external_game_id"]) for e in events],
+            [("deleted", "c"), ("updated", "a"), ("created", "c"), ("created", "b"), ("created", "a")],
+        )
+        self.assertEqual(
+            {k: events[1][k] for k in ("entry_id", "old_status", "new_status", "old_hours", "new_hours")},
+            {"entry_id": entry_id, "old_status": "playing", "new_status": "completed", "old_hours": 2, "new_hours": 9},
+        )
+        self.assertIsNone(response.json()["next"])
+
+    def test_keyset_pagination_and_time_range(self):
+        # Precondiciones: 5 eventos, dos con la misma fecha
+        base = timezone.now().replace(microsecond=0) - timedelta(days=10)
+        moments = [base, base + timedelta(days=1), base + timedelta(days=1), base + timedelta(days=2), base + timedelta(days=5)]
+        events = LibraryEvent.objects.bulk_create([
+            LibraryEvent(user=self.user, entry_id=i, external_game_id=f"g{i}", kind=LibraryEvent.KIND_CREATED, new_status=1, created_at=m)
+            for i, m in enumerate(moments)
+        ])
+        LibraryEvent.objects.create(user=User.objects.create_user(username="otro"), entry_id=99, external_game_id="x", kind=1, created_at=base)
+
+        # Llamada: páginas de 2
+        seen = []
+        url = "/api/library/activity/?limit=2"
+        while url:
+            data = self.client.get(url).json()
+            seen += [e["entry_id"] for e in data["results"]]
+            url = f"/api/library/activity/?limit=2&cursor={data['next']}" if data["next"] else None
+
+        # Comprobaciones
+        self.assertEqual(seen, [4, 3, 2, 1, 0])
+        in_range = self.client.get(f"/api/library/activity/?since={(base + timedelta(days=1)).date()}&until={(base + timedelta(days=2)).date()}")
+        self.assertEqual([e["entry_id"] for e in in_range.json()["results"]], [3, 2, 1])
+        self.assertEqual(len(events), 5)
+
+    def test_invalid_parameters(self):
+        response = self.client.get("/api/library/activity/?since=ayer&limit=0")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(next(iter(response.json()["details"])), {"since", "limit"})
+        self.assertEqual(self.client.get("/api/library/activity/?cursor=xx").status_code, 400)
+        self.assertEqual(self.client.get("/api/library/activity/?since=2026-02-01&until=2026-01-01").status_code, 400)
+        # Un cursor del feed global no vale en el del usuario
+        self.assertEqual(self.client.get("/api/library/activity/?cursor=eyJzIjoiLWlkIiwidiI6bnVsbCwiaSI6NSwiZCI6Im4ifQ").status_code, 400)
+
+    def test_global_feed_requires_staff(self):
+        self.assertEqual(self.client.get("/api/library/activity/all/").status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/library/activity/").status_code, 401)
+
+    def test_global_feed(self):
+        other = User.objects.create_user(username="otro", password="12345678")
+        self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing"})
+        self.client.force_login(other)
+        self._send("post", "/api/library/entries/", {"external_game_id": "b", "status": "playing"})
+        other.is_staff = True
+        other.save()
+
+        first = self.client.get("/api/library/activity/all/?limit=1").json()
+        second = self.client.get(f"/api/library/activity/all/?limit=1&cursor={first['next']}").json()
+
+        self.assertEqual([(e["user_id"], e["external_game_id"]) for e in first["results"] + second["results"]], [
+            (other.id, "b"), (self.user.id, "a"),
+        ])
+        self.assertIsNone(second["next"])
+
+    def test_hours_trend(self):
+        entry_id = self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing", "hours_played": 2}).json()["id"]
+        self._send("patch", f"/api/library/entries/{entry_id}/", {"hours_played": 7})
+        LibraryEvent.objects.create(
+            user=self.user, entry_id=entry_id, external_game_id="a", kind=LibraryEvent.KIND_UPDATED,
+            old_status=2, new_status=2, old_hours=0, new_hours=4, created_at=timezone.now() - timedelta(days=3),
+        )
+
+        data = self.client.get("/api/library/activity/trend/").json()
+
+        self.assertEqual([(d["hours"], d["events"]) for d in data["results"]], [(4, 1), (7, 2)])
+        self.assertEqual(data["results"][-1]["day"], timezone.now().date().isoformat())
+        self.assertEqual(self.client.get("/api/library/activity/trend/?since=2020-01-01").status_code, 400)
+
+    @override_settings(LIBRARY_ACTIVITY_LOG=False)
+    def test_can_be_disabled(self):
+        self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing"})
+        self.assertFalse(LibraryEvent.objects.exists())
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+from library import async_views, catalog
+from library.models import Game, LibraryEntry, LibrarySummary
+from users import async_views as users_async_views
+from users import hashing
+
+# Las mismas rutas que steamlike_backend.urls con API_ASYNC_VIEWS activo
+urlpatterns = [
+    path("api/library/entries/", async_views.add_library_entry),
+    path("api/library/entries/<int:id>/", async_views.library_entry_detail),
+    path("api/register/", users_async_views.register),
+    path("api/auth/login/", users_async_views.login_view),
+    path("api/users/me/", users_async_views.me_view),
+]
+
+@override_settings(ROOT_URLCONF=__name__)
+class LibraryAsyncViewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="asincrono", password="12345678")
+        self.entry = LibraryEntry.objects.create(external_game_id="g1", status="playing", hours_played=1, user=self.user)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/api/library/entries/")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_list_and_conditional_get(self):
+        # Precondiciones
+        await self.async_client.aforce_login(self.user)
+
+        # Llamada
+        response = await self.async_client.get("/api/library/entries/")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {"id": self.entry.id, "external_game_id": "g1", "status": "playing", "hours_played": 1}
+        ])
+        again = await self.async_client.get("/api/library/entries/", headers={"if-none-match": response["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    @override_settings(CATALOG_URL="")
+    async def test_list_expand_game(self):
+        catalog.reset_client()
+        await Game.objects.acreate(external_id="g1", title="Juego uno", fetched_at=timezone.now())
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get("/api/library/entries/?expand=game")
+
+        self.assertEqual(response.json()[0]["game"], {"id": "g1", "title": "Juego uno", "cover_url": ""})
+        catalog.reset_client()
+
+    async def test_cached_reads(self):
+        await self.async_client.aforce_login(self.user)
+        body = json.dumps({"external_game_id": "g2", "status": "wishlist"})
+        await self.async_client.post("/api/library/entries/", data=body, content_type="application/json")
+
+        first = await self.async_client.get("/api/library/entries/?sort=id")
+        second = await self.async_client.get("/api/library/entries/?sort=id")
+
+        self.assertEqual((first["X-Library-Cache"], second["X-Library-Cache"]), ("miss", "hit"))
+        self.assertEqual(second.json(), first.json())
+
+    async def test_timing_middleware_counts_queries_in_orm_thread(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f"/api/library/entries/{self.entry.id}/")
+        # sesión, usuario, versión de la biblioteca y la entrada
+        self.assertIn('desc="4 queries"', response["Server-Timing"])
+
+    async def test_timing_middleware_concurrent_requests(self):
+        # Precondiciones
+        await self.async_client.aforce_login(self.user)
+        url = f"/api/library/entries/{self.entry.id}/"
+
+        # Llamada: peticiones a la vez que comparten la conexión del hilo del ORM
+        responses = await asyncio.gather(*(self.async_client.get(url) for _ in range(3)))
+
+        # Comprobaciones: cada una cuenta solo sus consultas
+        for response in responses:
+            self.assertIn('desc="4 queries"', response["Server-Timing"])
+
+    async def test_create_updates_counters_and_rejects_duplicates(self):
+        await self.async_client.aforce_login(self.user)
+        body = json.dumps({"external_game_id": "g2", "status": "completed", "hours_played": 4})
+
+        response = await self.async_client.post("/api/library/entries/", data=body, content_type="application/json")
+        duplicate = await self.async_client.post("/api/library/entries/", data=body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["external_game_id"], "g2")
+        self.assertEqual(duplicate.status_code, 400)
+        self.assertEqual(duplicate.json()["error"], "duplicate_entry")
+        summary = await LibrarySummary.objects.aget(user=self.user)
+        self.assertEqual((summary.total_entries, summary.completed, summary.total_hours), (2, 1, 5))
+
+    async def test_detail_get_and_patch(self):
+        await self.async_client.aforce_login(self.user)
+        url = f"/api/library/entries/{self.entry.id}/"
+
+        response = await self.async_client.patch(url, data=json.dumps({"hours_played": 9}), content_type="application/json")
+        invalid = await self.async_client.patch(url, data=json.dumps({"status": "x"}), content_type="application/json")
+        missing = await self.async_client.get("/api/library/entries/999999/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["hours_played"], 9)
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual((await self.async_client.get(url)).json()["hours_played"], 9)
+
+    async def test_stream_ndjson(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get("/api/library/entries/?stream=ndjson")
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([json.loads(line)["external_game_id"] for line in content.splitlines()], ["g1"])
+
+    async def test_register_login_and_me(self):
+        credentials = json.dumps({"username": "nuevo", "password": "12345678"})
+
+        registered = await self.async_client.post("/api/register/", data=credentials, content_type="application/json")
+        duplicate = await self.async_client.post("/api/register/", data=credentials, content_type="application/json")
+        anonymous = await self.async_client.get("/api/users/me/")
+        logged = await self.async_client.post("/api/auth/login/", data=credentials, content_type="application/json")
+        me = await self.async_client.get("/api/users/me/")
+
+        self.assertEqual(registered.status_code, 201)
+        self.assertEqual(duplicate.json()["details"], {"username": "duplicate"})
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertEqual(logged.status_code, 200)
+        self.assertEqual(me.json(), {"id": registered.json()["id"], "username": "nuevo"})
+
+    @override_settings(HASHING_WORKERS=1, HASHING_QUEUE_SIZE=0, HASHING_RETRY_AFTER=3)
+    async def test_login_goes_through_hashing_pool(self):
+        # Precondiciones: el único hueco del pool está ocupado
+        hashing.reset_pool()
+        pool = hashing.get_pool()
+        credentials = json.dumps({"username": "asincrono", "password": "12345678"})
+        pool.slots.acquire()
+        try:
+            # Llamada
+            response = await self.async_client.post("/api/auth/login/", data=credentials, content_type="application/json")
+        finally:
+            pool.slots.release()
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertEqual(pool.rejected, 1)
+        logged = await self.async_client.post("/api/auth/login/", data=credentials, content_type="application/json")
+        self.assertEqual(logged.status_code, 200)
+        hashing.reset_pool()
@@ -0,0 +1,167 @@
+import json
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from library import imports
+from library.models import LibraryEntry, LibrarySummary
+
+class LibraryBulkCreateAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="importador", password="12345678")
+        self.client.force_login(self.user)
+
+    def _post(self, payload):
+        return self.client.post("/api/library/entries/bulk/", data=json.dumps(payload), content_type="application/json")
+
+    def test_bulk_create_reports_each_item(self):
+        # Precondiciones
+        LibraryEntry.objects.create(external_game_id="ya_existe", status="playing", hours_played=1, user=self.user)
+        payload = [
+            {"external_game_id": "nuevo_1", "status": "playing", "hours_played": 3},
+            {"external_game_id": "ya_existe", "status": "completed"},
+            {"external_game_id": "nuevo_1", "status": "dropped"},
+            {"external_game_id": "malo", "status": "inventado", "hours_played": -1},
+            "no soy un objeto",
+            {"external_game_id": "nuevo_2", "status": "wishlist"},
+        ]
+
+        # Llamada
+        response = self._post(payload)
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["created"], data["skipped"], data["invalid"]), (2, 2, 2))
+        results = data["results"]
+        self.assertEqual([r["result"] for r in results], ["created", "skipped", "skipped", "invalid", "invalid", "created"])
+        self.assertEqual(results[2]["reason"], "duplicate_in_request")
+        self.assertEqual(set(results[3]["details"]), {"status", "hours_played"})
+        self.assertEqual(results[0]["id"], LibraryEntry.objects.get(external_game_id="nuevo_1").id)
+        self.assertEqual(LibraryEntry.objects.filter(user=self.user).count(), 3)
+
+    @override_settings(LIBRARY_BULK_BATCH_SIZE=2)
+    def test_bulk_create_uses_few_queries(self):
+        # Precondiciones: 6 entradas en lotes de 2 (el resumen ya existe, así no se recalcula)
+        LibrarySummary.objects.create(user=self.user)
+        payload = [{"external_game_id": f"g{i}", "status": "wishlist"} for i in range(6)]
+
+        # Llamada
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._post(payload)
+
+        # Comprobaciones: 2 consultas por lote sobre las entradas (existentes, INSERT ... RETURNING)
+        self.assertEqual(response.json()["created"], 6)
+        entry_queries = [q for q in ctx.captured_queries if '"library_libraryentry"' in q["sql"]]
+        self.assertEqual(len(entry_queries), 2 * 3)
+
+    def test_bulk_create_concurrent_insert_is_skipped(self):
+        # Precondiciones: otra petición del mismo usuario inserta "a" después de
+        # comprobar los que ya existen y antes del INSERT
+        insert_entries = imports.insert_entries
+
+        def racing_insert(user, rows):
+            LibraryEntry.objects.create(user=user, external_game_id="a", status="wishlist")
+            return insert_entries(user, rows)
+
+        # Llamada
+        with mock.patch("library.imports.insert_entries", side_effect=racing_insert):
+            response = self._post([
+                {"external_game_id": "a", "status": "playing", "hours_played": 5},
+                {"external_game_id": "b", "status": "playing", "hours_played": 2},
+            ])
+
+        # Comprobaciones
+        data = response.json()
+        self.assertEqual((data["created"], data["skipped"]), (1, 1))
+        self.assertEqual(data["results"][0]["reason"], "duplicate")
+        summary = LibrarySummary.objects.get(user=self.user)
+        self.assertEqual((summary.playing, summary.total_hours), (1, 2))
+
+    def test_bulk_create_rejects_non_list_body(self):
+        response = self._post({"external_game_id": "x", "status": "playing"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "validation_error")
+
+    @override_settings(LIBRARY_BULK_MAX_ITEMS=1)
+    def test_bulk_create_rejects_too_many_items(self):
+        payload = [{"external_game_id": "a", "status": "playing"}, {"external_game_id": "b", "status": "playing"}]
+        response = self._post(payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(LibraryEntry.objects.exists())
+
+    def test_bulk_create_requires_authentication(self):
+        self.client.logout()
+        response = self._post([{"external_game_id": "a", "status": "playing"}])
+        self.assertEqual(response.status_code, 401)
+
+    def test_bulk_create_allows_games_owned_by_other_users(self):
+        # Precondiciones
+        other = User.objects.create_user(username="vecino", password="12345678")
+        LibraryEntry.objects.create(external_game_id="compartido", status="playing", user=other)
+
+        # Llamada
+        response = self._post([{"external_game_id": "compartido", "status": "wishlist"}])
+
+        # Comprobaciones
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(LibraryEntry.objects.filter(external_game_id="compartido").count(), 2)
+
+
+class LibraryBulkUpdateAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="sincronizador", password="12345678")
+        self.other = User.objects.create_user(username="otro", password="12345678")
+        self.client.force_login(self.user)
+        self.e1 = LibraryEntry.objects.create(external_game_id="g1", status="playing", hours_played=1, user=self.user)
+        self.e2 = LibraryEntry.objects.create(external_game_id="g2", status="playing", hours_played=2, user=self.user)
+        self.ajena = LibraryEntry.objects.create(external_game_id="g3", status="playing", hours_played=3, user=self.other)
+
+    def _patch(self, payload):
+        return self.client.patch("/api/library/entries/bulk/", data=json.dumps(payload), content_type="application/json")
+
+    def test_bulk_update_reports_each_item(self):
+        # Precondiciones
+        payload = [
+            {"id": self.e1.id, "hours_played": 10},
+            {"id": self.e2.id, "status": "completed", "hours_played": 25},
+            {"id": self.ajena.id, "status": "dropped"},
+            {"id": self.e1.id, "status": "dropped"},
+            {"id": self.e2.id, "status": "inventado"},
+            {"status": "playing"},
+        ]
+
+        # Llamada
+        response = self._patch(payload)
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["updated"], data["not_found"], data["invalid"]), (2, 1, 3))
+        self.assertEqual(data["results"][1]["status"], "completed")
+        self.e1.refresh_from_db()
+        self.e2.refresh_from_db()
+        self.ajena.refresh_from_db()
+        self.assertEqual((self.e1.status, self.e1.hours_played), ("playing", 10))
+        self.assertEqual((self.e2.status, self.e2.hours_played), ("completed", 25))
+        # La entrada de otro usuario no se toca
+        self.assertEqual(self.ajena.status, "playing")
+
+    def test_bulk_update_only_writes_changed_columns(self):
+        # Precondiciones: el status enviado coincide con el actual, solo cambian las horas
+        payload = [
+            {"id": self.e1.id, "status": "playing", "hours_played": 7},
+            {"id": self.e2.id, "status": "playing", "hours_played": 8},
+        ]
+
+        # Llamada
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._patch(payload)
+
+        # Comprobaciones
+        self.assertEqual(response.json()["updated"], 2)
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "library_libraryentry"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"hours_played"', updates[0])
+        self.assertNotIn('"status"', updates[0])
@@ -0,0 +1,116 @@
+import json
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from library import cache as library_cache
+from library.models import LibraryEntry
+
+class LibraryCacheTests(TestCase):
+    def setUp(self):
+        caches["library"].clear()
+        library_cache.reset_stats()
+        self.user = User.objects.create_user(username="cacheado", password="12345678")
+        self.client.force_login(self.user)
+        # La biblioteca pasa por la API para tener versión (las de versión 0 no se cachean)
+        self.post({"external_game_id": "g1", "status": "playing", "hours_played": 3})
+
+    def post(self, body, url="/api/library/entries/"):
+        return self.client.post(url, data=json.dumps(body), content_type="application/json")
+
+    def test_second_read_is_a_hit(self):
+        # Precondiciones
+        first = self.client.get("/api/library/entries/")
+
+        # Llamada: sesión, usuario y versión; las entradas salen de la caché
+        with self.assertNumQueries(3):
+            second = self.client.get("/api/library/entries/")
+
+        # Comprobaciones
+        self.assertEqual((first["X-Library-Cache"], second["X-Library-Cache"]), ("miss", "hit"))
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["ETag"], first["ETag"])
+        stats = library_cache.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get("/api/library/entries/?status=playing")
+        response = self.client.get("/api/library/entries/?status=completed")
+        self.assertEqual(response["X-Library-Cache"], "miss")
+        self.assertEqual(response.json(), [])
+        again = self.client.get("/api/library/entries/?status=completed")
+        self.assertEqual(again["X-Library-Cache"], "hit")
+
+    def test_writes_bump_the_version(self):
+        entry = LibraryEntry.objects.get(user=self.user)
+        self.client.get("/api/library/entries/")
+        self.client.get(f"/api/library/entries/{entry.id}/")
+
+        # Alta
+        self.post({"external_game_id": "g2", "status": "wishlist"})
+        response = self.client.get("/api/library/entries/")
+        self.assertEqual(response["X-Library-Cache"], "miss")
+        self.assertEqual(len(response.json()), 2)
+
+        # PATCH
+        self.client.patch(f"/api/library/entries/{entry.id}/", data=json.dumps({"hours_played": 10}), content_type="application/json")
+        self.assertEqual(self.client.get(f"/api/library/entries/{entry.id}/").json()["hours_played"], 10)
+
+        # Alta masiva
+        self.post([{"external_game_id": "g3", "status": "completed"}], url="/api/library/entries/bulk/")
+        self.assertEqual(len(self.client.get("/api/library/entries/").json()), 3)
+
+    def test_admin_edit_bumps_the_version(self):
+        entry = LibraryEntry.objects.get(user=self.user)
+        self.client.get(f"/api/library/entries/{entry.id}/")
+        admin = User.objects.create_superuser(username="admin", password="12345678")
+        admin_client = self.client_class()
+        admin_client.force_login(admin)
+
+        admin_client.post(f"/admin/library/libraryentry/{entry.id}/change/", {
+            "external_game_id": "g1", "status": "completed", "hours_played": 7, "user": self.user.id,
+        })
+
+        response = self.client.get(f"/api/library/entries/{entry.id}/")
+        self.assertEqual(response["X-Library-Cache"], "miss")
+        self.assertEqual(response.json()["status"], "completed")
+
+    def test_not_cached(self):
+        # Sin versión, en streaming o con error
+        other = User.objects.create_user(username="sin_version", password="12345678")
+        LibraryEntry.objects.create(user=other, external_game_id="g1", status="playing")
+        other_client = self.client_class()
+        other_client.force_login(other)
+        self.assertNotIn("X-Library-Cache", other_client.get("/api/library/entries/"))
+
+        self.assertNotIn("X-Library-Cache", self.client.get("/api/library/entries/?stream=ndjson"))
+        self.client.get("/api/library/entries/999999/")
+        self.assertEqual(self.client.get("/api/library/entries/999999/").status_code, 404)
+        self.assertEqual(library_cache.cache_stats()["stores"], 0)
+
+    @override_settings(LIBRARY_CACHE_MAX_BYTES=10)
+    def test_large_responses_are_not_stored(self):
+        self.client.get("/api/library/entries/")
+        self.assertEqual(self.client.get("/api/library/entries/")["X-Library-Cache"], "miss")
+        self.assertEqual(library_cache.cache_stats()["too_large"], 2)
+
+    def test_filesystem_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "library": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+            }):
+                self.client.get("/api/library/entries/")
+                self.assertEqual(self.client.get("/api/library/entries/")["X-Library-Cache"], "hit")
+
+    def test_health_reports_counters(self):
+        self.client.get("/api/library/entries/")
+        self.client.get("/api/library/entries/")
+        data = self.client.get("/api/health/?cache=1").json()["library_cache"]
+        self.assertEqual((data["backend"], data["hits"], data["hit_ratio"]), ("locmem", 1, 0.5))
+
+    @override_settings(LIBRARY_CACHE="")
+    def test_disabled(self):
+        self.client.get("/api/library/entries/")
+        self.assertNotIn("X-Library-Cache", self.client.get("/api/library/entries/"))
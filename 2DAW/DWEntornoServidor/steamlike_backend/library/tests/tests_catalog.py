@@ -0,0 +1,254 @@
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from library import catalog
+from library.catalog import CatalogClient, TTLCache
+from library.models import Game, LibraryEntry
+from library.versioning import bump_library_version
+from steamlike_backend import codec
+
+
+class FakeCatalog:
+    """Catálogo de juegos de pega en un hilo: conoce los ids que empiezan por "g"."""
+
+    def __init__(self):
+        self.requests = []
+        # Portadas distintas de la normal, por id
+        self.covers = {}
+        self.gate = threading.Event()
+        self.gate.set()
+        self.received = threading.Event()
+        self.fail = False
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                ids = parse_qs(parts.query).get("id", [])
+                fake.requests.append(ids)
+                fake.received.set()
+                fake.gate.wait(5)
+                if fake.fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                body = codec.dumps({"games": [
+                    {"id": game_id, "title": f"Título {game_id}", "cover_url": fake.covers.get(game_id, f"https://img.example/{game_id}.jpg")}
+                    for game_id in ids if game_id.startswith("g")
+                ]})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class CatalogTestMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.catalog = FakeCatalog()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.catalog.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.catalog.requests.clear()
+        self.catalog.covers.clear()
+        self.catalog.fail = False
+        catalog.reset_client()
+
+    def tearDown(self):
+        catalog.reset_client()
+
+
+class TTLCacheTests(SimpleTestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set_many({"a": 1, "b": 2})
+        cache.get("a")
+        cache.set_many({"c": 3})
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertIs(cache.get("b"), catalog._MISSING)
+
+    def test_expiry(self):
+        cache = TTLCache(max_size=10, ttl=-1)
+        cache.set_many({"a": None})
+        self.assertIs(cache.get("a"), catalog._MISSING)
+
+
+class CatalogClientTests(CatalogTestMixin, TestCase):
+    def client_for(self, **kwargs):
+        return CatalogClient(self.catalog.url, **kwargs)
+
+    def test_batch_lookup_and_cache(self):
+        # Precondiciones
+        client = self.client_for(batch_size=100)
+        ids = [f"g{i}" for i in range(250)] + ["desconocido"]
+
+        # Llamada
+        games = client.get_many(ids)
+
+        # Comprobaciones: una petición por lote, y la segunda vez todo sale de la caché
+        self.assertEqual(len(self.catalog.requests), 3)
+        self.assertEqual(games["g7"]["title"], "Título g7")
+        self.assertIsNone(games["desconocido"])
+        self.assertEqual(Game.objects.count(), 250)
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get_many(ids), games)
+        self.assertEqual(len(self.catalog.requests), 3)
+
+    def test_fresh_local_rows_skip_the_catalog(self):
+        Game.objects.create(external_id="g1", title="Local", fetched_at=timezone.now())
+        Game.objects.create(external_id="g2", title="Antiguo", fetched_at=timezone.now() - timedelta(days=2))
+
+        games = self.client_for().get_many(["g1", "g2"])
+
+        self.assertEqual(self.catalog.requests, [["g2"]])
+        self.assertEqual((games["g1"]["title"], games["g2"]["title"]), ("Local", "Título g2"))
+        self.assertEqual(Game.objects.get(external_id="g2").title, "Título g2")
+
+    def test_catalog_down_serves_stale_rows_without_caching(self):
+        Game.objects.create(external_id="g1", title="Antiguo", fetched_at=timezone.now() - timedelta(days=2))
+        self.catalog.fail = True
+        client = self.client_for()
+
+        with self.assertLogs("steamlike.catalog", "WARNING"):
+            games = client.get_many(["g1", "g2"])
+
+        self.assertEqual(games, {"g1": {"id": "g1", "title": "Antiguo", "cover_url": ""}, "g2": None})
+        self.catalog.fail = False
+        self.assertEqual(client.get_many(["g2"])["g2"]["title"], "Título g2")
+
+    def test_invalid_cover_urls_are_dropped(self):
+        # Precondiciones: portadas que no caben en la columna o no son cadenas
+        signed = "https://cdn.example/g1.jpg?signature=" + "a" * 500
+        self.catalog.covers.update({"g1": signed, "g2": {"url": "x"}, "g3": None})
+
+        # Llamada
+        games = self.client_for().get_many(["g1", "g2", "g3", "g4"])
+
+        # Comprobaciones: el juego se guarda igual, sin portada
+        self.assertEqual([games[g]["cover_url"] for g in ("g1", "g2", "g3")], ["", "", ""])
+        self.assertEqual(games["g4"]["cover_url"], "https://img.example/g4.jpg")
+        self.assertEqual(
+            dict(Game.objects.values_list("external_id", "cover_url")),
+            {"g1": "", "g2": "", "g3": "", "g4": "https://img.example/g4.jpg"},
+        )
+
+    def test_without_catalog_url_uses_local_table(self):
+        Game.objects.create(external_id="x1", title="Solo local", fetched_at=timezone.now() - timedelta(days=30))
+        games = CatalogClient("").get_many(["x1", "x2"])
+        self.assertEqual((games["x1"]["title"], games["x2"]), ("Solo local", None))
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        # Precondiciones: el catálogo no responde hasta que todos estén esperando
+        client = self.client_for()
+        self.catalog.gate.clear()
+        self.catalog.received.clear()
+        results = []
+
+        def waiter():
+            results.append(client.get_many(["g1"])["g1"])
+
+        def release():
+            self.catalog.received.wait(5)
+            threads = [threading.Thread(target=waiter) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while client.stats["coalesced"] < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.catalog.gate.set()
+            for thread in threads:
+                thread.join()
+
+        releaser = threading.Thread(target=release)
+        releaser.start()
+
+        # Llamada: este hilo es el que hace la petición
+        first = client.get_many(["g1"])["g1"]
+        releaser.join()
+
+        # Comprobaciones
+        self.assertEqual(len(self.catalog.requests), 1)
+        self.assertEqual(client.stats["coalesced"], 5)
+        self.assertEqual(results, [first] * 5)
+
+
+class ExpandGameTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="expand", password="12345678")
+        self.client.force_login(self.user)
+        for game_id in ("g1", "g2", "otro"):
+            LibraryEntry.objects.create(user=self.user, external_game_id=game_id, status="playing")
+
+    def test_list_without_expand(self):
+        response = self.client.get("/api/library/entries/")
+        self.assertNotIn("game", response.json()[0])
+        self.assertEqual(self.catalog.requests, [])
+
+    def test_expand_game(self):
+        with override_settings(CATALOG_URL=self.catalog.url):
+            response = self.client.get("/api/library/entries/?expand=game")
+
+        self.assertEqual(response.status_code, 200)
+        games = {e["external_game_id"]: e["game"] for e in response.json()}
+        self.assertEqual(games["g1"], {"id": "g1", "title": "Título g1", "cover_url": "https://img.example/g1.jpg"})
+        self.assertIsNone(games["otro"])
+        self.assertEqual(len(self.catalog.requests), 1)
+
+    def test_expand_game_on_page(self):
+        with override_settings(CATALOG_URL=self.catalog.url):
+            response = self.client.get("/api/library/entries/?limit=2&expand=game")
+        results = response.json()["results"]
+        self.assertEqual([e["game"]["title"] for e in results], ["Título g1", "Título g2"])
+        self.assertEqual(self.catalog.requests, [["g1", "g2"]])
+
+    @override_settings(CATALOG_URL="")
+    def test_catalog_refresh_invalidates_expanded_responses(self):
+        # Precondiciones: biblioteca con versión (se cachea) y un juego en la tabla local
+        caches["library"].clear()
+        bump_library_version(self.user.id)
+        Game.objects.create(external_id="g1", title="Viejo", fetched_at=timezone.now() - timedelta(minutes=1))
+        first = self.client.get("/api/library/entries/?expand=game")
+        self.assertEqual(self.client.get("/api/library/entries/?expand=game", headers={"if-none-match": first["ETag"]}).status_code, 304)
+
+        # Llamada: otro proceso guarda datos nuevos del juego
+        Game.objects.filter(external_id="g1").update(title="Nuevo", fetched_at=timezone.now())
+        response = self.client.get("/api/library/entries/?expand=game", headers={"if-none-match": first["ETag"]})
+
+        # Comprobaciones: ni 304 ni la copia de la caché de respuestas o de la del proceso
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Library-Cache"], "miss")
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual({e["external_game_id"]: e["game"] and e["game"]["title"] for e in response.json()}["g1"], "Nuevo")
+        # Sin ?expand=game el ETag solo depende de la biblioteca
+        self.assertEqual(self.client.get("/api/library/entries/")["ETag"], f'W/"{self.user.id}-1"')
+
+    def test_invalid_expand(self):
+        response = self.client.get("/api/library/entries/?expand=user")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("expand", response.json()["details"])
@@ -0,0 +1,64 @@
+import json
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from library.models import LibraryEntry
+from steamlike_backend import codec
+
+class CodecTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def body(self, raw):
+        return self.factory.post("/", data=raw, content_type="application/json")
+
+    def test_get_json_request_valid_body(self):
+        data = codec.get_json_request(self.body(b'{"status": "playing", "name": "Ni\xc3\xb1o"}'))
+        self.assertEqual(data, {"status": "playing", "name": "Niño"})
+
+    def test_get_json_request_bad_input_returns_empty_dict(self):
+        for raw in (b"", b"{no es json", b"\xff\xfe", b'{"a": 1'):
+            with self.subTest(raw=raw):
+                self.assertEqual(codec.get_json_request(self.body(raw)), {})
+
+    def test_fast_and_stdlib_encoders_agree(self):
+        value = {"id": 1, "external_game_id": "ñ-ü", "hours_played": 0, "items": [None, True, 1.5], "price": Decimal("9.99")}
+        self.assertEqual(json.loads(codec.dumps(value)), json.loads(codec.stdlib_dumps(value)))
+        self.assertEqual(codec.loads(codec.dumps(value)), codec.stdlib_loads(codec.stdlib_dumps(value)))
+
+    def test_dumps_falls_back_for_big_integers(self):
+        self.assertEqual(json.loads(codec.dumps({"n": 2 ** 70})), {"n": 2 ** 70})
+
+    def test_json_response_safe(self):
+        with self.assertRaises(TypeError):
+            codec.JsonResponse([1, 2])
+        response = codec.JsonResponse([1, 2], safe=False, status=201)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(response.content), [1, 2])
+
+class CodecAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="codec", password="12345678")
+        self.client.force_login(self.user)
+
+    def test_create_and_list_round_trip(self):
+        # Llamada
+        response = self.client.post(
+            "/api/library/entries/",
+            data='{"external_game_id": "juego-ñ", "status": "playing", "hours_played": 2}',
+            content_type="application/json",
+        )
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["external_game_id"], "juego-ñ")
+        entry = LibraryEntry.objects.get(user=self.user)
+        self.assertEqual(self.client.get("/api/library/entries/").json(), [
+            {"id": entry.id, "external_game_id": "juego-ñ", "status": "playing", "hours_played": 2}
+        ])
+
+    def test_invalid_body_is_validation_error(self):
+        response = self.client.post("/api/library/entries/", data="{roto", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("external_game_id", response.json()["details"])
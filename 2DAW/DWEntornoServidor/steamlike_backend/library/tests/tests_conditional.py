@@ -0,0 +1,79 @@
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase
+from library.models import LibraryEntry
+
+class LibraryConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="sondeador", password="12345678")
+        self.client.force_login(self.user)
+        response = self.client.post(
+            "/api/library/entries/",
+            data=json.dumps({"external_game_id": "g1", "status": "playing", "hours_played": 1}),
+            content_type="application/json"
+        )
+        self.entry_id = response.json()["id"]
+
+    def test_unchanged_library_returns_304(self):
+        # Precondiciones
+        first = self.client.get("/api/library/entries/")
+        etag = first["ETag"]
+
+        # Llamada: sesión, usuario y versión; ninguna consulta a las entradas
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/library/entries/", HTTP_IF_NONE_MATCH=etag)
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertIn("Last-Modified", first)
+
+    def test_if_modified_since(self):
+        first = self.client.get("/api/library/entries/")
+        response = self.client.get("/api/library/entries/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        # Precondiciones
+        etag = self.client.get("/api/library/entries/")["ETag"]
+        detail_etag = self.client.get(f"/api/library/entries/{self.entry_id}/")["ETag"]
+
+        # Llamada
+        self.client.patch(
+            f"/api/library/entries/{self.entry_id}/",
+            data=json.dumps({"hours_played": 5}),
+            content_type="application/json"
+        )
+
+        # Comprobaciones
+        response = self.client.get("/api/library/entries/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        response = self.client.get(f"/api/library/entries/{self.entry_id}/", HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["hours_played"], 5)
+
+    def test_bulk_write_changes_etag(self):
+        etag = self.client.get("/api/library/entries/")["ETag"]
+        before = LibraryEntry.objects.get(id=self.entry_id).updated_at
+        self.client.patch(
+            "/api/library/entries/bulk/",
+            data=json.dumps([{"id": self.entry_id, "status": "completed"}]),
+            content_type="application/json"
+        )
+        response = self.client.get("/api/library/entries/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(LibraryEntry.objects.get(id=self.entry_id).updated_at, before)
+
+    def test_etag_is_per_user(self):
+        # Precondiciones
+        etag = self.client.get("/api/library/entries/")["ETag"]
+        other = User.objects.create_user(username="otro", password="12345678")
+        self.client.force_login(other)
+
+        # Llamada
+        response = self.client.get("/api/library/entries/", HTTP_IF_NONE_MATCH=etag)
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
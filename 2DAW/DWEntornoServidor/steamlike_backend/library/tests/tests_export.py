@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from library.models import LibraryEntry
+
+class LibraryExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="exporta", password="12345678")
+        self.other = User.objects.create_user(username="otro", password="12345678")
+        for i in range(3):
+            LibraryEntry.objects.create(user=self.user, external_game_id=f"g{i}", status="playing", hours_played=i)
+        LibraryEntry.objects.create(user=self.other, external_game_id="ajeno", status="completed", hours_played=9)
+        self.client.force_login(self.user)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/library/export/").status_code, 401)
+
+    def test_csv_export(self):
+        # Llamada
+        response = self.client.get("/api/library/export/")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(f'filename="library-{self.user.id}.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.body(response).decode())))
+        self.assertEqual([r["external_game_id"] for r in rows], ["g0", "g1", "g2"])
+        self.assertEqual(rows[2]["hours_played"], "2")
+        self.assertTrue(rows[0]["updated_at"].endswith("+00:00"))
+
+    def test_ndjson_gzip_export(self):
+        response = self.client.get("/api/library/export/?format=ndjson&gzip=1")
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(".ndjson.gz", response["Content-Disposition"])
+        lines = gzip.decompress(self.body(response)).decode().splitlines()
+        first = json.loads(lines[0])
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(set(first), {"id", "external_game_id", "status", "hours_played", "updated_at"})
+
+    def test_invalid_format(self):
+        response = self.client.get("/api/library/export/?format=xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.json()["details"])
+
+    def test_admin_export_requires_staff(self):
+        self.assertEqual(self.client.get("/api/library/export/all/").status_code, 403)
+
+    def test_admin_export_by_user_range(self):
+        # Precondiciones
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+        # Llamada
+        everything = self.client.get("/api/library/export/all/")
+        only_other = self.client.get(f"/api/library/export/all/?user_min={self.other.id}&user_max={self.other.id}")
+
+        # Comprobaciones
+        rows = list(csv.DictReader(io.StringIO(self.body(everything).decode())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]["user_id"], str(self.other.id))
+        rows = list(csv.DictReader(io.StringIO(self.body(only_other).decode())))
+        self.assertEqual([r["external_game_id"] for r in rows], ["ajeno"])
+        self.assertEqual(self.client.get("/api/library/export/all/?user_min=a").status_code, 400)
+
+    def test_command_partitions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("export_library", partitions=2, output_dir=directory, gzip=True, stderr=io.StringIO())
+
+            files = sorted(os.listdir(directory))
+            self.assertEqual(files, [
+                f"library-{self.user.id}-{self.user.id}.csv.gz",
+                f"library-{self.other.id}-{self.other.id}.csv.gz",
+            ])
+            with gzip.open(os.path.join(directory, files[1]), "rt") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([r["external_game_id"] for r in rows], ["ajeno"])
+
+    def test_command_single_user_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "exporta.ndjson")
+            call_command("export_library", user="exporta", format="ndjson", output=path, stderr=io.StringIO())
+            with open(path) as f:
+                self.assertEqual([json.loads(line)["external_game_id"] for line in f], ["g0", "g1", "g2"])
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from library.models import LibraryEntry
+
+class LibraryListFiltersAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="filtrador", password="12345678")
+        self.client.force_login(self.user)
+        datos = [("a", "playing", 5), ("b", "completed", 40), ("c", "playing", 12), ("d", "wishlist", 0), ("e", "dropped", 12)]
+        for game_id, status, hours in datos:
+            LibraryEntry.objects.create(external_game_id=game_id, status=status, hours_played=hours, user=self.user)
+
+    def _games(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        rows = data["results"] if isinstance(data, dict) else data
+        return [e["external_game_id"] for e in rows]
+
+    def test_filter_by_status(self):
+        self.assertEqual(sorted(self._games("/api/library/entries/?status=playing")), ["a", "c"])
+
+    def test_filter_by_several_statuses(self):
+        # Se aceptan tanto parámetros repetidos como valores separados por comas
+        self.assertEqual(sorted(self._games("/api/library/entries/?status=playing&status=completed")), ["a", "b", "c"])
+        self.assertEqual(sorted(self._games("/api/library/entries/?status=playing,dropped")), ["a", "c", "e"])
+
+    def test_filter_by_hours_range(self):
+        self.assertEqual(sorted(self._games("/api/library/entries/?min_hours=5&max_hours=12")), ["a", "c", "e"])
+
+    def test_sort_most_played(self):
+        self.assertEqual(self._games("/api/library/entries/?sort=-hours_played"), ["b", "e", "c", "a", "d"])
+
+    def test_filters_combine_with_pagination(self):
+        # Precondiciones
+        first = self.client.get("/api/library/entries/?status=playing,dropped&sort=-hours_played&limit=2").json()
+
+        # Llamada
+        second = self.client.get(f"/api/library/entries/?status=playing,dropped&limit=2&cursor={first['next']}").json()
+
+        # Comprobaciones
+        self.assertEqual([e["external_game_id"] for e in first["results"]], ["e", "c"])
+        self.assertEqual([e["external_game_id"] for e in second["results"]], ["a"])
+        self.assertIsNone(second["next"])
+
+    def test_invalid_params_use_validation_error_shape(self):
+        # Llamada
+        response = self.client.get("/api/library/entries/?status=inventado&min_hours=-1&sort=precio")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 400)
+        data = response.json()
+        self.assertEqual(data["error"], "validation_error")
+        self.assertEqual(set(data["details"]), {"status", "min_hours", "sort"})
+
+    def test_min_hours_greater_than_max_hours(self):
+        response = self.client.get("/api/library/entries/?min_hours=10&max_hours=5")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("min_hours", response.json()["details"])
@@ -0,0 +1,162 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from jobs.models import Job
+from library import game_stats
+from library.changes import deleted, record_entry_changes
+from library.models import GameHours, GameStats, LibraryEntry
+
+def snapshot():
+    stats = {s["external_game_id"]: s for s in GameStats.objects.values()}
+    hours = set(GameHours.objects.values_list("external_game_id", "hours", "entries"))
+    return stats, hours
+
+class GameStatsTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f"jugador{i}", password="12345678") for i in range(3)]
+        self.client.force_login(self.users[0])
+
+    def _send(self, user, method, url, payload):
+        self.client.force_login(user)
+        return getattr(self.client, method)(url, data=json.dumps(payload), content_type="application/json")
+
+    def test_incremental_matches_rebuild(self):
+        # Precondiciones: altas, cambios y borrados por todos los caminos
+        a, b, c = self.users
+        entry = self._send(a, "post", "/api/library/entries/", {"external_game_id": "g1", "status": "playing", "hours_played": 4}).json()
+        self._send(b, "post", "/api/library/entries/bulk/", [
+            {"external_game_id": "g1", "status": "completed", "hours_played": 30},
+            {"external_game_id": "g2", "status": "wishlist"},
+            {"external_game_id": "g3", "status": "dropped", "hours_played": 2},
+        ])
+        self._send(c, "post", "/api/library/entries/", {"external_game_id": "g1", "status": "playing", "hours_played": 4})
+        self._send(a, "patch", f"/api/library/entries/{entry['id']}/", {"status": "completed", "hours_played": 12})
+        g3 = LibraryEntry.objects.get(user=b, external_game_id="g3")
+        with transaction.atomic():
+            change = deleted(g3)
+            g3.delete()
+            record_entry_changes(b.id, [change])
+
+        # Llamada
+        incremental = snapshot()
+        call_command("rebuild_game_stats", stdout=StringIO())
+
+        # Comprobaciones
+        self.assertEqual(snapshot(), incremental)
+        stats, hours = incremental
+        self.assertEqual(set(stats), {"g1", "g2"})
+        self.assertEqual(
+            {k: stats["g1"][k] for k in ("entries", "players", "total_hours", "playing", "completed")},
+            {"entries": 3, "players": 3, "total_hours": 46, "playing": 1, "completed": 2},
+        )
+        self.assertEqual((stats["g2"]["entries"], stats["g2"]["players"]), (1, 0))
+        self.assertEqual(hours, {("g1", 4, 1), ("g1", 12, 1), ("g1", 30, 1)})
+
+    def test_admin_game_change_moves_stats(self):
+        # Precondiciones
+        user = self.users[0]
+        entry = self._send(user, "post", "/api/library/entries/", {"external_game_id": "g1", "status": "playing", "hours_played": 4}).json()
+        self.client.force_login(User.objects.create_superuser(username="jefa", password="12345678"))
+
+        # Llamada: se cambia el juego de la entrada desde el admin
+        self.client.post(f"/admin/library/libraryentry/{entry['id']}/change/", {
+            "external_game_id": "g2", "status": "completed", "hours_played": 9, "user": user.id,
+        })
+
+        # Comprobaciones
+        incremental = snapshot()
+        stats, hours = incremental
+        self.assertEqual(set(stats), {"g2"})
+        self.assertEqual((stats["g2"]["entries"], stats["g2"]["completed"], stats["g2"]["total_hours"]), (1, 1, 9))
+        self.assertEqual(hours, {("g2", 9, 1)})
+        call_command("rebuild_game_stats", stdout=StringIO())
+        self.assertEqual(snapshot(), incremental)
+
+    def test_percentiles(self):
+        # 10 jugadores con 1..10 horas y un wishlist que no cuenta
+        for hours in range(1, 11):
+            GameHours.objects.create(external_game_id="g1", hours=hours, entries=1)
+        GameStats.objects.create(external_game_id="g1", entries=11, players=10, total_hours=55, playing=10, wishlist=1)
+
+        response = self.client.get("/api/games/g1/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["median_hours"], data["p90_hours"]), (5, 9))
+        self.assertEqual(data["by_status"]["wishlist"], 1)
+        self.assertEqual(game_stats.hours_percentiles("otro"), None)
+        self.assertEqual(self.client.get("/api/games/otro/stats/").status_code, 404)
+
+    def test_leaderboard(self):
+        GameStats.objects.create(external_game_id="poco", entries=5, players=5, total_hours=10, completed=1)
+        GameStats.objects.create(external_game_id="mucho", entries=2, players=2, total_hours=500)
+        GameStats.objects.create(external_game_id="deseado", entries=9, wishlist=9)
+
+        by_hours = self.client.get("/api/games/leaderboard/").json()
+        by_players = self.client.get("/api/games/leaderboard/?by=players&limit=1").json()
+
+        self.assertEqual([g["external_game_id"] for g in by_hours["results"]], ["mucho", "poco"])
+        self.assertEqual([g["external_game_id"] for g in by_players["results"]], ["poco"])
+        response = self.client.get("/api/games/leaderboard/?by=precio&limit=0")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["details"]), {"by", "limit"})
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/games/leaderboard/").status_code, 401)
+        self.assertEqual(self.client.get("/api/games/g1/stats/").status_code, 401)
+
+    @override_settings(GAME_STATS_INCREMENTAL=False)
+    def test_without_incremental_updates(self):
+        self._send(self.users[0], "post", "/api/library/entries/", {"external_game_id": "g1", "status": "playing"})
+        self.assertFalse(GameStats.objects.exists())
+        call_command("rebuild_game_stats", stdout=StringIO())
+        self.assertEqual(GameStats.objects.get().entries, 1)
+
+    def test_rebuild_in_batches(self):
+        # Precondiciones: filas desfasadas, entre ellas juegos que ya no tienen entradas
+        for i, game in enumerate(["g1", "g2", "g3", "g4", "g5"]):
+            LibraryEntry.objects.create(user=self.users[i % 3], external_game_id=game, status="playing", hours_played=i)
+        GameStats.objects.create(external_game_id="g0", entries=1, players=1)
+        GameStats.objects.create(external_game_id="g2", entries=7, players=7, total_hours=70)
+        GameStats.objects.create(external_game_id="g25", entries=1, players=1)
+        GameStats.objects.create(external_game_id="g9", entries=1, players=1)
+        GameHours.objects.create(external_game_id="g9", hours=3, entries=1)
+
+        # Llamada: rangos de 2 juegos
+        games, histogram = game_stats.rebuild_game_stats(batch_size=2)
+
+        # Comprobaciones
+        self.assertEqual((games, histogram), (5, 5))
+        stats, hours = snapshot()
+        self.assertEqual({g: (s["entries"], s["total_hours"]) for g, s in stats.items()}, {
+            "g1": (1, 0), "g2": (1, 1), "g3": (1, 2), "g4": (1, 3), "g5": (1, 4),
+        })
+        self.assertEqual(hours, {(f"g{i + 1}", i, 1) for i in range(5)})
+
+    @override_settings(GAME_STATS_REBUILD_INTERVAL=3600)
+    def test_failed_rebuild_still_schedules_next(self):
+        call_command("rebuild_game_stats", background=True, stdout=StringIO())
+
+        with mock.patch("library.game_stats.rebuild_game_stats", side_effect=RuntimeError("sin base de datos")), \
+                self.assertLogs("steamlike.jobs", "WARNING"):
+            call_command("runworker", burst=True, concurrency=1, stdout=StringIO(), stderr=StringIO())
+
+        # El intento fallido vuelve a la cola y la siguiente ejecución periódica queda programada
+        self.assertEqual(Job.objects.filter(status="queued", name="library.rebuild_game_stats").count(), 2)
+
+    @override_settings(GAME_STATS_REBUILD_INTERVAL=3600)
+    def test_periodic_rebuild_job(self):
+        call_command("rebuild_game_stats", background=True, stdout=StringIO())
+        call_command("rebuild_game_stats", background=True, stdout=StringIO())
+        self.assertEqual(Job.objects.filter(status="queued").count(), 1)
+
+        call_command("runworker", burst=True, concurrency=1, stdout=StringIO(), stderr=StringIO())
+
+        # Terminada la primera, queda programada la siguiente
+        self.assertEqual(Job.objects.get(status="succeeded").result, {"games": 0, "histogram_rows": 0})
+        self.assertEqual(Job.objects.filter(status="queued", name="library.rebuild_game_stats").count(), 1)
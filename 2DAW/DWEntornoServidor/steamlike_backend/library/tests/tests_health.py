@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+from django.test import SimpleTestCase
+from steamlike_backend.db_pool import pool_stats
+
+class FakePool:
+    min_size = 2
+    max_size = 4
+
+    def __init__(self, **stats):
+        self.stats = stats
+
+    def get_stats(self):
+        return self.stats
+
+class HealthPoolTests(SimpleTestCase):
+    def test_health_without_pool_stats(self):
+        response = self.client.get("/api/health/")
+        self.assertEqual(response.json(), {"status": "ok"})
+
+    def test_health_with_pool_stats_without_pool(self):
+        # La base de datos de los tests (SQLite) no usa pool
+        response = self.client.get("/api/health/?pool=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(response.json()["db_pool"]["enabled"], False)
+
+    def test_pool_stats(self):
+        # Precondiciones: 4 conexiones, 1 libre, 2 peticiones esperando
+        connection = SimpleNamespace(pool=FakePool(
+            pool_min=2, pool_max=4, pool_size=4, pool_available=1, requests_waiting=2,
+            requests_num=10, requests_queued=3, requests_wait_ms=55, requests_errors=1,
+        ))
+
+        # Llamada
+        stats = pool_stats(connection)
+
+        # Comprobaciones
+        self.assertEqual((stats["in_use"], stats["idle"], stats["waiting"]), (3, 1, 2))
+        self.assertEqual(stats["acquire_ms_avg"], 5.5)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertTrue(stats["saturated"])
+
+    def test_pool_stats_idle_pool(self):
+        stats = pool_stats(SimpleNamespace(pool=FakePool(pool_size=2, pool_available=2)))
+        self.assertEqual((stats["in_use"], stats["acquire_ms_avg"]), (0, 0.0))
+        self.assertFalse(stats["saturated"])
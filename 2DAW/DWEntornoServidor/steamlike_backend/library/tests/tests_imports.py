@@ -0,0 +1,159 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from library import imports
+from library.models import LibraryEntry, LibraryImport, LibrarySummary, LibraryVersion
+
+class LibraryImportTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name, LIBRARY_IMPORT_CHUNK_SIZE=3)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username="importa", password="12345678")
+        LibraryEntry.objects.create(user=self.user, external_game_id="ya-esta", status="playing")
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def ndjson(self, *records):
+        return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n"
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.post("/api/library/import/", data="", content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 401)
+
+    def test_import_ndjson_body(self):
+        # Precondiciones: 8 líneas en 3 bloques, con inválidas y repetidas
+        body = self.ndjson(
+            {"external_game_id": "g1", "status": "playing", "hours_played": 5},
+            {"external_game_id": "g2", "status": "wishlist"},
+            {"external_game_id": "g3", "status": "jugando"},
+            "{no es json",
+            {"external_game_id": "ya-esta", "status": "playing"},
+            {"external_game_id": "g1", "status": "completed"},
+            {"external_game_id": "g4", "status": "dropped", "hours_played": -1},
+            {"external_game_id": "g5", "status": "completed", "hours_played": 40},
+        )
+
+        # Llamada
+        response = self.client.post("/api/library/import/", data=body, content_type="application/x-ndjson")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["lines"], data["created"], data["skipped"], data["invalid"]), (8, 3, 2, 3))
+        self.assertEqual(
+            sorted(LibraryEntry.objects.filter(user=self.user).values_list("external_game_id", flat=True)),
+            ["g1", "g2", "g5", "ya-esta"],
+        )
+        summary = LibrarySummary.objects.get(user=self.user)
+        self.assertEqual((summary.total_hours, summary.completed), (45, 1))
+        self.assertTrue(LibraryVersion.objects.filter(user=self.user, version__gt=0).exists())
+
+        # Informe de errores descargable
+        report = self.client.get(data["errors_url"])
+        self.assertEqual(report.status_code, 200)
+        problems = [json.loads(line) for line in b"".join(report.streaming_content).splitlines()]
+        self.assertEqual([(p["line"], p["reason"]) for p in problems], [
+            (3, "invalid"), (4, "invalid"), (5, "duplicate"), (6, "duplicate"), (7, "invalid"),
+        ])
+        self.assertIn("status", problems[0]["details"])
+
+    def test_import_csv_upload_of_an_export(self):
+        # El CSV de /api/library/export/ se puede volver a importar
+        content = (
+            "id,external_game_id,status,hours_played,updated_at\n"
+            "7,g1,completed,12,2026-01-01T00:00:00+00:00\n"
+            "8,g2,playing,,2026-01-01T00:00:00+00:00\n"
+            "9,g3,playing,muchas,2026-01-01T00:00:00+00:00\n"
+        )
+        upload = SimpleUploadedFile("biblioteca.csv", content.encode(), content_type="text/csv")
+
+        response = self.client.post("/api/library/import/", {"file": upload})
+
+        data = response.json()
+        self.assertEqual((data["format"], data["created"], data["invalid"]), ("csv", 2, 1))
+        self.assertEqual(LibraryEntry.objects.get(user=self.user, external_game_id="g1").hours_played, 12)
+        self.assertEqual(LibraryEntry.objects.get(user=self.user, external_game_id="g2").hours_played, 0)
+        problems = b"".join(self.client.get(data["errors_url"]).streaming_content).decode()
+        self.assertEqual(json.loads(problems)["line"], 4)
+
+    def test_csv_hours_with_non_decimal_digits(self):
+        content = "external_game_id,status,hours_played\ng1,playing,²\ng2,playing,٣\n"
+
+        response = self.client.post("/api/library/import/?format=csv", data=content.encode(), content_type="text/csv")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["created"], response.json()["invalid"]), (1, 1))
+        self.assertEqual(LibraryEntry.objects.get(user=self.user, external_game_id="g2").hours_played, 3)
+
+    def test_concurrent_insert_is_not_counted_as_created(self):
+        # Precondiciones: otra petición del mismo usuario inserta "g1" entre la
+        # consulta de los que ya existen y el INSERT del bloque
+        insert_entries = imports.insert_entries
+
+        def racing_insert(user, rows):
+            LibraryEntry.objects.create(user=user, external_game_id="g1", status="wishlist")
+            return insert_entries(user, rows)
+
+        # Llamada
+        with mock.patch("library.imports.insert_entries", side_effect=racing_insert):
+            response = self.client.post("/api/library/import/", data=self.ndjson(
+                {"external_game_id": "g1", "status": "playing", "hours_played": 5},
+                {"external_game_id": "g2", "status": "playing", "hours_played": 2},
+            ), content_type="application/x-ndjson")
+
+        # Comprobaciones
+        data = response.json()
+        self.assertEqual((data["created"], data["skipped"]), (1, 1))
+        self.assertEqual(LibraryEntry.objects.get(user=self.user, external_game_id="g1").status, "wishlist")
+        # Los contadores solo suman la entrada que ha creado la importación ("ya-esta" y "g2")
+        summary = LibrarySummary.objects.get(user=self.user)
+        self.assertEqual((summary.playing, summary.total_hours), (2, 2))
+
+    def test_without_errors_there_is_no_report(self):
+        body = self.ndjson({"external_game_id": "g1", "status": "playing"})
+        data = self.client.post("/api/library/import/", data=body, content_type="application/x-ndjson").json()
+        self.assertIsNone(data["errors_url"])
+        self.assertEqual(self.client.get(f"/api/library/import/{data['id']}/errors/").status_code, 404)
+
+    def test_report_of_another_user(self):
+        other = User.objects.create_user(username="otro", password="12345678")
+        library_import = LibraryImport.objects.create(user=other, format="ndjson")
+        self.assertEqual(self.client.get(f"/api/library/import/{library_import.id}/errors/").status_code, 404)
+
+    def test_invalid_requests(self):
+        response = self.client.post("/api/library/import/?format=xml", data="", content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post("/api/library/import/", {}).status_code, 400)
+        with override_settings(LIBRARY_IMPORT_MAX_BYTES=10):
+            response = self.client.post("/api/library/import/", data="x" * 11, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 413)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "biblioteca.ndjson")
+            with open(path, "w") as f:
+                f.write(self.ndjson(
+                    {"external_game_id": "c1", "status": "playing"},
+                    {"external_game_id": "c2", "status": "nada"},
+                ))
+            report = os.path.join(directory, "errores.ndjson")
+            out = io.StringIO()
+
+            call_command("import_library", "importa", path, report=report, stdout=out)
+
+            self.assertIn("creadas: 1", out.getvalue())
+            with open(report) as f:
+                self.assertEqual(json.loads(f.read())["line"], 2)
+        self.assertTrue(LibraryEntry.objects.filter(user=self.user, external_game_id="c1").exists())
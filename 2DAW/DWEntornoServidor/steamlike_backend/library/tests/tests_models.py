@@ -1,3 +1,5 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 
 from library.models import LibraryEntry
@@ -163,3 +165,29 @@ class LibraryEntryStatusValueTests(TestCase):
         # Comprobaciones
         self.assertEqual(value, -1)
 
+
+
+class LibraryEntryUniquenessTests(TestCase):
+    def setUp(self):
+        self.ana = User.objects.create_user(username="ana", password="12345678")
+        self.luis = User.objects.create_user(username="luis", password="12345678")
+
+    def test_same_game_allowed_for_different_users(self):
+        # Precondiciones
+        LibraryEntry.objects.create(external_game_id="portal", user=self.ana)
+
+        # Llamada
+        LibraryEntry.objects.create(external_game_id="portal", user=self.luis)
+
+        # Comprobaciones
+        self.assertEqual(LibraryEntry.objects.filter(external_game_id="portal").count(), 2)
+
+    def test_same_game_twice_for_one_user_fails(self):
+        # Precondiciones
+        LibraryEntry.objects.create(external_game_id="portal", user=self.ana)
+
+        # Llamada
+        # Comprobaciones
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                LibraryEntry.objects.create(external_game_id="portal", user=self.ana)
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from library.models import LibraryEntry
+
+class LibraryPaginationAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="paginador", password="12345678")
+        self.client.force_login(self.user)
+        for i in range(5):
+            LibraryEntry.objects.create(
+                external_game_id=f"game_{i}",
+                status="playing",
+                hours_played=[3, 1, 3, 0, 7][i],
+                user=self.user
+            )
+
+    def _walk(self, url):
+        """Recorre todas las páginas siguiendo "next" y devuelve los ids en orden."""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [e["id"] for e in data["results"]]
+            url = f"/api/library/entries/?limit=2&cursor={data['next']}" if data["next"] else None
+        return ids
+
+    def test_pages_by_id(self):
+        # Llamada
+        ids = self._walk("/api/library/entries/?limit=2")
+
+        # Comprobaciones
+        expected = list(LibraryEntry.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_pages_by_custom_sort_with_ties(self):
+        # Llamada
+        ids = self._walk("/api/library/entries/?limit=2&sort=-hours_played")
+
+        # Comprobaciones
+        expected = list(LibraryEntry.objects.order_by("-hours_played", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_prev_cursor_returns_previous_page(self):
+        # Precondiciones
+        first = self.client.get("/api/library/entries/?limit=2").json()
+        second = self.client.get(f"/api/library/entries/?limit=2&cursor={first['next']}").json()
+
+        # Llamada
+        response = self.client.get(f"/api/library/entries/?limit=2&cursor={second['prev']}")
+
+        # Comprobaciones
+        data = response.json()
+        self.assertEqual(data["results"], first["results"])
+        self.assertIsNone(data["prev"])
+        self.assertIsNone(first["prev"])
+
+    def test_invalid_cursor_and_limit(self):
+        response = self.client.get("/api/library/entries/?cursor=basura")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "validation_error")
+        self.assertIn("cursor", response.json()["details"])
+
+        response = self.client.get("/api/library/entries/?limit=0")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit", response.json()["details"])
+
+    def test_legacy_list_without_params(self):
+        response = self.client.get("/api/library/entries/")
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(len(response.json()), 5)
+
+    @override_settings(LIBRARY_LEGACY_LIST=False, LIBRARY_PAGE_SIZE=3)
+    def test_always_paginates_when_legacy_disabled(self):
+        data = self.client.get("/api/library/entries/").json()
+        self.assertEqual(len(data["results"]), 3)
+        self.assertIsNotNone(data["next"])
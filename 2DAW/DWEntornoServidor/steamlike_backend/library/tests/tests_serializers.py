@@ -0,0 +1,52 @@
+import json
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from library.models import LibraryEntry
+from library.serializers import ENTRY_FIELDS, entry_rows, entry_to_dict, rows_to_dicts
+
+class LibrarySerializersTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="serializado", password="12345678")
+        self.entry = LibraryEntry.objects.create(external_game_id="g1", status="playing", hours_played=3, user=self.user)
+
+    def test_rows_and_instances_serialize_the_same(self):
+        # Llamada
+        from_rows = rows_to_dicts(entry_rows(LibraryEntry.objects.filter(user=self.user)))
+        from_instance = entry_to_dict(self.entry)
+
+        # Comprobaciones
+        self.assertEqual(from_rows, [from_instance])
+        self.assertEqual(tuple(from_instance), ENTRY_FIELDS)
+
+    def test_list_does_not_select_unused_columns(self):
+        # Precondiciones
+        self.client.force_login(self.user)
+
+        # Llamada
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/library/entries/")
+
+        # Comprobaciones
+        sql = [q["sql"] for q in ctx.captured_queries if 'FROM "library_libraryentry"' in q["sql"]][0]
+        self.assertNotIn('"updated_at"', sql)
+        self.assertNotIn('"user_id", ', sql.split("FROM")[0])
+
+    def test_patch_only_updates_sent_columns(self):
+        # Precondiciones
+        self.client.force_login(self.user)
+
+        # Llamada
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                f"/api/library/entries/{self.entry.id}/",
+                data=json.dumps({"hours_played": 9}),
+                content_type="application/json"
+            )
+
+        # Comprobaciones
+        self.assertEqual(response.json(), {"id": self.entry.id, "external_game_id": "g1", "status": "playing", "hours_played": 9})
+        update = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "library_libraryentry"')][0]
+        self.assertNotIn('"status"', update)
+        self.assertNotIn('"external_game_id"', update)
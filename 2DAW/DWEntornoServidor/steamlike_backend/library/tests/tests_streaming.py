@@ -0,0 +1,52 @@
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from library.models import LibraryEntry
+from library import streaming
+
+class LibraryStreamingAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="streamer", password="12345678")
+        self.client.force_login(self.user)
+        for i in range(3):
+            LibraryEntry.objects.create(external_game_id=f"game_{i}", status="playing", hours_played=i, user=self.user)
+
+    def test_ndjson_stream(self):
+        # Llamada
+        response = self.client.get("/api/library/entries/?stream=ndjson")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r["external_game_id"] for r in rows], ["game_0", "game_1", "game_2"])
+        self.assertEqual(set(rows[0]), {"id", "external_game_id", "status", "hours_played"})
+
+    @override_settings(LIBRARY_STREAM_CHUNK_SIZE=1)
+    def test_json_array_stream_matches_plain_list(self):
+        # Precondiciones: se fuerza un buffer diminuto para que salgan varios trozos
+        plain = self.client.get("/api/library/entries/").json()
+        original = streaming.BUFFER_SIZE
+        streaming.BUFFER_SIZE = 1
+        try:
+            # Llamada
+            response = self.client.get("/api/library/entries/?stream=json")
+            chunks = list(response.streaming_content)
+        finally:
+            streaming.BUFFER_SIZE = original
+
+        # Comprobaciones
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads(b"".join(chunks)), plain)
+
+    def test_stream_empty_library(self):
+        LibraryEntry.objects.all().delete()
+        response = self.client.get("/api/library/entries/?stream=json")
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
+
+    def test_invalid_stream_format(self):
+        response = self.client.get("/api/library/entries/?stream=xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("stream", response.json()["details"])
@@ -0,0 +1,89 @@
+import json
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from library.models import LibraryEntry, LibrarySummary
+
+class LibrarySummaryAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="resumido", password="12345678")
+        self.client.force_login(self.user)
+
+    def _summary(self):
+        response = self.client.get("/api/library/summary/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _send(self, method, url, payload):
+        return getattr(self.client, method)(url, data=json.dumps(payload), content_type="application/json")
+
+    def test_empty_summary(self):
+        self.assertEqual(self._summary(), {
+            "total_entries": 0,
+            "total_hours": 0,
+            "by_status": {"wishlist": 0, "playing": 0, "completed": 0, "dropped": 0},
+        })
+
+    def test_counters_follow_every_write_path(self):
+        # Alta individual
+        entry_id = self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing", "hours_played": 4}).json()["id"]
+        # Alta masiva
+        self._send("post", "/api/library/entries/bulk/", [
+            {"external_game_id": "b", "status": "playing", "hours_played": 10},
+            {"external_game_id": "c", "status": "wishlist"},
+        ])
+        # PATCH individual
+        self._send("patch", f"/api/library/entries/{entry_id}/", {"status": "completed", "hours_played": 6})
+        # PATCH masivo
+        b = LibraryEntry.objects.get(external_game_id="b")
+        self._send("patch", "/api/library/entries/bulk/", [{"id": b.id, "status": "dropped", "hours_played": 11}])
+
+        # Comprobaciones
+        summary = self._summary()
+        self.assertEqual(summary["total_entries"], 3)
+        self.assertEqual(summary["total_hours"], 17)
+        self.assertEqual(summary["by_status"], {"wishlist": 1, "playing": 0, "completed": 1, "dropped": 1})
+
+    def test_summary_is_a_single_lookup(self):
+        # sesión, usuario, versión (ETag) y resumen
+        with self.assertNumQueries(4):
+            self.client.get("/api/library/summary/")
+
+    def test_rebuild_command_repairs_counters(self):
+        # Precondiciones: datos creados sin pasar por la API y contadores corruptos
+        LibraryEntry.objects.create(external_game_id="x", status="playing", hours_played=3, user=self.user)
+        LibraryEntry.objects.create(external_game_id="y", status="completed", hours_played=5, user=self.user)
+        LibrarySummary.objects.create(user=self.user, total_entries=99, playing=42)
+
+        # Llamada
+        call_command("rebuild_library_summary", stdout=StringIO())
+
+        # Comprobaciones
+        summary = self._summary()
+        self.assertEqual(summary["total_entries"], 2)
+        self.assertEqual(summary["total_hours"], 8)
+        self.assertEqual(summary["by_status"]["playing"], 1)
+        self.assertEqual(summary["by_status"]["completed"], 1)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/library/summary/").status_code, 401)
+
+    def test_admin_edits_update_counters(self):
+        # Precondiciones
+        entry_id = self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing", "hours_played": 4}).json()["id"]
+        admin_user = User.objects.create_superuser(username="jefa", password="12345678")
+        self.client.force_login(admin_user)
+
+        # Llamada: cambio de estado y después borrado desde el admin
+        self.client.post(f"/admin/library/libraryentry/{entry_id}/change/", {
+            "external_game_id": "a", "status": "completed", "hours_played": 9, "user": self.user.id,
+        })
+        summary = LibrarySummary.objects.get(user=self.user)
+        self.assertEqual((summary.playing, summary.completed, summary.total_hours), (0, 1, 9))
+        self.client.post(f"/admin/library/libraryentry/{entry_id}/delete/", {"post": "yes"})
+
+        # Comprobaciones
+        summary.refresh_from_db()
+        self.assertEqual((summary.total_entries, summary.completed, summary.total_hours), (0, 0, 0))
@@ -0,0 +1,159 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from library.changes import deleted, record_entry_changes
+from library.models import LibraryEntry, LibraryEvent
+
+class LibraryChangesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="movil", password="12345678")
+        self.client.force_login(self.user)
+
+    def _send(self, method, url, payload):
+        return getattr(self.client, method)(url, data=json.dumps(payload), content_type="application/json")
+
+    def _changes(self, since=None, **params):
+        if since:
+            params["since"] = since
+        query = "&".join(f"{k}={v}" for k, v in params.items())
+        return self.client.get(f"/api/library/changes/?{query}")
+
+    def test_first_call_asks_for_full_resync(self):
+        # Precondiciones
+        self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing"})
+
+        # Llamada
+        data = self._changes().json()
+
+        # Comprobaciones
+        self.assertTrue(data["full_resync"])
+        self.assertEqual((data["results"], data["deleted"]), ([], []))
+        # Desde ese cursor no queda nada pendiente
+        after = self._changes(data["cursor"]).json()
+        self.assertFalse(after["full_resync"])
+        self.assertEqual((after["results"], after["deleted"], after["cursor"]), ([], [], data["cursor"]))
+
+    def test_returns_only_changes_since_cursor(self):
+        # Precondiciones
+        kept = self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing", "hours_played": 1}).json()
+        gone = self._send("post", "/api/library/entries/", {"external_game_id": "b", "status": "wishlist"}).json()
+        self._send("post", "/api/library/entries/", {"external_game_id": "sin-cambios", "status": "wishlist"})
+        cursor = self._changes().json()["cursor"]
+        self._send("patch", f"/api/library/entries/{kept['id']}/", {"hours_played": 5})
+        self._send("patch", f"/api/library/entries/{kept['id']}/", {"status": "completed"})
+        self._send("post", "/api/library/entries/bulk/", [{"external_game_id": "c", "status": "playing"}])
+        entry = LibraryEntry.objects.get(id=gone["id"])
+        with transaction.atomic():
+            change = deleted(entry)
+            entry.delete()
+            record_entry_changes(self.user.id, [change])
+        # Cambios de otro usuario no aparecen
+        other = User.objects.create_user(username="otro")
+        LibraryEntry.objects.create(user=other, external_game_id="x", status="playing")
+
+        # Llamada
+        data = self._changes(cursor).json()
+
+        # Comprobaciones
+        self.assertFalse(data["full_resync"])
+        c = LibraryEntry.objects.get(user=self.user, external_game_id="c")
+        self.assertEqual(data["results"], [
+            {"id": kept["id"], "external_game_id": "a", "status": "completed", "hours_played": 5},
+            {"id": c.id, "external_game_id": "c", "status": "playing", "hours_played": 0},
+        ])
+        self.assertEqual(data["deleted"], [{"id": gone["id"], "external_game_id": "b"}])
+        self.assertFalse(data["has_more"])
+        self.assertEqual(self._changes(data["cursor"]).json()["results"], [])
+
+    def test_pages_by_events(self):
+        cursor = self._changes().json()["cursor"]
+        for game in "abc":
+            self._send("post", "/api/library/entries/", {"external_game_id": game, "status": "playing"})
+
+        seen = []
+        while True:
+            data = self._changes(cursor, limit=2).json()
+            seen += [e["external_game_id"] for e in data["results"]]
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+
+        self.assertEqual(seen, ["a", "b", "c"])
+
+    def test_expired_cursor_asks_for_full_resync(self):
+        cursor = self._changes().json()["cursor"]
+        self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing"})
+        self._send("post", "/api/library/entries/", {"external_game_id": "b", "status": "playing"})
+        LibraryEvent.objects.filter(external_game_id="a").update(created_at=timezone.now() - timedelta(days=100))
+
+        out = StringIO()
+        call_command("prune_library_activity", days=90, stdout=out)
+        data = self._changes(cursor).json()
+
+        self.assertIn("Eventos borrados: 1", out.getvalue())
+        self.assertEqual(LibraryEvent.objects.count(), 1)
+        self.assertTrue(data["full_resync"])
+        self.assertEqual(self._changes(data["cursor"]).json()["full_resync"], False)
+
+    def test_idle_user_keeps_cursor_after_pruning(self):
+        # Precondiciones: eventos de otro usuario, los más antiguos ya caducados
+        other = User.objects.create_user(username="otro")
+        old = timezone.now() - timedelta(days=100)
+        for game, created_at in (("x", old), ("y", old), ("z", timezone.now())):
+            LibraryEvent.objects.create(user=other, entry_id=1, external_game_id=game, kind=1, created_at=created_at)
+        call_command("prune_library_activity", days=90, stdout=StringIO())
+
+        # Llamada: primera sincronización y dos refrescos sin cambios, con otro borrado entre medias
+        first = self._changes().json()
+        second = self._changes(first["cursor"]).json()
+        LibraryEvent.objects.create(user=other, entry_id=1, external_game_id="w", kind=1)
+        LibraryEvent.objects.filter(external_game_id="z").update(created_at=old)
+        call_command("prune_library_activity", days=90, stdout=StringIO())
+        third = self._changes(second["cursor"]).json()
+
+        # Comprobaciones
+        self.assertTrue(first["full_resync"])
+        self.assertFalse(second["full_resync"])
+        self.assertFalse(third["full_resync"])
+        # Un cambio posterior llega por el feed, no con otra sincronización completa
+        self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing"})
+        fourth = self._changes(third["cursor"]).json()
+        self.assertFalse(fourth["full_resync"])
+        self.assertEqual([e["external_game_id"] for e in fourth["results"]], ["a"])
+
+    def test_pruned_user_events_resync_once(self):
+        # Precondiciones: el cliente está al día y luego se borran todos sus eventos
+        self._send("post", "/api/library/entries/", {"external_game_id": "a", "status": "playing"})
+        cursor = self._changes().json()["cursor"]
+        self._send("post", "/api/library/entries/", {"external_game_id": "b", "status": "playing"})
+        LibraryEvent.objects.create(user=User.objects.create_user(username="otro"), entry_id=1, external_game_id="x", kind=1)
+        LibraryEvent.objects.filter(user=self.user).update(created_at=timezone.now() - timedelta(days=100))
+        call_command("prune_library_activity", days=90, stdout=StringIO())
+
+        # Llamada: sincroniza dos veces seguidas
+        first = self._changes(cursor).json()
+        second = self._changes(first["cursor"]).json()
+
+        # Comprobaciones
+        self.assertTrue(first["full_resync"])
+        self.assertFalse(second["full_resync"])
+        self.assertEqual(second["cursor"], first["cursor"])
+
+    @override_settings(LIBRARY_ACTIVITY_LOG=False)
+    def test_without_activity_log_always_full_resync(self):
+        self.assertTrue(self._changes("eyJzIjoiY2hhbmdlcyIsInYiOm51bGwsImkiOjAsImQiOiJuIn0").json()["full_resync"])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self._changes("xx").json()["details"], {"since": "Cursor inválido"})
+        # Un cursor de otro listado no vale
+        response = self._changes("eyJzIjoiLWlkIiwidiI6bnVsbCwiaSI6NSwiZCI6Im4ifQ")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["details"]), {"since"})
+        self.assertEqual(self._changes(limit=0).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self._changes().status_code, 401)
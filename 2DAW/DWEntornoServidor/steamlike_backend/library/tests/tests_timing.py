@@ -0,0 +1,52 @@
+import re
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from library.models import LibraryEntry
+
+def server_timing(response):
+    """Cabecera Server-Timing -> {métrica: (duración, descripción)}."""
+    metrics = {}
+    for part in response["Server-Timing"].split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        values = dict(p.split("=", 1) for p in params)
+        metrics[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return metrics
+
+class RequestTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="cronometrado", password="12345678")
+        self.client.force_login(self.user)
+        LibraryEntry.objects.create(external_game_id="g1", status="playing", hours_played=1, user=self.user)
+
+    def test_server_timing_counts_queries(self):
+        # Llamada
+        with self.assertLogs("steamlike.requests", "INFO") as logs:
+            response = self.client.get("/api/library/entries/")
+
+        # Comprobaciones: sesión, usuario y versión de la biblioteca + listado
+        metrics = server_timing(response)
+        self.assertEqual(set(metrics), {"total", "db", "app"})
+        self.assertEqual(metrics["db"][1], "4 queries")
+        self.assertLessEqual(metrics["db"][0], metrics["total"][0])
+        self.assertIn('"queries":4', logs.output[0])
+        self.assertIn('"path":"/api/library/entries/"', logs.output[0])
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_only_reports_total(self):
+        response = self.client.get("/api/health/")
+        self.assertEqual(set(server_timing(response)), {"total"})
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERY_MS=0, REQUEST_TIMING_EXPLAIN=True)
+    def test_slow_queries_are_logged_with_plan(self):
+        with self.assertLogs("steamlike.slow_queries", "WARNING") as logs:
+            self.client.get("/api/library/entries/")
+
+        listing = [line for line in logs.output if "library_libraryentry" in line]
+        self.assertTrue(listing)
+        # EXPLAIN QUERY PLAN de SQLite (EXPLAIN en PostgreSQL) debajo del SQL
+        self.assertTrue(re.search(r"SELECT .*\n.*(SEARCH|SCAN|Index|Seq)", listing[0]))
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_disabled(self):
+        response = self.client.get("/api/health/")
+        self.assertFalse(response.has_header("Server-Timing"))
@@ -0,0 +1,47 @@
+"""
+Reglas de validación de las entradas de la biblioteca, compartidas por las
+vistas (alta, PATCH, operaciones masivas) y la importación.
+"""
+from library.models import LibraryEntry
+
+def validate_entry_data(data):
+    """
+    Reglas de validación de una entrada nueva (las mismas para el alta
+    individual y para el alta masiva). Devuelve el dict de errores, vacío si es válida.
+    """
+    errores_dict = {}
+    external_game_id = data.get("external_game_id")
+    status = data.get("status")
+    hours_played = data.get("hours_played", 0)
+
+    if not external_game_id:
+        errores_dict.update({"external_game_id": "Este campo es obligatorio"})
+    elif not isinstance(external_game_id, (str, int)):
+        errores_dict.update({"external_game_id": "Debe ser una cadena"})
+    elif len(str(external_game_id)) > 100:
+        errores_dict.update({"external_game_id": "Como máximo 100 caracteres"})
+
+    if not isinstance(hours_played, int) or hours_played < 0:
+        errores_dict.update({"hours_played": "Las horas deben ser un número entero positivo"})
+
+    if status not in LibraryEntry.ALLOWED_STATUSES:
+        errores_dict.update({"status": "Estado no permitido"})
+
+    return errores_dict
+
+
+def validate_patch_data(data):
+    """
+    Reglas de validación de una modificación (PATCH individual y masivo).
+    Solo se comprueban los campos presentes. Devuelve el dict de errores.
+    """
+    errores_dict = {}
+    if 'hours_played' in data:
+        if not isinstance(data['hours_played'], int) or data['hours_played'] < 0:
+            errores_dict.update({"hours_played": "Debe ser un entero positivo"})
+
+    if 'status' in data:
+        if data['status'] not in LibraryEntry.ALLOWED_STATUSES:
+            errores_dict.update({"status": "Estado no válido"})
+
+    return errores_dict
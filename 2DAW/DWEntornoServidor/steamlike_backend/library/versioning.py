@@ -0,0 +1,113 @@
+from functools import wraps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+from library.catalog import alatest_fetch, latest_fetch
+from library.filters import parse_expand
+from library.models import LibraryVersion
+
+
+def bump_library_version(user_id):
+    """
+    Incrementa la versión de la biblioteca del usuario. Debe llamarse dentro de
+    la misma transacción que la escritura, para que la versión nunca vaya por
+    detrás de los datos.
+    """
+    if user_id is None:
+        return
+    now = timezone.now()
+    updated = LibraryVersion.objects.filter(user_id=user_id).update(version=F("version") + 1, updated_at=now)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            LibraryVersion.objects.create(user_id=user_id, version=1, updated_at=now)
+    except IntegrityError:
+        # Otra petición ha creado la fila a la vez
+        LibraryVersion.objects.filter(user_id=user_id).update(version=F("version") + 1, updated_at=now)
+
+
+def _expands_games(request):
+    return request.method == "GET" and "game" in parse_expand(request.GET)
+
+
+def get_library_state(request):
+    """
+    (versión, fecha de última modificación) de la biblioteca del usuario que hace
+    la petición, o None si no está autenticado. Se calcula una sola vez por
+    petición: es una búsqueda por clave primaria. Con ?expand=game la respuesta
+    también depende del catálogo: su generación queda en get_catalog_state.
+    """
+    if not hasattr(request, "_library_state"):
+        state = None
+        if request.user.is_authenticated:
+            row = LibraryVersion.objects.filter(user_id=request.user.id).values_list("version", "updated_at").first()
+            state = row or (0, None)
+            request._catalog_state = latest_fetch() if _expands_games(request) else None
+        request._library_state = state
+    return request._library_state
+
+
+async def aget_library_state(request):
+    """
+    Versión asíncrona de get_library_state. "request.user" ya debe estar
+    resuelto (ver steamlike_backend.aio.resolve_user).
+    """
+    if not hasattr(request, "_library_state"):
+        state = None
+        if request.user.is_authenticated:
+            row = await LibraryVersion.objects.filter(user_id=request.user.id).values_list("version", "updated_at").afirst()
+            state = row or (0, None)
+            request._catalog_state = await alatest_fetch() if _expands_games(request) else None
+        request._library_state = state
+    return request._library_state
+
+
+def get_catalog_state(request):
+    """
+    Generación del catálogo (library.catalog.latest_fetch) si la respuesta lleva
+    ?expand=game, o None. La lee get_library_state.
+    """
+    return getattr(request, "_catalog_state", None)
+
+
+def library_etag(request, id=None):
+    """
+    ETag débil de la biblioteca (o de una entrada si se pasa su id). Cambia con
+    cada escritura del usuario, así que un 304 no necesita leer ninguna entrada.
+    Con ?expand=game lleva además la generación del catálogo.
+    """
+    state = get_library_state(request)
+    if state is None:
+        return None
+    suffix = f"-{id}" if id is not None else ""
+    catalog = get_catalog_state(request)
+    if catalog is not None:
+        suffix += f"-{catalog.timestamp()}"
+    return f'W/"{request.user.id}-{state[0]}{suffix}"'
+
+
+def library_last_modified(request, id=None):
+    state = get_library_state(request)
+    if not state:
+        return None
+    catalog = get_catalog_state(request)
+    if catalog is not None and (state[1] is None or catalog > state[1]):
+        return catalog
+    return state[1]
+
+
+def async_library_condition(view):
+    """
+    @condition(library_etag, library_last_modified) para vistas asíncronas.
+    condition() llama a las funciones de ETag de forma síncrona, así que el
+    estado de la biblioteca se lee antes con aget_library_state.
+    """
+    conditional = condition(etag_func=library_etag, last_modified_func=library_last_modified)(view)
+
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        await aget_library_state(request)
+        return await conditional(request, *args, **kwargs)
+    return inner
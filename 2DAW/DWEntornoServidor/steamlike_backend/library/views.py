@@ -1,33 +1,50 @@
-import json
-from django.http import JsonResponse
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
 from django.views import View
-from django.views.decorators.http import require_GET, require_http_methods
+from django.views.decorators.http import condition, require_GET, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django.db import IntegrityError
-from django.contrib.auth.models import User
-from library.models import LibraryEntry
-
-def get_json_request(request):
-    """
-    Devuelve el cuerpo JSON del request como dict.
-    Si el body está vacío o es inválido, devuelve {}.
-    """
-    try:
-        body = request.body.decode("utf-8")
-        if not body:
-            return {}
-        return json.loads(body)
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return {}
+from django.db import IntegrityError, connection, transaction
+from library.models import LibraryEntry, LibraryEvent, LibraryImport, LibrarySummary
+from library.cache import cache_stats, cached_library_response
+from library.catalog import expand_games
+from library.changes import EntryChange, created, record_entry_changes
+from library import activity, export, game_stats, imports, sync
+from library.filters import EXPAND_VALUES, apply_list_filters, parse_expand
+from library.pagination import CursorError, paginate, parse_limit, sort_ordering
+from library.serializers import ENTRY_FIELDS, entry_rows, entry_to_dict, rows_to_dicts
+from library.streaming import iter_entry_rows, json_array_stream, ndjson_stream
+from library.validation import validate_entry_data, validate_patch_data
+from library.versioning import library_etag, library_last_modified
+from jobs.queue import enqueue, job_to_dict
+from steamlike_backend.codec import JsonResponse, get_json_request
+from steamlike_backend.db_pool import pool_stats
+from users import ratelimit
+from users.hashing import HashingBusy
+from users.views import create_user, throttle_response
 
 @require_GET
 def health(request):
-    return JsonResponse({"status": "ok"})
+    data = {"status": "ok"}
+    # Con ?pool=1 se añade el estado del pool de conexiones de este proceso
+    if request.GET.get("pool"):
+        data["db_pool"] = pool_stats(connection)
+    # Con ?cache=1, los aciertos y fallos de la caché de respuestas de este proceso
+    if request.GET.get("cache"):
+        data["library_cache"] = cache_stats()
+    return JsonResponse(data)
 
 @method_decorator(csrf_exempt, name='dispatch')
 class RegisterView(View):
     def post(self, request):
+        try:
+            ratelimit.check_register(request)
+        except ratelimit.RateLimited as e:
+            return throttle_response(e)
+
         data = get_json_request(request)
         username = data.get('username')
         password = data.get('password')
@@ -47,20 +64,142 @@ class RegisterView(View):
             }, status=400)
 
         try:
-            # Crear usuario (encripta la clave automáticamente)
-            user = User.objects.create_user(username=username, password=password)
+            # Crear usuario (el hash de la clave se calcula en el pool de users.hashing)
+            user = create_user(username, password)
             return JsonResponse({
                 "id": user.id,
                 "username": user.username
             }, status=201)
+        except HashingBusy as e:
+            return throttle_response(e)
         except IntegrityError:
             return JsonResponse({
                 "error": "validation_error",
                 "message": "El nombre de usuario ya está en uso"
             }, status=400)
 
+def list_results(request, rows):
+    """Filas del listado -> dicts de la respuesta, con los datos del juego si hay ?expand=game."""
+    results = rows_to_dicts(rows)
+    if "game" in parse_expand(request.GET):
+        expand_games(results)
+    return results
+
+def list_entries_page(request, entries):
+    """
+    Respuesta paginada por cursor: {"results": [...], "next": ..., "prev": ...}.
+    """
+    try:
+        limit = parse_limit(request.GET.get("limit"), settings.LIBRARY_PAGE_SIZE, settings.LIBRARY_PAGE_MAX_SIZE)
+        page, next_cursor, prev_cursor = paginate(
+            entry_rows(entries),
+            sort=request.GET.get("sort"),
+            limit=limit,
+            cursor=request.GET.get("cursor"),
+        )
+    except CursorError as e:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {e.field: str(e)}
+        }, status=400)
+
+    return JsonResponse({
+        "results": list_results(request, page),
+        "next": next_cursor,
+        "prev": prev_cursor,
+    }, status=200)
+
+def patch_body_error(data):
+    """
+    Comprueba el cuerpo de un PATCH individual. Devuelve la respuesta 400 que
+    corresponda, o None si es válido.
+    """
+    if not data:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Cuerpo vacío",
+            "details": {"body": "El cuerpo no puede estar vacío"}
+        }, status=400)
+
+    # Validar campos permitidos
+    allowed_fields = {'status', 'hours_played'}
+    if not any(field in data for field in allowed_fields):
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Debe incluir al menos 'status' o 'hours_played'"
+        }, status=400)
+
+    errores_dict = validate_patch_data(data)
+    if errores_dict:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos inválidos",
+            "details": errores_dict
+        }, status=400)
+    return None
+
+def create_entry(user, external_game_id, status, hours_played):
+    """
+    Alta de una entrada ya validada junto con su registro de cambios, en una
+    transacción. Lanza IntegrityError si el juego ya está en la biblioteca.
+    """
+    with transaction.atomic():
+        # ASOCIACIÓN AUTOMÁTICA AL USUARIO
+        entry = LibraryEntry.objects.create(
+            external_game_id=external_game_id,
+            status=status,
+            hours_played=hours_played,
+            user=user
+        )
+        record_entry_changes(user.id, [created(entry)])
+    return entry
+
+def update_entry(user, entry, data):
+    """
+    Aplica un PATCH ya validado sobre "entry" (cargada con ENTRY_FIELDS) junto
+    con su registro de cambios, en una transacción.
+    """
+    with transaction.atomic():
+        # Se relee la fila bloqueada para que los contadores partan del valor real
+        old = LibraryEntry.objects.select_for_update().only("status", "hours_played").get(pk=entry.pk)
+        if 'status' in data: entry.status = data['status']
+        if 'hours_played' in data: entry.hours_played = data['hours_played']
+        # Solo las columnas que se pueden cambiar (y updated_at, que pone auto_now)
+        entry.save(update_fields=[field for field in ('status', 'hours_played') if field in data] + ['updated_at'])
+        record_entry_changes(user.id, [EntryChange(
+            entry.id, entry.external_game_id, old.status, old.hours_played, entry.status, entry.hours_played
+        )])
+    return entry
+
+STREAM_FORMATS = {
+    "ndjson": (ndjson_stream, "application/x-ndjson"),
+    "json": (json_array_stream, "application/json"),
+}
+
+def stream_entries(request, entries):
+    """
+    Devuelve toda la biblioteca sin construirla en memoria: las filas salen
+    de un cursor del servidor y se escriben en la respuesta según llegan.
+    """
+    mode = request.GET.get("stream")
+    if mode not in STREAM_FORMATS:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {"stream": "Formato no permitido. Los valores permitidos son: " + ", ".join(STREAM_FORMATS)}
+        }, status=400)
+
+    encoder, content_type = STREAM_FORMATS[mode]
+    if request.GET.get("sort"):
+        entries = entries.order_by(*sort_ordering(request.GET["sort"]))
+    rows = iter_entry_rows(entries, settings.LIBRARY_STREAM_CHUNK_SIZE)
+    return StreamingHttpResponse(encoder(rows), content_type=content_type, status=200)
+
 @require_http_methods(["GET", "POST"])
 @csrf_exempt
+@condition(etag_func=library_etag, last_modified_func=library_last_modified)
+@cached_library_response
 def add_library_entry(request):
     # 1. PROTECCIÓN: Autenticación
     if not request.user.is_authenticated:
@@ -71,34 +210,14 @@ def add_library_entry(request):
         external_game_id = data.get("external_game_id")
         status = data.get("status")
         hours_played = data.get("hours_played", 0)
-        
-        errores_dict = {}
 
         # 2. VALIDACIÓN: Tipos y obligatoriedad
-        if not external_game_id:
-            errores_dict.update({"external_game_id": "Este campo es obligatorio"})
-        
-        if not isinstance(hours_played, int) or hours_played < 0:
-            errores_dict.update({"hours_played": "Las horas deben ser un número entero positivo"})
-
-        if status not in ["wishlist", "playing", "completed", "dropped"]:
-            errores_dict.update({"status": "Estado no permitido"})
+        errores_dict = validate_entry_data(data)
 
         if not errores_dict:
             try:
-                # ASOCIACIÓN AUTOMÁTICA AL USUARIO
-                entry = LibraryEntry.objects.create(
-                    external_game_id=external_game_id,
-                    status=status,
-                    hours_played=hours_played,
-                    user=request.user
-                ) 
-                return JsonResponse({
-                    "id": entry.id, 
-                    "external_game_id": entry.external_game_id,
-                    "status": entry.status, 
-                    "hours_played": entry.hours_played
-                }, status=201)
+                entry = create_entry(request.user, external_game_id, status, hours_played)
+                return JsonResponse(entry_to_dict(entry), status=201)
             except IntegrityError:
                 return JsonResponse({
                     "error": "duplicate_entry",
@@ -115,27 +234,42 @@ def add_library_entry(request):
     elif request.method == "GET":
         # PRIVACIDAD: Solo lo propio
         entries = LibraryEntry.objects.filter(user=request.user)
-        response_entries = [
-            {
-                "id": e.id,
-                "external_game_id": e.external_game_id,
-                "status": e.status,
-                "hours_played": e.hours_played
-            } for e in entries
-        ]
-        return JsonResponse(response_entries, status=200, safe=False) 
+
+        # FILTROS: estado, rango de horas y orden, resueltos en SQL
+        entries, errores_dict = apply_list_filters(entries, request.GET)
+        if errores_dict:
+            return JsonResponse({
+                "error": "validation_error",
+                "message": "Parámetros de consulta inválidos",
+                "details": errores_dict
+            }, status=400)
+
+        # Modo streaming para bibliotecas grandes (?stream=ndjson | ?stream=json)
+        if "stream" in request.GET:
+            return stream_entries(request, entries)
+
+        # Paginación por cursor si el cliente la pide (o si el modo antiguo está desactivado)
+        if "limit" in request.GET or "cursor" in request.GET or not settings.LIBRARY_LEGACY_LIST:
+            return list_entries_page(request, entries)
+
+        if request.GET.get("sort"):
+            entries = entries.order_by(*sort_ordering(request.GET["sort"]))
+
+        return JsonResponse(list_results(request, entry_rows(entries)), status=200, safe=False)
     
     return JsonResponse({"error": "method_not_allowed", "message": "Método no permitido"}, status=405)
 
 @require_http_methods(["GET", "PATCH"])
 @csrf_exempt
+@condition(etag_func=library_etag, last_modified_func=library_last_modified)
+@cached_library_response
 def library_entry_detail(request, id):
     if not request.user.is_authenticated:
         return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
 
     try:
         # Filtro por ID y Usuario (Seguridad de propiedad)
-        entry = LibraryEntry.objects.get(id=id, user=request.user)
+        entry = LibraryEntry.objects.only(*ENTRY_FIELDS).get(id=id, user=request.user)
     except LibraryEntry.DoesNotExist:
         return JsonResponse({
             "error": "not_found",
@@ -143,56 +277,470 @@ def library_entry_detail(request, id):
         }, status=404)
 
     if request.method == 'GET':
-        return JsonResponse({
-            "id": entry.id,
-            "external_game_id": entry.external_game_id,
-            "status": entry.status,
-            "hours_played": entry.hours_played
-        }, status=200)
+        return JsonResponse(entry_to_dict(entry), status=200)
 
     elif request.method == 'PATCH':
         data = get_json_request(request)
-        if not data:
-            return JsonResponse({
-                "error": "validation_error",
-                "message": "Cuerpo vacío",
-                "details": {"body": "El cuerpo no puede estar vacío"}
-            }, status=400)
+        error_response = patch_body_error(data)
+        if error_response is not None:
+            return error_response
         
-        # Validar campos permitidos
-        allowed_fields = {'status', 'hours_played'}
-        if not any(field in data for field in allowed_fields):
-             return JsonResponse({
-                "error": "validation_error",
-                "message": "Debe incluir al menos 'status' o 'hours_played'"
-            }, status=400)
-
-        errores_dict = {}
-        if 'hours_played' in data:
-            if not isinstance(data['hours_played'], int) or data['hours_played'] < 0:
-                errores_dict.update({"hours_played": "Debe ser un entero positivo"})
-        
-        if 'status' in data:
-            if data['status'] not in ["wishlist", "playing", "completed", "dropped"]:
-                errores_dict.update({"status": "Estado no válido"})
+        # Guardar cambios
+        update_entry(request.user, entry, data)
         
+        return JsonResponse(entry_to_dict(entry), status=200)
+
+    return JsonResponse({"error": "method_not_allowed", "message": "Método no permitido"}, status=405)
+
+@require_http_methods(["POST", "PATCH"])
+@csrf_exempt
+def bulk_library_entries(request):
+    """
+    Operaciones masivas sobre la biblioteca del usuario:
+    - POST: alta de un array de entradas.
+    - PATCH: cambios de "status" / "hours_played" sobre un array de {"id", ...}.
+    Todo va en una única transacción y el resultado se informa elemento a elemento.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    items = get_json_request(request)
+    if not isinstance(items, list) or not items:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos",
+            "details": {"body": "El cuerpo debe ser un array de entradas no vacío"}
+        }, status=400)
+
+    if len(items) > settings.LIBRARY_BULK_MAX_ITEMS:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos",
+            "details": {"body": f"Como máximo {settings.LIBRARY_BULK_MAX_ITEMS} entradas por petición"}
+        }, status=400)
+
+    if request.method == "POST":
+        return bulk_create_entries(request, items)
+    return bulk_update_entries(request, items)
+
+def bulk_create_entries(request, items):
+    """
+    Valida todas las entradas con las mismas reglas que el alta individual y
+    las inserta por lotes como la importación (imports.insert_entries). Los duplicados no rompen la
+    petición: se informan como "skipped".
+    """
+    results = [None] * len(items)
+    pending = {}  # external_game_id -> índice del elemento
+
+    # 1. VALIDACIÓN: todo en una pasada, sin tocar la base de datos
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "result": "invalid", "details": {"body": "Debe ser un objeto"}}
+            continue
+        errores_dict = validate_entry_data(item)
         if errores_dict:
+            results[index] = {"index": index, "result": "invalid", "details": errores_dict}
+            continue
+        game_id = str(item["external_game_id"])
+        if game_id in pending:
+            results[index] = {"index": index, "result": "skipped", "external_game_id": game_id, "reason": "duplicate_in_request"}
+        else:
+            pending[game_id] = index
+
+    # 2. INSERCIÓN: por lotes, ignorando conflictos con lo que ya existe
+    game_ids = list(pending)
+    batch_size = settings.LIBRARY_BULK_BATCH_SIZE
+    changes = []
+    with transaction.atomic():
+        for start in range(0, len(game_ids), batch_size):
+            batch = game_ids[start:start + batch_size]
+            existing = set(
+                LibraryEntry.objects.filter(user=request.user, external_game_id__in=batch)
+                .values_list("external_game_id", flat=True)
+            )
+            new_rows = [
+                (game_id, items[pending[game_id]]["status"], items[pending[game_id]].get("hours_played", 0))
+                for game_id in batch if game_id not in existing
+            ]
+            # Solo los ids de las filas insertadas aquí (RETURNING): una insertada
+            # a la vez por otra petición del mismo usuario sale como duplicada
+            created_ids = imports.insert_entries(request.user, new_rows)
+            for game_id in batch:
+                index = pending[game_id]
+                if game_id in existing or game_id not in created_ids:
+                    results[index] = {"index": index, "result": "skipped", "external_game_id": game_id, "reason": "duplicate"}
+                else:
+                    results[index] = {"index": index, "result": "created", "external_game_id": game_id, "id": created_ids[game_id]}
+                    changes.append(EntryChange(
+                        created_ids[game_id], game_id, None, None,
+                        items[index]["status"], items[index].get("hours_played", 0)
+                    ))
+
+        record_entry_changes(request.user.id, changes)
+
+    summary = {"created": 0, "skipped": 0, "invalid": 0}
+    for result in results:
+        summary[result["result"]] += 1
+
+    return JsonResponse({**summary, "results": results}, status=200)
+
+def bulk_update_entries(request, items):
+    """
+    Aplica muchos PATCH de golpe: una sola consulta comprueba la propiedad de
+    todas las entradas y los cambios se escriben con bulk_update (UPDATE ... CASE)
+    limitado a las columnas que realmente cambian.
+    """
+    results = [None] * len(items)
+    pending = {}  # id -> índice del elemento
+    allowed_fields = ("status", "hours_played")
+
+    # 1. VALIDACIÓN
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "result": "invalid", "details": {"body": "Debe ser un objeto"}}
+            continue
+        entry_id = item.get("id")
+        if not isinstance(entry_id, int) or isinstance(entry_id, bool):
+            results[index] = {"index": index, "result": "invalid", "details": {"id": "Debe ser un entero"}}
+            continue
+        if not any(field in item for field in allowed_fields):
+            results[index] = {"index": index, "result": "invalid", "details": {"body": "Debe incluir al menos 'status' o 'hours_played'"}}
+            continue
+        errores_dict = validate_patch_data(item)
+        if errores_dict:
+            results[index] = {"index": index, "result": "invalid", "details": errores_dict}
+        elif entry_id in pending:
+            results[index] = {"index": index, "result": "invalid", "details": {"id": "duplicate_in_request"}}
+        else:
+            pending[entry_id] = index
+
+    with transaction.atomic():
+        # 2. PROPIEDAD: una consulta para todas las entradas (y bloqueo de esas filas)
+        entries = {
+            e.id: e for e in LibraryEntry.objects.select_for_update()
+            .filter(user=request.user, id__in=list(pending))
+            .only(*ENTRY_FIELDS)
+        }
+
+        # 3. CAMBIOS: se agrupan por el conjunto de columnas modificadas
+        groups = {}
+        changes = []
+        for entry_id, index in pending.items():
+            entry = entries.get(entry_id)
+            if entry is None:
+                results[index] = {"index": index, "result": "not_found", "id": entry_id}
+                continue
+            changed = tuple(
+                field for field in allowed_fields
+                if field in items[index] and getattr(entry, field) != items[index][field]
+            )
+            old_status, old_hours = entry.status, entry.hours_played
+            for field in changed:
+                setattr(entry, field, items[index][field])
+            if changed:
+                groups.setdefault(changed, []).append(entry)
+                changes.append(EntryChange(
+                    entry.id, entry.external_game_id, old_status, old_hours, entry.status, entry.hours_played
+                ))
+            results[index] = {"index": index, "result": "updated", **entry_to_dict(entry)}
+
+        # bulk_update no aplica auto_now: updated_at se pone a mano
+        now = timezone.now()
+        for fields, group in groups.items():
+            for entry in group:
+                entry.updated_at = now
+            LibraryEntry.objects.bulk_update(group, fields + ("updated_at",), batch_size=settings.LIBRARY_BULK_BATCH_SIZE)
+
+        record_entry_changes(request.user.id, changes)
+
+    summary = {"updated": 0, "not_found": 0, "invalid": 0}
+    for result in results:
+        summary[result["result"]] += 1
+
+    return JsonResponse({**summary, "results": results}, status=200)
+
+@require_GET
+@condition(etag_func=library_etag, last_modified_func=library_last_modified)
+def library_summary(request):
+    """
+    Resumen de la biblioteca ("N jugando, M completados, horas totales").
+    Sale de la tabla de contadores: una búsqueda por clave primaria.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    summary = LibrarySummary.objects.filter(user_id=request.user.id).first() or LibrarySummary()
+    return JsonResponse({
+        "total_entries": summary.total_entries,
+        "total_hours": summary.total_hours,
+        "by_status": {status: getattr(summary, status) for status in LibraryEntry.ALLOWED_STATUSES},
+    }, status=200)
+
+def activity_feed_response(request, queryset, sort):
+    """Página del feed de actividad: {"results": [...], "next": cursor o None}."""
+    try:
+        limit = parse_limit(request.GET.get("limit"), settings.LIBRARY_ACTIVITY_PAGE_SIZE, settings.LIBRARY_ACTIVITY_PAGE_MAX_SIZE)
+        queryset = activity.time_range(queryset, request.GET)
+        events, next_cursor = activity.feed_page(queryset, sort, limit, request.GET.get("cursor"))
+    except CursorError as e:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {e.field: str(e)}
+        }, status=400)
+    return JsonResponse({"results": events, "next": next_cursor}, status=200)
+
+@require_GET
+def library_activity(request):
+    """
+    Actividad de la biblioteca del usuario, de lo más reciente a lo más
+    antiguo (?since=, ?until=, ?limit=, ?cursor=).
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    return activity_feed_response(request, LibraryEvent.objects.filter(user_id=request.user.id), activity.USER_SORT)
+
+@require_GET
+def library_activity_all(request):
+    """Actividad de todos los usuarios. Solo para administradores."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({"error": "forbidden", "message": "Solo para administradores"}, status=403)
+
+    return activity_feed_response(request, LibraryEvent.objects.all(), activity.GLOBAL_SORT)
+
+@require_GET
+def library_activity_trend(request):
+    """
+    Horas jugadas añadidas por día en la biblioteca del usuario entre ?since=
+    y ?until= (por defecto, los últimos 30 días).
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    params = request.GET.copy()
+    if not params.get("since"):
+        params["since"] = (timezone.now() - timedelta(days=30)).date().isoformat()
+    try:
+        since = activity.parse_time(params["since"], "since")
+        until = activity.parse_time(params.get("until"), "until", end=True) or timezone.now()
+        if until - since > timedelta(days=settings.LIBRARY_ACTIVITY_TREND_MAX_DAYS):
+            raise CursorError(f"El rango no puede superar {settings.LIBRARY_ACTIVITY_TREND_MAX_DAYS} días", "since")
+        queryset = activity.time_range(LibraryEvent.objects.filter(user_id=request.user.id), params)
+    except CursorError as e:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {e.field: str(e)}
+        }, status=400)
+    return JsonResponse({"results": activity.hours_trend(queryset)}, status=200)
+
+@require_GET
+def library_changes(request):
+    """
+    Cambios de la biblioteca desde ?since=<cursor> (altas y cambios con el
+    estado actual de la entrada, borrados como marcas en "deleted") y el
+    cursor para la siguiente llamada. Sin cursor, o si es demasiado antiguo,
+    responde full_resync: el cliente descarga la biblioteca completa y sigue
+    desde el cursor devuelto.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    try:
+        limit = parse_limit(request.GET.get("limit"), settings.LIBRARY_CHANGES_PAGE_SIZE, settings.LIBRARY_CHANGES_PAGE_MAX_SIZE)
+        data = sync.changes_since(request.user.id, request.GET.get("since"), limit)
+    except CursorError as e:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {e.field: str(e)}
+        }, status=400)
+    return JsonResponse(data, status=200)
+
+@require_GET
+def game_leaderboard(request):
+    """
+    Clasificación global de juegos (?by=hours|players|completed, ?limit=).
+    Sale de GameStats, nunca de una agregación sobre LibraryEntry.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    errores_dict = {}
+    by = request.GET.get("by", "hours")
+    if by not in game_stats.LEADERBOARDS:
+        errores_dict.update({"by": "Valor no permitido. Los valores permitidos son: " + ", ".join(game_stats.LEADERBOARDS)})
+    try:
+        limit = parse_limit(request.GET.get("limit"), 20, settings.GAME_STATS_LEADERBOARD_MAX)
+    except CursorError as e:
+        errores_dict.update({e.field: str(e)})
+    expand = parse_expand(request.GET)
+    if expand - set(EXPAND_VALUES):
+        errores_dict.update({"expand": "Valor no permitido. Los valores permitidos son: " + ", ".join(EXPAND_VALUES)})
+    if errores_dict:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": errores_dict
+        }, status=400)
+
+    results = game_stats.leaderboard(by, limit)
+    if "game" in expand:
+        expand_games(results)
+    return JsonResponse({"by": by, "results": results}, status=200)
+
+@require_GET
+def game_stats_detail(request, external_game_id):
+    """Estadísticas globales de un juego, con la mediana y el p90 de horas de sus jugadores."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    data = game_stats.game_stats(external_game_id)
+    if data is None:
+        return JsonResponse({
+            "error": "not_found",
+            "message": "El juego no está en ninguna biblioteca"
+        }, status=404)
+    if "game" in parse_expand(request.GET):
+        expand_games([data])
+    return JsonResponse(data, status=200)
+
+def export_response(request, queryset, fields, name):
+    """
+    Respuesta en streaming con la exportación en ?format=csv|ndjson (CSV por
+    defecto) y, con ?gzip=1, comprimida al vuelo como fichero .gz.
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {"format": "Formato no permitido. Los valores permitidos son: " + ", ".join(export.FORMATS)}
+        }, status=400)
+
+    gzip = request.GET.get("gzip", "").lower() in {"1", "true", "yes"}
+    chunks = export.export_stream(
+        queryset, fields, fmt, settings.LIBRARY_EXPORT_CHUNK_SIZE,
+        settings.LIBRARY_EXPORT_GZIP_LEVEL if gzip else None,
+    )
+    content_type = "application/gzip" if gzip else export.FORMATS[fmt][0]
+    response = StreamingHttpResponse(chunks, content_type=content_type, status=200)
+    response["Content-Disposition"] = f'attachment; filename="{export.export_filename(name, fmt, gzip)}"'
+    return response
+
+@require_GET
+def library_export(request):
+    """Biblioteca completa del usuario en CSV o NDJSON, sin límite de tamaño."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    return export_response(request, export.export_queryset(user=request.user), export.EXPORT_FIELDS, f"library-{request.user.id}")
+
+@require_GET
+def library_export_all(request):
+    """
+    Exportación de las bibliotecas de todos los usuarios (solo administradores),
+    opcionalmente de un tramo de ids de usuario: ?user_min=&user_max=.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({"error": "forbidden", "message": "Solo para administradores"}, status=403)
+
+    bounds = {}
+    errores_dict = {}
+    for name in ("user_min", "user_max"):
+        if name in request.GET:
+            try:
+                bounds[name] = int(request.GET[name])
+            except ValueError:
+                errores_dict.update({name: "Debe ser un entero"})
+    if errores_dict:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": errores_dict
+        }, status=400)
+
+    name = "library-all"
+    if bounds:
+        name += f"-{bounds.get('user_min', '')}-{bounds.get('user_max', '')}"
+    return export_response(request, export.export_queryset(**bounds), export.ADMIN_EXPORT_FIELDS, name)
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def library_import(request):
+    """
+    Importa un fichero NDJSON o CSV en la biblioteca del usuario. El fichero va
+    como cuerpo de la petición o como campo "file" de un formulario multipart;
+    el formato sale de ?format=, del nombre del fichero o del Content-Type.
+    Con ?background=1 se encola como trabajo y se responde 202 con el trabajo.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if length > settings.LIBRARY_IMPORT_MAX_BYTES:
+        return JsonResponse({
+            "error": "payload_too_large",
+            "message": f"El fichero no puede superar {settings.LIBRARY_IMPORT_MAX_BYTES} bytes"
+        }, status=413)
+
+    if request.content_type == "multipart/form-data":
+        upload = request.FILES.get("file")
+        if upload is None:
             return JsonResponse({
                 "error": "validation_error",
-                "message": "Datos inválidos",
-                "details": errores_dict
+                "message": "Datos de entrada inválidos",
+                "details": {"file": "Campo obligatorio"}
             }, status=400)
-        
-        # Guardar cambios
-        if 'status' in data: entry.status = data['status']
-        if 'hours_played' in data: entry.hours_played = data['hours_played']
-        entry.save()
-        
+        # Django guarda en disco los ficheros grandes; se leen línea a línea
+        lines, name, content_type = upload, upload.name, upload.content_type or ""
+    else:
+        # El cuerpo se lee del socket línea a línea, sin request.body
+        lines, name, content_type = request, "", request.content_type or ""
+
+    fmt = request.GET.get("format") or imports.detect_format(name, content_type)
+    if fmt not in imports.FORMATS:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Parámetros de consulta inválidos",
+            "details": {"format": "Formato no permitido. Los valores permitidos son: " + ", ".join(imports.FORMATS)}
+        }, status=400)
+
+    if request.GET.get("background", "").lower() in {"1", "true", "yes"}:
+        # Se guarda el fichero y lo importa un worker: la respuesta es inmediata
+        path = imports.save_upload(lines, fmt)
+        job = enqueue("library.import", {"user_id": request.user.id, "path": path, "format": fmt}, user=request.user)
+        response = JsonResponse({"job": job_to_dict(job)}, status=202)
+        response["Location"] = f"/api/jobs/{job.id}/"
+        return response
+
+    result = imports.run_import(request.user, lines, fmt, settings.LIBRARY_IMPORT_CHUNK_SIZE)
+    return JsonResponse(imports.import_to_dict(result), status=200)
+
+@require_GET
+def library_import_errors(request, id):
+    """Informe NDJSON con las líneas rechazadas de una importación del usuario."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "unauthorized", "message": "No autenticado"}, status=401)
+
+    record = LibraryImport.objects.filter(id=id, user=request.user).first()
+    if record is None or not record.error_report:
         return JsonResponse({
-            "id": entry.id,
-            "external_game_id": entry.external_game_id,
-            "status": entry.status,
-            "hours_played": entry.hours_played
-        }, status=200)
+            "error": "not_found",
+            "message": "La importación no existe o no tiene errores"
+        }, status=404)
 
-    return JsonResponse({"error": "method_not_allowed", "message": "Método no permitido"}, status=405)
\ No newline at end of file
+    return FileResponse(
+        record.error_report.open("rb"),
+        as_attachment=True,
+        filename=f"import-{record.id}-errors.ndjson",
+        content_type="application/x-ndjson",
+    )
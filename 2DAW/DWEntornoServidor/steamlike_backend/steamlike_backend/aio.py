@@ -0,0 +1,18 @@
+"""
+Utilidades para las vistas asíncronas (ASGI).
+"""
+from functools import wraps
+
+
+def resolve_user(view):
+    """
+    Carga el usuario de la petición con request.auser() y lo deja en
+    request.user. Así el resto de la vista (y las funciones síncronas que use,
+    como las de ETag) pueden leer request.user sin consultar la base de datos
+    desde un contexto asíncrono.
+    """
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+    return inner
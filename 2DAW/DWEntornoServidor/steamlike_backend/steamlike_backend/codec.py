@@ -0,0 +1,80 @@
+"""
+Codificación y decodificación JSON de la API, compartida por todas las apps.
+
+Si está instalado orjson se usa para leer los cuerpos de las peticiones y
+escribir las respuestas; si no, se usa el módulo json de la biblioteca
+estándar. El resultado es el mismo JSON en los dos casos.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _default(value):
+    # Tipos que orjson no conoce (Decimal, Promise...) se convierten como en JsonResponse
+    return _django_encoder.default(value)
+
+
+def stdlib_loads(data):
+    return json.loads(data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data)
+
+
+def stdlib_dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+if orjson is not None:
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(value):
+        """Objeto -> JSON en bytes (UTF-8)."""
+        try:
+            return orjson.dumps(value, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            # Enteros de más de 64 bits, claves que no son cadenas...: el codificador estándar sí los admite
+            return stdlib_dumps(value)
+else:
+    loads = stdlib_loads
+    dumps = stdlib_dumps
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def get_json_request(request):
+    """
+    Devuelve el cuerpo JSON del request como dict.
+    Si el body está vacío o es inválido, devuelve {}.
+    """
+    body = request.body
+    if not body:
+        return {}
+    try:
+        return loads(body)
+    except (ValueError, UnicodeDecodeError):
+        # json.JSONDecodeError y orjson.JSONDecodeError son subclases de ValueError
+        return {}
+
+
+class JsonResponse(HttpResponse):
+    """
+    Igual que django.http.JsonResponse (mismos argumentos y mismo "safe"),
+    pero serializando con dumps().
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,47 @@
+"""
+Estadísticas del pool de conexiones a la base de datos (ver DB_POOL en
+settings.py), para /api/health/?pool=1.
+"""
+import os
+
+
+def pool_stats(connection):
+    """
+    Estado del pool de "connection" en este proceso: conexiones en uso,
+    libres, peticiones esperando y tiempo medio de espera para conseguir una.
+    Si la base de datos no usa pool se indica "enabled": False.
+    """
+    pool = getattr(connection, "pool", None)
+    if pool is None:
+        return {
+            "enabled": False,
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+            "pid": os.getpid(),
+        }
+
+    stats = pool.get_stats()
+    # Django abre el pool con la primera petición que usa la base de datos
+    opened = not getattr(pool, "closed", False)
+    size = stats.get("pool_size", 0) if opened else 0
+    idle = stats.get("pool_available", 0)
+    waiting = stats.get("requests_waiting", 0)
+    requests = stats.get("requests_num", 0)
+    max_size = stats.get("pool_max", pool.max_size)
+    return {
+        "enabled": True,
+        "open": opened,
+        "pid": os.getpid(),
+        "min_size": stats.get("pool_min", pool.min_size),
+        "max_size": max_size,
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "waiting": waiting,
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "acquire_ms_avg": round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else 0.0,
+        "timeouts": stats.get("requests_errors", 0),
+        # Todas las conexiones ocupadas o alguien esperando: el siguiente pico hará cola
+        "saturated": waiting > 0 or (size - idle) >= max_size,
+    }
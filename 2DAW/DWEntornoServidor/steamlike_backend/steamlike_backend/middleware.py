@@ -0,0 +1,184 @@
+"""
+Middleware de medición de peticiones.
+
+RequestTimingMiddleware mide el tiempo total de cada petición y, en las
+peticiones muestreadas (REQUEST_TIMING_SAMPLE_RATE), también el tiempo y el
+número de consultas a la base de datos. Lo devuelve en la cabecera
+Server-Timing y lo escribe como una línea JSON en el logger
+"steamlike.requests". Las consultas más lentas que REQUEST_TIMING_SLOW_QUERY_MS
+se registran con su SQL (y su plan si REQUEST_TIMING_EXPLAIN está activo) en
+"steamlike.slow_queries".
+
+Las consultas se cuentan con un execute_wrapper, no con connection.queries,
+así que no depende de DEBUG ni acumula nada entre peticiones. Cada conexión
+lleva un único wrapper que no se quita nunca y que apunta la consulta en el
+QueryTimer de la petición en curso, guardado en un ContextVar: con ASGI varias
+peticiones comparten la conexión del hilo del ORM, y apilar y desapilar un
+wrapper por petición las mezclaría. En las respuestas en streaming solo se
+mide hasta que la vista devuelve la respuesta.
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from steamlike_backend.codec import dumps
+
+request_logger = logging.getLogger("steamlike.requests")
+slow_query_logger = logging.getLogger("steamlike.slow_queries")
+
+# Como mucho se guardan (y se explican) tantas consultas lentas por petición
+MAX_SLOW_QUERIES = 5
+
+
+class QueryTimer:
+    """execute_wrapper que acumula el número de consultas y su duración."""
+
+    def __init__(self, slow_ms):
+        self.count = 0
+        self.seconds = 0.0
+        self.slow_ms = slow_ms
+        self.slow = []  # (alias, sql, params, many, ms)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if self.slow_ms is not None and elapsed * 1000 >= self.slow_ms and len(self.slow) < MAX_SLOW_QUERIES:
+                self.slow.append((context["connection"].alias, sql, params, many, elapsed * 1000))
+
+
+# QueryTimer de la petición en curso (None si no se mide). sync_to_async copia el
+# contexto, así que el ORM lo ve también desde su hilo
+_current_timer = ContextVar("request_query_timer", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_wrapper(connection, **kwargs):
+    """
+    Deja _record_query como wrapper más externo de la conexión, una sola vez. Va
+    al principio de la lista: quien use connection.execute_wrapper() desapila el
+    último, que sigue siendo el suyo.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def _install_all():
+    for connection in connections.all():
+        install_query_wrapper(connection)
+
+
+def _explain(alias, sql, params):
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+
+
+def report_slow_queries(timer, request):
+    explain = settings.REQUEST_TIMING_EXPLAIN
+    for alias, sql, params, many, ms in timer.slow:
+        plan = None
+        # Solo SELECT: explicar un INSERT/UPDATE no lo ejecuta, pero no aporta nada al listado de lentas
+        if explain and not many and sql.lstrip()[:6].upper() == "SELECT":
+            try:
+                plan = _explain(alias, sql, params)
+            except Exception as e:  # el plan es informativo: nunca debe romper la petición
+                plan = f"EXPLAIN falló: {e}"
+        slow_query_logger.warning(
+            "Consulta lenta (%.1f ms) en %s %s: %s%s",
+            ms, request.method, request.path, sql, f"\n{plan}" if plan else "",
+        )
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        # Las conexiones que se abran a partir de ahora, en cualquier hilo, ya llevan el wrapper
+        connection_created.connect(install_query_wrapper, dispatch_uid="steamlike_request_timing")
+
+    @staticmethod
+    def _sampled():
+        rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        return rate >= 1 or random.random() < rate
+
+    def _finish(self, request, response, timer, total):
+        metrics = [f"total;dur={total * 1000:.1f}"]
+        line = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+        }
+        if timer is not None:
+            metrics.append(f'db;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries"')
+            metrics.append(f"app;dur={(total - timer.seconds) * 1000:.1f}")
+            line.update(db_ms=round(timer.seconds * 1000, 2), queries=timer.count)
+        if settings.REQUEST_TIMING_HEADER:
+            response.headers["Server-Timing"] = ", ".join(metrics)
+        request_logger.info(dumps(line).decode("utf-8"))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_TIMING:
+            return self.get_response(request)
+
+        timer = QueryTimer(settings.REQUEST_TIMING_SLOW_QUERY_MS) if self._sampled() else None
+        if timer is not None:
+            _install_all()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        total = time.perf_counter() - started
+        self._finish(request, response, timer, total)
+        if timer is not None and timer.slow:
+            report_slow_queries(timer, request)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_TIMING:
+            return await self.get_response(request)
+
+        # Las conexiones son distintas en cada hilo: el wrapper tiene que estar en
+        # las del hilo donde sync_to_async ejecuta el ORM. Instalarlo no hace nada
+        # si ya estaba, y nunca se quita, así que no afecta a otras peticiones
+        timer = QueryTimer(settings.REQUEST_TIMING_SLOW_QUERY_MS) if self._sampled() else None
+        if timer is not None:
+            await sync_to_async(_install_all)()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        total = time.perf_counter() - started
+        self._finish(request, response, timer, total)
+        if timer is not None and timer.slow:
+            await sync_to_async(report_slow_queries)(timer, request)
+        return response
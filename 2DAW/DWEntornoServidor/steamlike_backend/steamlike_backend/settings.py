@@ -36,9 +36,13 @@ INSTALLED_APPS = [
 
     # Local apps
     "library",
+    "users",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    # El primero, para que el tiempo total incluya al resto de middlewares
+    "steamlike_backend.middleware.RequestTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
 
     "django.middleware.security.SecurityMiddleware",
@@ -47,6 +51,8 @@ MIDDLEWARE = [
     "django.middleware.csrf.CsrfViewMiddleware",
 
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Tokens "Bearer" de la API: sustituyen a la sesión cuando vienen en la petición
+    "users.middleware.TokenAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -70,6 +76,25 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "steamlike_backend.wsgi.application"
+ASGI_APPLICATION = "steamlike_backend.asgi.application"
+
+# Vistas asíncronas (library.async_views, users.async_views) para las rutas de la
+# API. Activarlo solo al servir con ASGI: con WSGI cada vista asíncrona necesita
+# su propio bucle de eventos y es más lenta que la síncrona.
+API_ASYNC_VIEWS = _env_bool("API_ASYNC_VIEWS", False)
+
+# --- Conexiones a PostgreSQL ---
+# Con DB_POOL activo cada proceso mantiene un pool de conexiones de psycopg
+# (entre DB_POOL_MIN_SIZE y DB_POOL_MAX_SIZE); una petición espera como mucho
+# DB_POOL_TIMEOUT segundos a que quede una libre. Sin pool, las conexiones se
+# reutilizan durante DB_CONN_MAX_AGE segundos. En los dos casos se comprueba
+# que la conexión sigue viva antes de usarla.
+DB_POOL = _env_bool("DB_POOL", True)
+DB_POOL_MIN_SIZE = int(_env("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(_env("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(_env("DB_POOL_TIMEOUT", "10"))
+DB_POOL_MAX_IDLE = float(_env("DB_POOL_MAX_IDLE", "600"))
+DB_CONN_MAX_AGE = int(_env("DB_CONN_MAX_AGE", "60"))
 
 DATABASES = {
     "default": {
@@ -79,9 +104,33 @@ DATABASES = {
         "PASSWORD": _env("POSTGRES_PASSWORD", "steamlike"),
         "HOST": _env("POSTGRES_HOST", "db"),
         "PORT": _env("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": DB_POOL_TIMEOUT,
+                "max_idle": DB_POOL_MAX_IDLE,
+            },
+        } if DB_POOL else {},
     }
 }
 
+# Base de datos SQLite en lugar de PostgreSQL (benchmarks y pruebas locales sin contenedores)
+if _env("DJANGO_SQLITE_PATH"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": _env("DJANGO_SQLITE_PATH"),
+        # Con varios procesos escribiendo (p. ej. varios runworker) las
+        # transacciones piden el bloqueo de escritura al empezar y esperan a
+        # que quede libre, en vez de fallar con "database is locked"
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+    }
+
+# El hash de las contraseñas se calcula en un pool acotado (users.hashing)
+AUTHENTICATION_BACKENDS = ["users.backends.PooledHashingBackend"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -95,6 +144,8 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = "static/"
+# Ficheros generados por la aplicación (informes de errores de las importaciones)
+MEDIA_ROOT = _env("DJANGO_MEDIA_ROOT", str(BASE_DIR / "media"))
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # --- CORS + cookies (SessionAuthentication) ---
@@ -106,3 +157,147 @@ CSRF_TRUSTED_ORIGINS = _env_csv("DJANGO_CSRF_TRUSTED_ORIGINS", "http://frontend:
 # Dev defaults for cookies (keep simple; hardening can be done later)
 SESSION_COOKIE_SAMESITE = "Lax"
 CSRF_COOKIE_SAMESITE = "Lax"
+
+# --- Tokens de la API (users.tokens) ---
+# Vida del token de acceso (se valida sin base de datos, así que es lo que tarda
+# en notarse una baja o un cambio de contraseña) y del token de refresco, en segundos.
+API_ACCESS_TOKEN_TTL = int(_env("API_ACCESS_TOKEN_TTL", "300"))
+API_REFRESH_TOKEN_TTL = int(_env("API_REFRESH_TOKEN_TTL", str(14 * 24 * 3600)))
+
+# --- Hash de contraseñas y límites de intentos (users.hashing, users.ratelimit) ---
+# Como mucho HASHING_WORKERS hashes a la vez por proceso y HASHING_QUEUE_SIZE en
+# cola; si no caben, o si esperan más de HASHING_QUEUE_TIMEOUT segundos, la
+# petición recibe un 503 con Retry-After: HASHING_RETRY_AFTER.
+HASHING_POOL = _env_bool("HASHING_POOL", True)
+HASHING_WORKERS = int(_env("HASHING_WORKERS", str(os.cpu_count() or 2)))
+HASHING_QUEUE_SIZE = int(_env("HASHING_QUEUE_SIZE", str(2 * HASHING_WORKERS)))
+HASHING_QUEUE_TIMEOUT = float(_env("HASHING_QUEUE_TIMEOUT", "5"))
+HASHING_RETRY_AFTER = int(_env("HASHING_RETRY_AFTER", "2"))
+# Intentos por ventana ("intentos/segundos"); vacío = sin límite. Se comprueban antes de hacer ningún hash.
+LOGIN_RATE_LIMIT_PER_USERNAME = _env("LOGIN_RATE_LIMIT_PER_USERNAME", "10/60")
+LOGIN_RATE_LIMIT_PER_IP = _env("LOGIN_RATE_LIMIT_PER_IP", "60/60")
+REGISTER_RATE_LIMIT_PER_IP = _env("REGISTER_RATE_LIMIT_PER_IP", "20/60")
+
+# --- API de biblioteca ---
+# Con LIBRARY_LEGACY_LIST activo, GET /api/library/entries/ sin "limit" ni "cursor"
+# devuelve la lista completa como antes; si se desactiva, siempre se pagina.
+LIBRARY_LEGACY_LIST = _env_bool("LIBRARY_LEGACY_LIST", True)
+LIBRARY_PAGE_SIZE = int(_env("LIBRARY_PAGE_SIZE", "50"))
+LIBRARY_PAGE_MAX_SIZE = int(_env("LIBRARY_PAGE_MAX_SIZE", "200"))
+# Filas que se piden a la base de datos por cada vuelta del cursor en los listados en streaming.
+LIBRARY_STREAM_CHUNK_SIZE = int(_env("LIBRARY_STREAM_CHUNK_SIZE", "2000"))
+# Alta masiva: máximo de entradas por petición y tamaño de cada lote de INSERT.
+LIBRARY_BULK_MAX_ITEMS = int(_env("LIBRARY_BULK_MAX_ITEMS", "5000"))
+LIBRARY_BULK_BATCH_SIZE = int(_env("LIBRARY_BULK_BATCH_SIZE", "1000"))
+# Exportación (library.export): filas por vuelta del cursor y nivel de gzip (1-9).
+LIBRARY_EXPORT_CHUNK_SIZE = int(_env("LIBRARY_EXPORT_CHUNK_SIZE", "5000"))
+LIBRARY_EXPORT_GZIP_LEVEL = int(_env("LIBRARY_EXPORT_GZIP_LEVEL", "6"))
+# Importación (library.imports): registros por bloque (una transacción cada uno) y tamaño máximo del fichero.
+LIBRARY_IMPORT_CHUNK_SIZE = int(_env("LIBRARY_IMPORT_CHUNK_SIZE", "5000"))
+LIBRARY_IMPORT_MAX_BYTES = int(_env("LIBRARY_IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# --- Registro de actividad (library.activity) ---
+# Un evento por alta, cambio o borrado de una entrada. Los feeds se paginan por
+# cursor de LIBRARY_ACTIVITY_PAGE_SIZE en LIBRARY_ACTIVITY_PAGE_SIZE eventos.
+LIBRARY_ACTIVITY_LOG = _env_bool("LIBRARY_ACTIVITY_LOG", True)
+LIBRARY_ACTIVITY_PAGE_SIZE = int(_env("LIBRARY_ACTIVITY_PAGE_SIZE", "50"))
+LIBRARY_ACTIVITY_PAGE_MAX_SIZE = int(_env("LIBRARY_ACTIVITY_PAGE_MAX_SIZE", "200"))
+# Días que abarca como mucho /api/library/activity/trend/
+LIBRARY_ACTIVITY_TREND_MAX_DAYS = int(_env("LIBRARY_ACTIVITY_TREND_MAX_DAYS", "366"))
+# Días que se conservan los eventos (prune_library_activity); 0 = todos.
+# Un cliente cuyo cursor de /api/library/changes/ sea más antiguo tendrá que
+# sincronizar la biblioteca completa.
+LIBRARY_ACTIVITY_RETENTION_DAYS = int(_env("LIBRARY_ACTIVITY_RETENTION_DAYS", "90"))
+# Eventos por página de /api/library/changes/
+LIBRARY_CHANGES_PAGE_SIZE = int(_env("LIBRARY_CHANGES_PAGE_SIZE", "500"))
+LIBRARY_CHANGES_PAGE_MAX_SIZE = int(_env("LIBRARY_CHANGES_PAGE_MAX_SIZE", "1000"))
+
+# --- Estadísticas globales por juego (library.game_stats) ---
+# Con GAME_STATS_INCREMENTAL cada cambio en una biblioteca actualiza GameStats y
+# GameHours en su transacción; sin él solo se actualizan al reconstruirlas.
+# GAME_STATS_REBUILD_INTERVAL > 0 (segundos) programa la reconstrucción
+# completa como trabajo periódico (manage.py rebuild_game_stats --background).
+GAME_STATS_INCREMENTAL = _env_bool("GAME_STATS_INCREMENTAL", True)
+GAME_STATS_REBUILD_INTERVAL = int(_env("GAME_STATS_REBUILD_INTERVAL", "86400"))
+# Juegos que se copian a GameStats/GameHours en cada transacción de la reconstrucción
+GAME_STATS_REBUILD_BATCH_SIZE = int(_env("GAME_STATS_REBUILD_BATCH_SIZE", "1000"))
+GAME_STATS_LEADERBOARD_MAX = int(_env("GAME_STATS_LEADERBOARD_MAX", "100"))
+
+# --- Trabajos en segundo plano (jobs, manage.py runworker) ---
+# Cada worker ejecuta JOBS_WORKER_CONCURRENCY trabajos a la vez y, si no hay
+# ninguno listo, vuelve a mirar la cola cada JOBS_POLL_INTERVAL segundos. Los
+# reintentos esperan JOBS_RETRY_DELAY * 2^(intento-1) segundos (como mucho
+# JOBS_RETRY_MAX_DELAY). Un trabajo en curso sin señal de su worker durante
+# JOBS_LOCK_TIMEOUT segundos se da por abandonado y se vuelve a ejecutar.
+JOBS_WORKER_CONCURRENCY = int(_env("JOBS_WORKER_CONCURRENCY", "2"))
+JOBS_POLL_INTERVAL = float(_env("JOBS_POLL_INTERVAL", "1.0"))
+JOBS_MAX_ATTEMPTS = int(_env("JOBS_MAX_ATTEMPTS", "3"))
+JOBS_RETRY_DELAY = float(_env("JOBS_RETRY_DELAY", "10"))
+JOBS_RETRY_MAX_DELAY = float(_env("JOBS_RETRY_MAX_DELAY", "3600"))
+JOBS_LOCK_TIMEOUT = float(_env("JOBS_LOCK_TIMEOUT", "300"))
+
+# --- Caché de respuestas de la biblioteca (library.cache) ---
+# LIBRARY_CACHE: "locmem" (memoria de cada proceso), "filesystem" (directorio
+# LIBRARY_CACHE_LOCATION, compartido por los procesos de la máquina), "redis"
+# (URL en LIBRARY_CACHE_LOCATION, necesita el paquete redis) o vacío para
+# desactivarla. Las respuestas de más de LIBRARY_CACHE_MAX_BYTES no se guardan.
+LIBRARY_CACHE = _env("LIBRARY_CACHE", "locmem")
+LIBRARY_CACHE_LOCATION = _env("LIBRARY_CACHE_LOCATION", "")
+LIBRARY_CACHE_TTL = int(_env("LIBRARY_CACHE_TTL", "300"))
+LIBRARY_CACHE_MAX_BYTES = int(_env("LIBRARY_CACHE_MAX_BYTES", "1000000"))
+LIBRARY_CACHE_MAX_ENTRIES = int(_env("LIBRARY_CACHE_MAX_ENTRIES", "10000"))
+
+_LIBRARY_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "library"),
+    "filesystem": ("django.core.cache.backends.filebased.FileBasedCache", "/tmp/steamlike-library-cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://localhost:6379/1"),
+}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+if LIBRARY_CACHE:
+    _backend, _location = _LIBRARY_CACHE_BACKENDS[LIBRARY_CACHE]
+    CACHES["library"] = {
+        "BACKEND": _backend,
+        "LOCATION": LIBRARY_CACHE_LOCATION or _location,
+        "TIMEOUT": LIBRARY_CACHE_TTL,
+        "KEY_PREFIX": "library",
+        "OPTIONS": {"MAX_ENTRIES": LIBRARY_CACHE_MAX_ENTRIES} if LIBRARY_CACHE != "redis" else {},
+    }
+
+# --- Catálogo de juegos (library.catalog, ?expand=game) ---
+# Sin CATALOG_URL solo se usa la tabla local Game. Los datos se guardan en
+# memoria CATALOG_CACHE_TTL segundos (como mucho CATALOG_CACHE_SIZE juegos por
+# proceso) y en Game; pasados CATALOG_REFRESH_AFTER segundos se vuelven a pedir.
+CATALOG_URL = _env("CATALOG_URL", "")
+CATALOG_TIMEOUT = float(_env("CATALOG_TIMEOUT", "2"))
+CATALOG_BATCH_SIZE = int(_env("CATALOG_BATCH_SIZE", "100"))
+CATALOG_CACHE_TTL = int(_env("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_SIZE = int(_env("CATALOG_CACHE_SIZE", "10000"))
+CATALOG_REFRESH_AFTER = int(_env("CATALOG_REFRESH_AFTER", "86400"))
+
+# --- Medición de peticiones (steamlike_backend.middleware.RequestTimingMiddleware) ---
+# Tiempo total, tiempo en base de datos y número de consultas en la cabecera
+# Server-Timing y en el log "steamlike.requests". La parte de base de datos solo
+# se mide en la fracción REQUEST_TIMING_SAMPLE_RATE de las peticiones (0 a 1).
+REQUEST_TIMING = _env_bool("REQUEST_TIMING", True)
+REQUEST_TIMING_HEADER = _env_bool("REQUEST_TIMING_HEADER", True)
+REQUEST_TIMING_SAMPLE_RATE = float(_env("REQUEST_TIMING_SAMPLE_RATE", "1.0"))
+# Consultas a partir de estos milisegundos van al log "steamlike.slow_queries" (con su plan si REQUEST_TIMING_EXPLAIN)
+REQUEST_TIMING_SLOW_QUERY_MS = float(_env("REQUEST_TIMING_SLOW_QUERY_MS", "200"))
+REQUEST_TIMING_EXPLAIN = _env_bool("REQUEST_TIMING_EXPLAIN", False)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "steamlike": {
+            "handlers": ["console"],
+            "level": _env("STEAMLIKE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
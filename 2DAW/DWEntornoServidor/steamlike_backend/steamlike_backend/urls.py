@@ -1,16 +1,43 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from library.views import health, add_library_entry, library_entry_detail
-from users.views import register, login_view, me_view
+from library.views import (
+    health, add_library_entry, library_entry_detail, bulk_library_entries, library_summary,
+    library_export, library_export_all, library_import, library_import_errors,
+    game_leaderboard, game_stats_detail, library_activity, library_activity_all, library_activity_trend,
+    library_changes,
+)
+from jobs.views import job_list, job_detail
+from users.views import register, login_view, me_view, token_view, token_refresh_view
+
+if settings.API_ASYNC_VIEWS:
+    from library.async_views import add_library_entry, library_entry_detail
+    from users.async_views import register, login_view, me_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/health/", health),
     path("api/library/entries/", add_library_entry),
     path("api/library/entries/<int:id>/", library_entry_detail),
+    path("api/library/entries/bulk/", bulk_library_entries),
+    path("api/library/summary/", library_summary),
+    path("api/library/export/", library_export),
+    path("api/library/export/all/", library_export_all),
+    path("api/library/import/", library_import),
+    path("api/library/import/<int:id>/errors/", library_import_errors),
+    path("api/library/activity/", library_activity),
+    path("api/library/activity/all/", library_activity_all),
+    path("api/library/activity/trend/", library_activity_trend),
+    path("api/library/changes/", library_changes),
+    path("api/games/leaderboard/", game_leaderboard),
+    path("api/games/<str:external_game_id>/stats/", game_stats_detail),
+    path("api/jobs/", job_list),
+    path("api/jobs/<int:id>/", job_detail),
     path("api/register/", register),
     path("api/auth/login/", login_view),  # Nueva ruta para login
     path("api/users/me/", me_view),       # Nueva ruta para comprobación
+    path("api/auth/token/", token_view),
+    path("api/auth/token/refresh/", token_refresh_view),
 
 ]
 
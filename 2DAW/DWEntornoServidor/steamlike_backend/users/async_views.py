@@ -0,0 +1,106 @@
+"""
+Versiones asíncronas de register, login_view y me_view (ver API_ASYNC_VIEWS
+en settings.py). Responden exactamente igual que las de users.views.
+"""
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from django.contrib.auth.models import User
+from django.contrib.auth import aauthenticate, alogin
+from steamlike_backend.codec import JsonResponse, get_json_request
+from users import hashing, ratelimit
+from users.views import create_user, throttle_response
+
+@require_http_methods(["POST"])
+@csrf_exempt
+async def register(request):
+    try:
+        await sync_to_async(ratelimit.check_register)(request)
+    except ratelimit.RateLimited as e:
+        return throttle_response(e)
+
+    data = get_json_request(request)
+
+    if not data:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos",
+            "details": {"body": "El cuerpo de la petición no puede estar vacío"}
+        }, status=400)
+
+    errores_dict = {}
+    username = data.get("username")
+    password = data.get("password")
+
+    if username is None:
+        errores_dict.update({"username": "Campo obligatorio"})
+    elif not isinstance(username, str):
+        errores_dict.update({"username": "Debe ser una cadena"})
+
+    if password is None:
+        errores_dict.update({"password": "Campo obligatorio"})
+    elif not isinstance(password, str):
+        errores_dict.update({"password": "Debe ser una cadena"})
+
+    if isinstance(password, str) and len(password) < 8:
+        errores_dict.update({"password": "La contraseña debe tener al menos 8 caracteres"})
+
+    if isinstance(username, str) and await User.objects.filter(username=username).aexists():
+        errores_dict.update({"username": "duplicate"})
+
+    if errores_dict:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos",
+            "details": errores_dict
+        }, status=400)
+
+    # El hash se calcula en el pool de users.hashing y el INSERT en el hilo del ORM
+    try:
+        user = await sync_to_async(create_user)(username, password)
+    except hashing.HashingBusy as e:
+        return throttle_response(e)
+    return JsonResponse({"id": user.id, "username": user.username}, status=201)
+
+@require_http_methods(["POST"])
+@csrf_exempt
+async def login_view(request):
+    data = get_json_request(request)
+    username = data.get("username")
+    password = data.get("password")
+
+    if not isinstance(username, str) or not isinstance(password, str):
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos"
+        }, status=400)
+
+    try:
+        await sync_to_async(ratelimit.check_login)(request, username)
+        user = await aauthenticate(request, username=username, password=password)
+    except (ratelimit.RateLimited, hashing.HashingBusy) as e:
+        return throttle_response(e)
+
+    if user is not None:
+        await alogin(request, user)
+        return JsonResponse({
+            "id": user.id,
+            "username": user.username
+        }, status=200)
+    return JsonResponse({
+        "error": "unauthorized",
+        "message": "Credenciales incorrectas"
+    }, status=401)
+
+@require_http_methods(["GET"])
+async def me_view(request):
+    user = await request.auser()
+    if user.is_authenticated:
+        return JsonResponse({
+            "id": user.id,
+            "username": user.username
+        }, status=200)
+    return JsonResponse({
+        "error": "unauthorized",
+        "message": "No autenticado"
+    }, status=401)
@@ -0,0 +1,38 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from users import hashing
+
+
+class PooledHashingBackend(ModelBackend):
+    """
+    ModelBackend que calcula los hashes en el pool de users.hashing. Puede
+    lanzar hashing.HashingBusy si el pool está lleno: las vistas lo convierten
+    en un 503 con Retry-After.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Se calcula un hash igualmente para que no se note por el tiempo
+            # de respuesta si el usuario existe (como hace ModelBackend)
+            hashing.make_password(password)
+            return None
+
+        valid, must_update = hashing.verify_password(password, user.password)
+        if not valid or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = hashing.make_password(password)
+            user.save(update_fields=["password"])
+        return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        # ModelBackend.aauthenticate llamaría a user.acheck_password, fuera del pool
+        return await sync_to_async(self.authenticate)(request, username=username, password=password, **kwargs)
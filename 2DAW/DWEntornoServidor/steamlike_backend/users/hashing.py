@@ -0,0 +1,113 @@
+"""
+Pool acotado para el hash de contraseñas (PBKDF2).
+
+Cada hash son cientos de milisegundos de CPU. Si se calculan directamente en
+la vista, una ráfaga de logins ocupa todos los hilos del servidor y las
+peticiones baratas (/api/health/, listados) se quedan esperando. Aquí como
+mucho HASHING_WORKERS hashes se calculan a la vez y HASHING_QUEUE_SIZE más
+esperan turno; el resto se rechaza al momento con HashingBusy (la vista
+responde 503 con Retry-After) en lugar de acumularse.
+
+hashlib libera el GIL durante PBKDF2, así que los hilos del pool sí usan
+varios núcleos. Al pool solo va el cálculo del hash: las consultas a la base
+de datos siguen en el hilo de la petición.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingBusy(Exception):
+    """El pool está lleno (o el trabajo ha esperado demasiado en la cola)."""
+
+    def __init__(self, retry_after):
+        super().__init__("Demasiadas operaciones de contraseña en curso")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    def __init__(self, workers, queue_size, timeout, retry_after):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+        # Un hueco por hilo más los de la cola. Se libera cuando el trabajo
+        # termina (o se cancela), no cuando la petición deja de esperar.
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.rejected = 0
+
+    def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy(self.retry_after)
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda f: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Si aún no había empezado deja de ocupar la cola
+            future.cancel()
+            self.rejected += 1
+            raise HashingBusy(self.retry_after)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool del proceso, creado la primera vez con la configuración de settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    settings.HASHING_WORKERS,
+                    settings.HASHING_QUEUE_SIZE,
+                    settings.HASHING_QUEUE_TIMEOUT,
+                    settings.HASHING_RETRY_AFTER,
+                )
+    return _pool
+
+
+def reset_pool():
+    """Descarta el pool actual (tests o cambio de configuración)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+def run(func, *args):
+    """Ejecuta func(*args) en el pool, o en línea si HASHING_POOL está desactivado."""
+    if not settings.HASHING_POOL:
+        return func(*args)
+    return get_pool().run(func, *args)
+
+
+def _verify(password, encoded):
+    """(contraseña correcta, hay que regenerar el hash con el algoritmo actual)."""
+    if not hashers.check_password(password, encoded):
+        return False, False
+    preferred = hashers.get_hasher("default")
+    hasher = hashers.identify_hasher(encoded)
+    return True, hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def verify_password(password, encoded):
+    return run(_verify, password, encoded)
+
+
+def make_password(password):
+    return run(hashers.make_password, password)
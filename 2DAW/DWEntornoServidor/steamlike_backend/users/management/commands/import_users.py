@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from users import provisioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Da de alta usuarios en bloque desde un fichero CSV o NDJSON con username y "
+        "password (en claro) o password_hash (formato de Django). Los usuarios que ya "
+        "existen se saltan y se anotan en el informe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Fichero de entrada ("-" para la entrada estándar)')
+        parser.add_argument("--format", choices=("csv", "ndjson"), help="Por defecto, según la extensión")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 1,
+            help="Procesos para el hash de las contraseñas en claro (1 = en este proceso)",
+        )
+        parser.add_argument("--checkpoint", help="Fichero de checkpoint (por defecto, <path>.checkpoint)")
+        parser.add_argument("--resume", action="store_true", help="Continuar desde el checkpoint")
+        parser.add_argument("--report", help="Fichero NDJSON con los registros saltados o inválidos")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or provisioning.detect_format(path)
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size debe ser mayor que 0")
+
+        checkpoint_path = options["checkpoint"] or (None if path == "-" else f"{path}.checkpoint")
+        state = {"source": os.path.abspath(path), "records": 0, "created": 0, "skipped": 0, "invalid": 0}
+        if checkpoint_path:
+            previous = provisioning.load_checkpoint(checkpoint_path)
+            if previous and not options["resume"]:
+                raise CommandError(f"Ya existe {checkpoint_path}: usa --resume para continuar o bórralo para empezar de cero")
+            if previous:
+                if previous.get("source") != state["source"]:
+                    raise CommandError(f"El checkpoint es de otro fichero: {previous.get('source')}")
+                state = previous
+        done = state["records"]
+
+        report = open(options["report"], "a" if done else "w", encoding="utf-8") if options["report"] else None
+        started = time.monotonic()
+        processed = 0
+        try:
+            with provisioning.open_source(path) as stream, provisioning.PasswordHasher(options["processes"]) as hasher:
+                records = ((n, r) for n, r in provisioning.read_records(stream, fmt) if n > done)
+                for batch in provisioning.batches(records, batch_size):
+                    with transaction.atomic():
+                        created, problems = provisioning.import_batch(batch, hasher, batch_size)
+
+                    state["records"] = batch[-1][0]
+                    state["created"] += created
+                    state["invalid"] += sum(1 for p in problems if p["reason"] == "invalid")
+                    state["skipped"] += sum(1 for p in problems if p["reason"] != "invalid")
+                    if report:
+                        report.writelines(json.dumps(p, ensure_ascii=False) + "\n" for p in problems)
+                        report.flush()
+                    if checkpoint_path:
+                        provisioning.save_checkpoint(checkpoint_path, state)
+
+                    processed += len(batch)
+                    if options["verbosity"] >= 1:
+                        rate = processed / max(time.monotonic() - started, 1e-9)
+                        self.stderr.write(
+                            f"{state['records']} registros: {state['created']} creados, "
+                            f"{state['skipped']} saltados, {state['invalid']} inválidos ({rate:.0f}/s)"
+                        )
+        finally:
+            if report:
+                report.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Usuarios creados: {state['created']}, saltados: {state['skipped']}, inválidos: {state['invalid']}"
+        ))
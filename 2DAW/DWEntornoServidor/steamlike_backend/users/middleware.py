@@ -0,0 +1,54 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+from users.tokens import TokenError, user_from_access_token
+
+
+class TokenAuthenticationMiddleware:
+    """
+    Si la petición trae "Authorization: Bearer <token de acceso>", request.user
+    (y request.auser) salen del token, sin leer la sesión ni el usuario de la
+    base de datos. Un token inválido o caducado deja la petición como anónima.
+    Sin esa cabecera se mantiene la autenticación por sesión (admin, login clásico).
+
+    Debe ir después de AuthenticationMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def authenticate(request):
+        header = request.headers.get("Authorization", "")
+        if not header.startswith("Bearer "):
+            return
+
+        def get_user():
+            # Se valida la firma una sola vez y solo si la vista mira el usuario
+            if not hasattr(request, "_token_user"):
+                try:
+                    request._token_user = user_from_access_token(header[len("Bearer "):].strip())
+                except TokenError:
+                    request._token_user = AnonymousUser()
+            return request._token_user
+
+        async def auser():
+            return get_user()
+
+        request.user = SimpleLazyObject(get_user)
+        request.auser = auser
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.authenticate(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.authenticate(request)
+        return await self.get_response(request)
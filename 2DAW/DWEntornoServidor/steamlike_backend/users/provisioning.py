@@ -0,0 +1,214 @@
+"""
+Alta masiva de usuarios desde un fichero CSV o NDJSON (comando import_users).
+
+Cada registro trae "username" y, o bien "password" (en claro, se calcula el
+hash), o bien "password_hash" (ya en el formato de Django, p. ej.
+"pbkdf2_sha256$..."; se guarda tal cual). "email" es opcional.
+
+Los registros se leen en streaming y se procesan por lotes: una consulta para
+saber qué usuarios ya existen, el hash de las contraseñas en claro repartido
+entre procesos y un INSERT masivo. Tras cada lote se guarda un checkpoint con el
+número de registros ya tratados, de modo que una importación interrumpida
+continúa donde se quedó.
+"""
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.db import connections
+
+USERNAME_MAX_LENGTH = User._meta.get_field("username").max_length
+PASSWORD_MIN_LENGTH = 8
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def read_records(stream, fmt):
+    """Genera (número de registro, dict) empezando en 1. Las líneas NDJSON mal formadas dan None."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def open_source(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def batches(records, size):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def validate(record):
+    """Devuelve (username, email, contraseña en claro o None, hash o None) o lanza ValueError."""
+    if record is None:
+        raise ValueError("Registro mal formado")
+    username = record.get("username")
+    if not isinstance(username, str) or not username.strip():
+        raise ValueError("username: Campo obligatorio")
+    username = User.normalize_username(username.strip())
+    if len(username) > USERNAME_MAX_LENGTH:
+        raise ValueError(f"username: Máximo {USERNAME_MAX_LENGTH} caracteres")
+
+    email = record.get("email") or ""
+    if not isinstance(email, str):
+        raise ValueError("email: Debe ser una cadena")
+
+    encoded = record.get("password_hash")
+    password = record.get("password")
+    if encoded:
+        try:
+            hashers.identify_hasher(encoded)
+        except ValueError:
+            raise ValueError("password_hash: Algoritmo desconocido (ver PASSWORD_HASHERS)")
+        return username, email, None, encoded
+    if not isinstance(password, str) or len(password) < PASSWORD_MIN_LENGTH:
+        raise ValueError(f"password: Al menos {PASSWORD_MIN_LENGTH} caracteres")
+    return username, email, password, None
+
+
+def _init_worker():
+    # Con "spawn" el proceso hijo arranca sin Django configurado
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+class PasswordHasher:
+    """Calcula hashes en un pool de procesos (processes > 1) o en el propio proceso."""
+
+    def __init__(self, processes):
+        self.executor = None
+        if processes > 1:
+            self.executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker)
+        self.processes = processes
+
+    def hash_all(self, passwords):
+        if not passwords:
+            return []
+        if self.executor is None:
+            return [hashers.make_password(p) for p in passwords]
+        chunksize = max(1, len(passwords) // (self.processes * 4))
+        return list(self.executor.map(_make_password, passwords, chunksize=chunksize))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, state):
+    # Se escribe aparte y se renombra: un corte a mitad no deja el fichero a medias
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def insert_users(users, batch_size):
+    """
+    INSERT de los usuarios ignorando los que ya existan. Devuelve el conjunto de
+    usernames que ha insertado esta llamada. En PostgreSQL y SQLite es un
+    INSERT ... ON CONFLICT DO NOTHING RETURNING; en otras bases de datos,
+    bulk_create con ignore_conflicts, que no dice cuáles se han insertado: se
+    dan todos por creados.
+    """
+    if not users:
+        return set()
+    connection = connections[User.objects.db]
+    if connection.vendor not in ("postgresql", "sqlite") or not connection.features.can_return_rows_from_bulk_insert:
+        User.objects.bulk_create(users, batch_size=batch_size, ignore_conflicts=True)
+        return {user.username for user in users}
+
+    meta = User._meta
+    fields = [field for field in meta.concrete_fields if not field.primary_key]
+    qn = connection.ops.quote_name
+    insert = "INSERT INTO {} ({}) VALUES ".format(qn(meta.db_table), ", ".join(qn(field.column) for field in fields))
+    placeholder = "({})".format(", ".join(["%s"] * len(fields)))
+    returning = " ON CONFLICT DO NOTHING RETURNING {}".format(qn(meta.get_field("username").column))
+    rows = [[field.get_db_prep_save(field.pre_save(user, True), connection) for field in fields] for user in users]
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(fields, users))
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.execute(insert + ", ".join([placeholder] * len(batch)) + returning, [value for row in batch for value in row])
+            inserted.update(username for username, in cursor.fetchall())
+    return inserted
+
+
+def import_batch(batch, hasher, batch_size):
+    """
+    Da de alta un lote de (número, registro). Devuelve (creados, problemas),
+    con problemas como lista de {"record", "username", "reason", ...}.
+    """
+    problems = []
+    valid = {}
+    for number, record in batch:
+        try:
+            username, email, password, encoded = validate(record)
+        except ValueError as e:
+            problems.append({"record": number, "reason": "invalid", "message": str(e)})
+            continue
+        if username in valid:
+            problems.append({"record": number, "username": username, "reason": "duplicate"})
+            continue
+        valid[username] = (number, email, password, encoded)
+
+    existing = set(User.objects.filter(username__in=list(valid)).values_list("username", flat=True))
+    for username in sorted(existing, key=lambda u: valid[u][0]):
+        problems.append({"record": valid.pop(username)[0], "username": username, "reason": "exists"})
+
+    pending = [u for u, (_, _, password, _) in valid.items() if password is not None]
+    hashed = dict(zip(pending, hasher.hash_all([valid[u][2] for u in pending])))
+
+    users = [
+        User(username=username, email=email, password=encoded or hashed[username])
+        for username, (_, email, _, encoded) in valid.items()
+    ]
+    inserted = insert_users(users, batch_size)
+    # Otro proceso ha dado de alta el usuario entre la consulta y el INSERT
+    for username in valid.keys() - inserted:
+        problems.append({"record": valid[username][0], "username": username, "reason": "exists"})
+    problems.sort(key=lambda p: p["record"])
+    return len(inserted), problems
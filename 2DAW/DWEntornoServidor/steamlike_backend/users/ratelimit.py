@@ -0,0 +1,65 @@
+"""
+Límite de intentos por ventana fija de tiempo, guardado en la caché de Django.
+
+Se comprueba antes de calcular ningún hash, así que el tráfico de relleno de
+credenciales (muchos intentos con un mismo usuario o desde una misma IP) se
+corta sin gastar CPU. Los límites se escriben como "intentos/segundos"
+(p. ej. "10/60"); una cadena vacía desactiva el límite.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class RateLimited(Exception):
+    def __init__(self, scope, retry_after):
+        super().__init__(f"Demasiados intentos ({scope})")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def parse_rate(rate):
+    """ "10/60" -> (10, 60); "" o None -> None."""
+    if not rate:
+        return None
+    count, _, seconds = rate.partition("/")
+    return int(count), int(seconds or 60)
+
+
+def hit(scope, value, rate):
+    """
+    Cuenta un intento de "value" (un usuario, una IP...) en "scope" y lanza
+    RateLimited si supera "rate" en la ventana actual.
+    """
+    parsed = parse_rate(rate)
+    if parsed is None or not value:
+        return
+    limit, seconds = parsed
+    now = time.time()
+    window = int(now // seconds)
+    key = f"ratelimit:{scope}:{value}:{window}"
+    # add() no pisa un contador existente; incr() es atómico en los backends que lo soportan
+    cache.add(key, 0, timeout=seconds + 1)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # La clave ha caducado entre add() e incr()
+        cache.set(key, 1, timeout=seconds + 1)
+        count = 1
+    if count > limit:
+        raise RateLimited(scope, max(1, int((window + 1) * seconds - now) + 1))
+
+
+def client_ip(request):
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def check_login(request, username):
+    """Límites del login (y de /api/auth/token/): por usuario y por IP."""
+    hit("login-ip", client_ip(request), settings.LOGIN_RATE_LIMIT_PER_IP)
+    hit("login-user", username.lower(), settings.LOGIN_RATE_LIMIT_PER_USERNAME)
+
+
+def check_register(request):
+    hit("register-ip", client_ip(request), settings.REGISTER_RATE_LIMIT_PER_IP)
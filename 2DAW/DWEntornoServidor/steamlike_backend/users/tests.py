@@ -1,3 +1,267 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from library.models import LibraryEntry
+from users import hashing, provisioning
+from users.tokens import ACCESS_SALT
 
-# Create your tests here.
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="portador", password="12345678")
+        LibraryEntry.objects.create(external_game_id="g1", status="playing", hours_played=1, user=self.user)
+
+    def get_tokens(self, password="12345678"):
+        return self.client.post(
+            "/api/auth/token/",
+            data=json.dumps({"username": "portador", "password": password}),
+            content_type="application/json"
+        )
+
+    def bearer(self, token):
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_issue_tokens(self):
+        response = self.get_tokens()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["id"], self.user.id)
+        self.assertEqual(data["token_type"], "Bearer")
+        self.assertTrue(data["access"] and data["refresh"])
+        self.assertNotIn("sessionid", response.cookies)
+
+    def test_wrong_password(self):
+        self.assertEqual(self.get_tokens("otra-clave").status_code, 401)
+
+    def test_me_without_database(self):
+        # Precondiciones
+        access = self.get_tokens().json()["access"]
+
+        # Llamada: ni sesión ni usuario
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/users/me/", **self.bearer(access))
+
+        # Comprobaciones
+        self.assertEqual(response.json(), {"id": self.user.id, "username": "portador"})
+
+    def test_library_list_skips_session_and_user_queries(self):
+        access = self.get_tokens().json()["access"]
+
+        # Versión de la biblioteca + listado
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/library/entries/", **self.bearer(access))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e["external_game_id"] for e in response.json()], ["g1"])
+
+    def test_create_with_token(self):
+        access = self.get_tokens().json()["access"]
+        response = self.client.post(
+            "/api/library/entries/",
+            data=json.dumps({"external_game_id": "g2", "status": "wishlist"}),
+            content_type="application/json",
+            **self.bearer(access)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(LibraryEntry.objects.filter(user=self.user, external_game_id="g2").exists())
+
+    def test_invalid_and_expired_access_tokens(self):
+        forged = signing.dumps({"u": self.user.id, "n": "portador"}, salt="otra-sal")
+        self.assertEqual(self.client.get("/api/users/me/", **self.bearer(forged)).status_code, 401)
+        self.assertEqual(self.client.get("/api/users/me/", **self.bearer("basura")).status_code, 401)
+
+        access = signing.dumps({"u": self.user.id, "n": "portador"}, salt=ACCESS_SALT)
+        with override_settings(API_ACCESS_TOKEN_TTL=-1):
+            self.assertEqual(self.client.get("/api/users/me/", **self.bearer(access)).status_code, 401)
+
+    def test_refresh(self):
+        refresh = self.get_tokens().json()["refresh"]
+        response = self.client.post("/api/auth/token/refresh/", data=json.dumps({"refresh": refresh}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        me = self.client.get("/api/users/me/", **self.bearer(response.json()["access"]))
+        self.assertEqual(me.status_code, 200)
+
+    def test_refresh_revoked_after_password_change(self):
+        refresh = self.get_tokens().json()["refresh"]
+        self.user.set_password("nueva-clave-123")
+        self.user.save()
+
+        response = self.client.post("/api/auth/token/refresh/", data=json.dumps({"refresh": refresh}), content_type="application/json")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["error"], "invalid_token")
+
+    def test_session_auth_still_works(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/api/users/me/").json()["username"], "portador")
+
+class LoginBackpressureTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="jugador", password="12345678")
+
+    def tearDown(self):
+        hashing.reset_pool()
+
+    def login(self, username="jugador", password="12345678", ip="10.0.0.1"):
+        return self.client.post(
+            "/api/auth/login/",
+            data=json.dumps({"username": username, "password": password}),
+            content_type="application/json",
+            REMOTE_ADDR=ip
+        )
+
+    def test_login_and_register_through_pool(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login(password="incorrecta").status_code, 401)
+
+        response = self.client.post(
+            "/api/register/",
+            data=json.dumps({"username": "nuevo", "password": "abcdefgh"}),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(check_password("abcdefgh", User.objects.get(username="nuevo").password))
+
+    @override_settings(LOGIN_RATE_LIMIT_PER_USERNAME="2/60", LOGIN_RATE_LIMIT_PER_IP="")
+    def test_rate_limit_per_username_before_hashing(self):
+        # Precondiciones: se agota el límite de "jugador" desde dos IPs distintas
+        self.login(password="mal-1", ip="10.0.0.1")
+        self.login(password="mal-2", ip="10.0.0.2")
+
+        # Llamada: ni siquiera se consulta el usuario
+        with self.assertNumQueries(0):
+            response = self.login(ip="10.0.0.3")
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()["error"], "too_many_requests")
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(self.login(username="otro", password="x" * 8).status_code, 401)
+
+    @override_settings(LOGIN_RATE_LIMIT_PER_IP="2/60", LOGIN_RATE_LIMIT_PER_USERNAME="")
+    def test_rate_limit_per_ip(self):
+        self.login(username="a", password="x" * 8)
+        self.login(username="b", password="x" * 8)
+        self.assertEqual(self.login().status_code, 429)
+        self.assertEqual(self.login(ip="10.0.0.9").status_code, 200)
+
+    @override_settings(HASHING_WORKERS=1, HASHING_QUEUE_SIZE=0, HASHING_RETRY_AFTER=3)
+    def test_saturated_pool_returns_503(self):
+        # Precondiciones: el único hueco del pool está ocupado
+        hashing.reset_pool()
+        pool = hashing.get_pool()
+        pool.slots.acquire()
+        try:
+            # Llamada
+            response = self.login()
+        finally:
+            pool.slots.release()
+
+        # Comprobaciones
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertEqual(pool.rejected, 1)
+        self.assertEqual(self.login().status_code, 200)
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        User.objects.create_user(username="existente", password="12345678")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        out = StringIO()
+        call_command("import_users", path, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_import_csv_with_plain_and_hashed_passwords(self):
+        # Precondiciones
+        encoded = make_password("clave-legado")
+        path = self.write("usuarios.csv", (
+            "username,password,password_hash,email\n"
+            "ana,12345678,,ana@example.com\n"
+            f"luis,,{encoded},\n"
+            "existente,12345678,,\n"
+            "corta,123,,\n"
+        ))
+        report = os.path.join(self.dir.name, "informe.ndjson")
+
+        # Llamada
+        out = self.run_import(path, processes=1, report=report)
+
+        # Comprobaciones
+        self.assertIn("creados: 2, saltados: 1, inválidos: 1", out)
+        self.assertTrue(User.objects.get(username="ana").check_password("12345678"))
+        self.assertEqual(User.objects.get(username="ana").email, "ana@example.com")
+        self.assertEqual(User.objects.get(username="luis").password, encoded)
+        with open(report, encoding="utf-8") as f:
+            problems = [json.loads(line) for line in f]
+        self.assertEqual([(p["record"], p["reason"]) for p in problems], [(3, "exists"), (4, "invalid")])
+
+    def test_import_ndjson_with_process_pool(self):
+        lines = [json.dumps({"username": f"u{i}", "password": f"clave-{i:04d}"}) for i in range(20)]
+        lines.insert(5, "{no es json")
+        lines.append(json.dumps({"username": "u0", "password": "repetida"}))
+        path = self.write("usuarios.ndjson", "\n".join(lines) + "\n")
+
+        out = self.run_import(path, processes=2, batch_size=7)
+
+        self.assertIn("creados: 20, saltados: 1, inválidos: 1", out)
+        self.assertTrue(User.objects.get(username="u13").check_password("clave-0013"))
+
+    def test_concurrent_insert_is_not_counted_as_created(self):
+        # Precondiciones: otro proceso da de alta "b" entre la consulta de los que ya existen y el INSERT
+        path = self.write("usuarios.ndjson", "".join(
+            json.dumps({"username": name, "password": "12345678"}) + "\n" for name in ("a", "b")
+        ))
+        report = os.path.join(self.dir.name, "informe.ndjson")
+        insert_users = provisioning.insert_users
+
+        def racing_insert(users, batch_size):
+            User.objects.create_user(username="b", password="otra-clave")
+            return insert_users(users, batch_size)
+
+        # Llamada
+        with mock.patch("users.provisioning.insert_users", side_effect=racing_insert):
+            out = self.run_import(path, processes=1, report=report)
+
+        # Comprobaciones
+        self.assertIn("creados: 1, saltados: 1", out)
+        self.assertTrue(User.objects.get(username="b").check_password("otra-clave"))
+        with open(report, encoding="utf-8") as f:
+            self.assertEqual([json.loads(line)["reason"] for line in f], ["exists"])
+
+    def test_resume_from_checkpoint(self):
+        path = self.write("usuarios.ndjson", "".join(
+            json.dumps({"username": f"r{i}", "password": "12345678"}) + "\n" for i in range(6)
+        ))
+        # Una ejecución anterior se cortó después de los 4 primeros registros
+        with open(f"{path}.checkpoint", "w", encoding="utf-8") as f:
+            json.dump({"source": os.path.abspath(path), "records": 4, "created": 4, "skipped": 0, "invalid": 0}, f)
+
+        with self.assertRaises(CommandError):
+            self.run_import(path, processes=1)
+        out = self.run_import(path, processes=1, resume=True, batch_size=1)
+
+        self.assertEqual(sorted(User.objects.filter(username__startswith="r").values_list("username", flat=True)), ["r4", "r5"])
+        self.assertIn("creados: 6", out)
+        with open(f"{path}.checkpoint", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["records"], 6)
@@ -0,0 +1,69 @@
+"""
+Tokens firmados para la API (alternativa a la sesión).
+
+- Token de acceso: dura API_ACCESS_TOKEN_TTL segundos y lleva el id y el
+  nombre del usuario. Se valida solo con la firma, sin consultar la base de datos.
+- Token de refresco: dura API_REFRESH_TOKEN_TTL segundos y sirve para pedir un
+  token de acceso nuevo. Al usarlo sí se lee el usuario: si está inactivo o ha
+  cambiado de contraseña desde que se emitió, deja de valer.
+
+Están firmados con SECRET_KEY (django.core.signing), no cifrados: el
+contenido es legible por el cliente.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+
+ACCESS_SALT = "users.tokens.access"
+REFRESH_SALT = "users.tokens.refresh"
+# Caracteres del hash de la contraseña que se guardan en el token de refresco
+FINGERPRINT_LENGTH = 16
+
+
+class TokenError(Exception):
+    """Token mal formado, con firma inválida, caducado o revocado."""
+
+
+def _fingerprint(user):
+    # HMAC del hash de la contraseña: cambia si cambia la contraseña
+    return user.get_session_auth_hash()[:FINGERPRINT_LENGTH]
+
+
+def issue_tokens(user):
+    """Par de tokens para un usuario ya autenticado."""
+    access = signing.dumps({"u": user.pk, "n": user.get_username()}, salt=ACCESS_SALT)
+    refresh = signing.dumps({"u": user.pk, "h": _fingerprint(user)}, salt=REFRESH_SALT)
+    return {
+        "token_type": "Bearer",
+        "access": access,
+        "expires_in": settings.API_ACCESS_TOKEN_TTL,
+        "refresh": refresh,
+        "refresh_expires_in": settings.API_REFRESH_TOKEN_TTL,
+    }
+
+
+def user_from_access_token(token):
+    """
+    Usuario de un token de acceso, sin consultar la base de datos: es una
+    instancia de User sin cargar que solo tiene id y username (lo que usan las
+    vistas de la API). No debe guardarse.
+    """
+    try:
+        claims = signing.loads(token, salt=ACCESS_SALT, max_age=settings.API_ACCESS_TOKEN_TTL)
+        return User(pk=int(claims["u"]), username=str(claims["n"]))
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise TokenError("Token de acceso inválido o caducado")
+
+
+def refresh_tokens(token):
+    """Valida un token de refresco contra el usuario actual y emite un par nuevo."""
+    try:
+        claims = signing.loads(token, salt=REFRESH_SALT, max_age=settings.API_REFRESH_TOKEN_TTL)
+        user_id, fingerprint = int(claims["u"]), claims["h"]
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise TokenError("Token de refresco inválido o caducado")
+
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None or fingerprint != _fingerprint(user):
+        raise TokenError("Token de refresco revocado")
+    return issue_tokens(user)
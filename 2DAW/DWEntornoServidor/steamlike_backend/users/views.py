@@ -1,22 +1,41 @@
-import json
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login  # Importaciones nuevas
+from steamlike_backend.codec import JsonResponse, get_json_request
+from users import hashing, ratelimit
+from users.tokens import TokenError, issue_tokens, refresh_tokens
+
+def throttle_response(exc):
+    """
+    429 si se ha superado un límite de intentos (ratelimit.RateLimited) y 503
+    si el pool de hash está lleno (hashing.HashingBusy), con Retry-After.
+    """
+    if isinstance(exc, ratelimit.RateLimited):
+        response = JsonResponse({
+            "error": "too_many_requests",
+            "message": "Demasiados intentos. Inténtalo de nuevo más tarde"
+        }, status=429)
+    else:
+        response = JsonResponse({
+            "error": "service_busy",
+            "message": "Servidor ocupado. Inténtalo de nuevo en unos segundos"
+        }, status=503)
+    response["Retry-After"] = str(exc.retry_after)
+    return response
 
-def get_json_request(request):
-    try:
-        body = request.body.decode("utf-8")
-        if not body:
-            return {}
-        return json.loads(body)
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return {}
+def create_user(username, password):
+    """Como User.objects.create_user, pero con el hash calculado en el pool (un solo INSERT)."""
+    return User.objects.create(username=User.normalize_username(username), password=hashing.make_password(password))
 
 @require_http_methods(["POST"])
 @csrf_exempt
 def register(request):
+    try:
+        ratelimit.check_register(request)
+    except ratelimit.RateLimited as e:
+        return throttle_response(e)
+
     data = get_json_request(request)
 
     if not data:
@@ -64,7 +83,10 @@ def register(request):
         }, status=400)
 
     # Crear usuario
-    user = User.objects.create_user(username=username, password=password)
+    try:
+        user = create_user(username, password)
+    except hashing.HashingBusy as e:
+        return throttle_response(e)
     return JsonResponse({"id": user.id, "username": user.username}, status=201)
 
 # --- NUEVAS VISTAS PARA EL EJERCICIO 3 ---
@@ -83,8 +105,12 @@ def login_view(request):
             "message": "Datos de entrada inválidos"
         }, status=400)
 
-    # Intentar autenticar al usuario
-    user = authenticate(request, username=username, password=password)
+    # Intentar autenticar al usuario (antes, los límites de intentos: sin gastar CPU en hashes)
+    try:
+        ratelimit.check_login(request, username)
+        user = authenticate(request, username=username, password=password)
+    except (ratelimit.RateLimited, hashing.HashingBusy) as e:
+        return throttle_response(e)
 
     if user is not None:
         login(request, user)  # Crea la sesión en el servidor
@@ -112,4 +138,53 @@ def me_view(request):
         return JsonResponse({
             "error": "unauthorized",
             "message": "No autenticado"
-        }, status=401)
\ No newline at end of file
+        }, status=401)
+# --- TOKENS FIRMADOS (alternativa a la sesión) ---
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def token_view(request):
+    """
+    Igual que login_view, pero en lugar de crear una sesión devuelve un token
+    de acceso y uno de refresco (ver users.tokens).
+    """
+    data = get_json_request(request)
+    username = data.get("username")
+    password = data.get("password")
+
+    if not isinstance(username, str) or not isinstance(password, str):
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos"
+        }, status=400)
+
+    try:
+        ratelimit.check_login(request, username)
+        user = authenticate(request, username=username, password=password)
+    except (ratelimit.RateLimited, hashing.HashingBusy) as e:
+        return throttle_response(e)
+    if user is None:
+        return JsonResponse({
+            "error": "unauthorized",
+            "message": "Credenciales incorrectas"
+        }, status=401)
+
+    return JsonResponse({"id": user.id, "username": user.username, **issue_tokens(user)}, status=200)
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def token_refresh_view(request):
+    data = get_json_request(request)
+    refresh = data.get("refresh")
+    if not isinstance(refresh, str) or not refresh:
+        return JsonResponse({
+            "error": "validation_error",
+            "message": "Datos de entrada inválidos",
+            "details": {"refresh": "Campo obligatorio"}
+        }, status=400)
+
+    try:
+        tokens = refresh_tokens(refresh)
+    except TokenError as e:
+        return JsonResponse({"error": "invalid_token", "message": str(e)}, status=401)
+    return JsonResponse(tokens, status=200)